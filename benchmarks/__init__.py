@@ -0,0 +1,7 @@
+"""
+Benchmarks of the bitmap codecs, the index lookups and the end-to-end crossword fill. Benchmarks
+run on a synthetic corpus which is deterministic for a given seed, thus results of different runs
+(e.g., before and after a change) are comparable. Run them by:
+
+    python -m benchmarks --output results.json [--compare previous_results.json]
+"""
@@ -0,0 +1,73 @@
+"""
+Microbenchmarks of the bitmap codecs and the bitmap intersections: compression of the raw bitmaps,
+iteration of the compressed bitmaps and AND of the bitmaps of random patterns in Python
+(bit_op_index2) and in the native extension.
+"""
+
+import collections
+import operator
+import random
+
+from karnobh.crosswordist.bitmap import compress, decompress, bit_op_index2
+from benchmarks.timing import measure
+
+# lookup type of the native extension returning the list of the indexes
+_GET_LIST = 0
+
+
+def _bitmaps(words_index, length):
+    words_index_same_len = words_index[length]
+    bitmaps = []
+    for pos in range(length):
+        for letter in words_index.alphabet:
+            try:
+                bitmaps.append(words_index_same_len.bitmap_on_position(pos, letter))
+            except KeyError:
+                continue
+    return bitmaps
+
+
+def random_patterns(words_index, length, patterns_num, letters_num, seed):
+    """
+    :return: (length, mapping) patterns made of the letters of random words, so every pattern
+             matches at least one word
+    """
+    rnd = random.Random(seed)
+    words = words_index[length].words
+    patterns = []
+    for _ in range(patterns_num):
+        word = words[rnd.randrange(len(words))]
+        positions = sorted(rnd.sample(range(length), letters_num))
+        patterns.append((length, {pos: word[pos] for pos in positions}))
+    return patterns
+
+
+def run(config, words_index) -> dict:
+    length = config.bitmap_length
+    bitmaps = _bitmaps(words_index, length)
+    raw_sequences = [decompress(bitmap.compressed_sequence) for bitmap in bitmaps]
+    results = {
+        'bitmap.compress': measure(lambda: [compress(raw) for raw in raw_sequences],
+                                   repeat=config.repeat),
+        'bitmap.decompress': measure(lambda: [decompress(bitmap.compressed_sequence)
+                                              for bitmap in bitmaps], repeat=config.repeat),
+        'bitmap.iterate': measure(lambda: [collections.deque(bitmap, maxlen=0)
+                                           for bitmap in bitmaps], repeat=config.repeat),
+    }
+    words_index_same_len = words_index[length]
+    operands = [words_index_same_len.bitmaps_for(mapping)
+                for _, mapping in random_patterns(words_index, length, config.lookups,
+                                                  letters_num=2, seed=config.seed)]
+    results['bitmap.and.python'] = measure(
+        lambda: [list(bit_op_index2(*bitmaps_of, op=operator.and_)) for bitmaps_of in operands],
+        repeat=config.repeat)
+    try:
+        from crosswordist_native_index.compressed_seq import bit_and_op_index_native
+    except ImportError:
+        return results
+    words_num = len(words_index_same_len.words)
+    sequences = [[bitmap.compressed_sequence for bitmap in bitmaps_of] for bitmaps_of in operands]
+    results['bitmap.and.native'] = measure(
+        lambda: [bit_and_op_index_native(seqs, words_num, _GET_LIST) for seqs in sequences],
+        repeat=config.repeat)
+    return results
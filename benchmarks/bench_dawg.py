@@ -0,0 +1,93 @@
+"""
+Benchmarks of the DAWG words index against the bitmap index: construction of the graphs and the
+lookups of the random patterns, of the prefix patterns and of the patterns recorded while the
+solver fills seeded grids (i.e., the count and the existence lookups of a real search).
+"""
+
+import random
+
+from karnobh.crosswordist.dawg_index import Dawg, DawgWordsIndex
+from karnobh.crosswordist.grid_generator import create_random_grid, CrossWordsIndex
+from karnobh.crosswordist.solution_finder import find_solution
+from benchmarks.bench_index import _lookup_patterns, _lookup_benchmarks
+from benchmarks.timing import measure
+
+
+class _PatternsRecorder:
+    """
+    Proxy of a words index which records the patterns of the batched lookups of the solver
+    """
+
+    def __init__(self, words_index):
+        super().__init__()
+        self._words_index = words_index
+        self.patterns = []
+
+    def __getattr__(self, item):
+        return getattr(self._words_index, item)
+
+    def __getitem__(self, item):
+        return self._words_index[item]
+
+    def count_occurrences_batch(self, patterns, masks=None) -> list[int]:
+        patterns = list(patterns)
+        # the mappings of the solver change while the search goes on
+        self.patterns += [(length, dict(mapping)) for length, mapping in patterns]
+        return self._words_index.count_occurrences_batch(patterns, masks)
+
+    def does_intersection_exist_batch(self, patterns, masks=None) -> list[bool]:
+        patterns = list(patterns)
+        # the mappings of the solver change while the search goes on
+        self.patterns += [(length, dict(mapping)) for length, mapping in patterns]
+        return self._words_index.does_intersection_exist_batch(patterns, masks)
+
+    def do_all_intersections_exist(self, patterns, masks=None) -> bool:
+        patterns = list(patterns)
+        # the mappings of the solver change while the search goes on
+        self.patterns += [(length, dict(mapping)) for length, mapping in patterns]
+        return self._words_index.do_all_intersections_exist(patterns, masks)
+
+
+def solver_patterns(config, words_index) -> list[tuple[int, dict]]:
+    """
+    :return: patterns looked up by the solver while filling the grids of the benchmark seeds
+    """
+    recorder = _PatternsRecorder(words_index)
+    for seed in range(config.seed, config.seed + config.grids):
+        random.seed(seed)
+        grid = create_random_grid(size=config.grid_size, black_ratio=config.black_ratio,
+                                  symmetry='D', timeout_seconds=config.fill_timeout)
+        find_solution(word_index=recorder, cross_words_index=CrossWordsIndex(grid=grid),
+                      timeout_after_seconds=config.fill_timeout)
+    return recorder.patterns
+
+
+def _prefix_patterns(patterns):
+    # the letters of a pattern are moved to the first positions
+    return [(length, dict(enumerate(mapping.values()))) for length, mapping in patterns]
+
+
+def _build_dawgs(words_index):
+    for length in words_index.lengths:
+        words_index_same_len = words_index[length]
+        Dawg.build(length, (words_index_same_len.letters_at(word_index)
+                            for word_index in range(len(words_index_same_len.words))))
+
+
+def run(config, words_index) -> dict:
+    dawg_index = DawgWordsIndex(index_dict=words_index.as_dict())
+    results = {
+        'dawg.build': measure(lambda: _build_dawgs(words_index), repeat=max(1, config.repeat // 2)),
+    }
+    for length in words_index.lengths:
+        dawg_index.dawg(length)
+        dawg_index.dawg(length, reverse=True)
+    patterns = _lookup_patterns(config, words_index)
+    prefix_patterns = _prefix_patterns(patterns)
+    traced_patterns = solver_patterns(config, words_index)
+    for name, index in (('bitmap', words_index), ('dawg', dawg_index)):
+        results.update(_lookup_benchmarks(f'dawg.random.{name}', config, index, patterns))
+        results.update(_lookup_benchmarks(f'dawg.prefix.{name}', config, index, prefix_patterns))
+        results[f'dawg.trace.{name}'] = measure(
+            lambda: index.count_occurrences_batch(traced_patterns), repeat=config.repeat)
+    return results
@@ -0,0 +1,47 @@
+"""
+End-to-end benchmark of the crossword fill: random grids of fixed seeds are filled by the solver,
+the fill rate (the ratio of the found solutions) and the percentiles of the fill latency are
+reported.
+"""
+
+import random
+import time
+
+from karnobh.crosswordist.grid_generator import create_random_grid, CrossWordsIndex
+from karnobh.crosswordist.solution_finder import find_solution, FinderResult
+from benchmarks.timing import percentile, summarize
+
+
+def _fill_index(words_index):
+    try:
+        from karnobh.crosswordist.word_index_native import WordIndexNative
+    except ImportError:
+        return words_index, 'python'
+    return WordIndexNative(index_dict=words_index.as_dict()), 'native'
+
+
+def run(config, words_index) -> dict:
+    words_index, index_type = _fill_index(words_index)
+    latencies = []
+    found = 0
+    for seed in range(config.seed, config.seed + config.grids):
+        random.seed(seed)
+        grid = create_random_grid(size=config.grid_size, black_ratio=config.black_ratio,
+                                  symmetry='D', timeout_seconds=config.fill_timeout)
+        cross_words_index = CrossWordsIndex(grid=grid)
+        start = time.perf_counter()
+        result = find_solution(word_index=words_index,
+                               cross_words_index=cross_words_index,
+                               timeout_after_seconds=config.fill_timeout)
+        latencies.append(time.perf_counter() - start)
+        found += result == FinderResult.FOUND
+    return {
+        f'fill.{index_type}': {
+            **summarize(latencies),
+            'grids': config.grids,
+            'fill_rate': found / config.grids,
+            'p50': percentile(latencies, 50),
+            'p90': percentile(latencies, 90),
+            'p99': percentile(latencies, 99),
+        }
+    }
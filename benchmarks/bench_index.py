@@ -0,0 +1,55 @@
+"""
+Benchmarks of the words index: construction from the words, dump and load of the index file and
+the lookups of random patterns by the Python and by the native index.
+"""
+
+import io
+
+from karnobh.crosswordist.words_index import WordsIndex
+from benchmarks.corpus import build_index
+from benchmarks.bench_bitmap import random_patterns
+from benchmarks.timing import measure
+
+
+def _lookup_patterns(config, words_index):
+    patterns = []
+    for length in words_index.lengths:
+        for letters_num in range(1, min(3, length - 1) + 1):
+            patterns += random_patterns(words_index, length, config.lookups // 10 or 1,
+                                        letters_num=letters_num, seed=config.seed + length)
+    return patterns
+
+
+def _lookup_benchmarks(prefix, config, words_index, patterns) -> dict:
+    return {
+        f'{prefix}.list': measure(lambda: [list(words_index.lookup_indexes(length, mapping))
+                                           for length, mapping in patterns],
+                                  repeat=config.repeat),
+        f'{prefix}.count': measure(lambda: words_index.count_occurrences_batch(patterns),
+                                   repeat=config.repeat),
+        f'{prefix}.exists': measure(lambda: words_index.does_intersection_exist_batch(patterns),
+                                    repeat=config.repeat),
+    }
+
+
+def run(config, words) -> dict:
+    repeat = max(1, config.repeat // 2)
+    results = {'index.build': measure(lambda: build_index(words), repeat=repeat)}
+    words_index = build_index(words)
+    dumped = io.StringIO()
+    words_index.dump(dumped)
+    dumped = dumped.getvalue()
+    results['index.dump'] = measure(lambda: words_index.dump(io.StringIO()), repeat=repeat)
+    results['index.load.python'] = measure(lambda: WordsIndex(file=io.StringIO(dumped)),
+                                           repeat=repeat)
+    patterns = _lookup_patterns(config, words_index)
+    results.update(_lookup_benchmarks('lookup.python', config, words_index, patterns))
+    try:
+        from karnobh.crosswordist.word_index_native import WordIndexNative
+    except ImportError:
+        return results
+    results['index.load.native'] = measure(lambda: WordIndexNative(file=io.StringIO(dumped)),
+                                           repeat=repeat)
+    native_index = WordIndexNative(file=io.StringIO(dumped))
+    results.update(_lookup_benchmarks('lookup.native', config, native_index, patterns))
+    return results
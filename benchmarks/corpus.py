@@ -0,0 +1,68 @@
+"""
+This module contains the generator of a synthetic deterministic corpus of words. Letters of the
+words are drawn by the frequencies of the English letters and lengths of the words by a frequency
+table resembling a dictionary, so the bitmaps of the index have realistic densities.
+
+Examples:
+    >>> words = generate_corpus(words_num=100, seed=7)
+    >>> len(words)
+    100
+    >>> words == generate_corpus(words_num=100, seed=7)
+    True
+    >>> all(w.isupper() and MIN_WORD_LEN <= len(w) <= MAX_WORD_LEN for w in words)
+    True
+"""
+
+import random
+
+from karnobh.crosswordist.alphabet import LATIN_ALPHABET
+from karnobh.crosswordist.words_index import WordsIndex
+
+DEFAULT_SEED = 2023
+DEFAULT_WORDS_NUM = 20_000
+MIN_WORD_LEN = 3
+MAX_WORD_LEN = 12
+
+# relative frequencies of the English letters, percents
+LETTER_FREQUENCIES = {
+    'A': 8.2, 'B': 1.5, 'C': 2.8, 'D': 4.3, 'E': 12.7, 'F': 2.2, 'G': 2.0, 'H': 6.1, 'I': 7.0,
+    'J': 0.15, 'K': 0.77, 'L': 4.0, 'M': 2.4, 'N': 6.7, 'O': 7.5, 'P': 1.9, 'Q': 0.095, 'R': 6.0,
+    'S': 6.3, 'T': 9.1, 'U': 2.8, 'V': 0.98, 'W': 2.4, 'X': 0.15, 'Y': 2.0, 'Z': 0.074,
+}
+
+# relative frequencies of the lengths of the words
+LENGTH_FREQUENCIES = {
+    3: 4, 4: 9, 5: 14, 6: 16, 7: 16, 8: 14, 9: 10, 10: 8, 11: 5, 12: 4,
+}
+
+
+def generate_corpus(words_num: int = DEFAULT_WORDS_NUM, seed: int = DEFAULT_SEED) -> list[str]:
+    """
+    :param words_num: number of the distinct words
+    :param seed: seed of the generator, the same seed gives the same corpus
+    :return: sorted list of the distinct words
+    """
+    rnd = random.Random(seed)
+    letters = list(LETTER_FREQUENCIES)
+    letter_weights = list(LETTER_FREQUENCIES.values())
+    lengths = list(LENGTH_FREQUENCIES)
+    length_weights = list(LENGTH_FREQUENCIES.values())
+    words = set()
+    while len(words) < words_num:
+        length = rnd.choices(lengths, length_weights)[0]
+        words.add("".join(rnd.choices(letters, letter_weights, k=length)))
+    return sorted(words)
+
+
+def build_index(words, index_cls=WordsIndex, alphabet=LATIN_ALPHABET) -> WordsIndex:
+    """
+    :param words: words of the index
+    :param index_cls: class of the index
+    :param alphabet: alphabet of the words
+    :return: constructed index
+    """
+    index = index_cls(alphabet=alphabet)
+    for word in words:
+        index.add_word(word)
+    index.make_index()
+    return index
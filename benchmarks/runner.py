@@ -0,0 +1,104 @@
+"""
+This module runs the benchmark groups on the synthetic corpus and compares the results with the
+results of a previous run.
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass, asdict
+
+from benchmarks import bench_bitmap, bench_index, bench_fill, bench_dawg
+from benchmarks.corpus import generate_corpus, build_index, DEFAULT_SEED, DEFAULT_WORDS_NUM
+from benchmarks.timing import (save_results, load_results, compare_results, DEFAULT_REPEAT,
+                               DEFAULT_THRESHOLD)
+
+GROUP_BITMAP = "bitmap"
+GROUP_INDEX = "index"
+GROUP_FILL = "fill"
+GROUP_DAWG = "dawg"
+
+ALLOWED_GROUPS = [GROUP_BITMAP, GROUP_INDEX, GROUP_FILL, GROUP_DAWG]
+
+
+@dataclass
+class BenchmarkConfig:
+    seed: int = DEFAULT_SEED
+    words_num: int = DEFAULT_WORDS_NUM
+    repeat: int = DEFAULT_REPEAT
+    # length of the words whose bitmaps are benchmarked by the bitmap group
+    bitmap_length: int = 7
+    # number of the random patterns looked up
+    lookups: int = 200
+    grids: int = 20
+    grid_size: int = 7
+    black_ratio: float = 0.16
+    fill_timeout: float = 10.0
+
+
+def run_benchmarks(config: BenchmarkConfig, groups=ALLOWED_GROUPS) -> dict:
+    """
+    :param config: configuration of the benchmarks
+    :param groups: groups of the benchmarks to run
+    :return: results by the names of the benchmarks
+    """
+    words = generate_corpus(words_num=config.words_num, seed=config.seed)
+    words_index = build_index(words)
+    results = {}
+    if GROUP_BITMAP in groups:
+        results.update(bench_bitmap.run(config, words_index))
+    if GROUP_INDEX in groups:
+        results.update(bench_index.run(config, words))
+    if GROUP_FILL in groups:
+        results.update(bench_fill.run(config, words_index))
+    if GROUP_DAWG in groups:
+        results.update(bench_dawg.run(config, words_index))
+    return results
+
+
+def print_results(results: dict, out=sys.stdout):
+    for name, result in results.items():
+        extra = "".join(f" {key}={result[key]:.6g}" for key in ('fill_rate', 'p90', 'p99')
+                        if key in result)
+        print(f"{name:<24} median={result['median']:.6f}s min={result['min']:.6f}s{extra}",
+              file=out)
+
+
+def print_comparison(comparison, out=sys.stdout):
+    for name, old_median, new_median, ratio, is_regression in comparison:
+        mark = " REGRESSION" if is_regression else ""
+        print(f"{name:<24} {old_median:.6f}s -> {new_median:.6f}s x{ratio:.2f}{mark}", file=out)
+
+
+def main(argv=None) -> int:
+    defaults = BenchmarkConfig()
+    parser = argparse.ArgumentParser(prog="benchmarks",
+                                     description="Benchmarks of the crosswordist package.")
+    parser.add_argument('-o', '--output', help="File to save the results to (JSON).")
+    parser.add_argument('-c', '--compare',
+                        help="File of the results of a previous run to compare with.")
+    parser.add_argument('-t', '--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Relative slowdown of the median considered as a regression. "
+                             f"Default: {DEFAULT_THRESHOLD}.")
+    parser.add_argument('-g', '--group', action='append', choices=ALLOWED_GROUPS,
+                        help="Group of the benchmarks to run, may be repeated. Default: all.")
+    for field, value in asdict(defaults).items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=type(value), default=value,
+                            help=f"Default: {value}.")
+    args = parser.parse_args(argv)
+    config = BenchmarkConfig(**{field: getattr(args, field) for field in asdict(defaults)})
+    results = run_benchmarks(config, groups=args.group or ALLOWED_GROUPS)
+    print_results(results)
+    saved = {'config': asdict(config), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            save_results(results, f, config=asdict(config))
+    if args.compare:
+        with open(args.compare) as f:
+            previous = load_results(f)
+        if previous.get('config') != saved['config']:
+            print("Warning: the results are of different configurations", file=sys.stderr)
+        comparison = compare_results(previous, saved, threshold=args.threshold)
+        print_comparison(comparison)
+        if any(is_regression for *_, is_regression in comparison):
+            return 1
+    return 0
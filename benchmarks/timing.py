@@ -0,0 +1,102 @@
+"""
+This module contains the measurement and the comparison of the benchmark results. A result is a
+dictionary of the statistics of the measured seconds (per one call of the benchmarked function),
+results of a run are saved as JSON and compared with results of a previous run.
+
+Examples:
+    >>> percentile([1.0, 2.0, 3.0, 4.0], 50)
+    2.5
+    >>> old = {'results': {'compress': {'median': 1.0}, 'removed': {'median': 1.0}}}
+    >>> new = {'results': {'compress': {'median': 1.5}, 'added': {'median': 1.0}}}
+    >>> compare_results(old, new, threshold=0.1)
+    [('compress', 1.0, 1.5, 1.5, True)]
+"""
+
+import json
+import platform
+import statistics
+import sys
+import time
+
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.1
+
+
+def percentile(values, percent: float) -> float:
+    """
+    :param values: measured values
+    :param percent: percentile in range [0, 100]
+    :return: linearly interpolated percentile of the values
+    """
+    ordered = sorted(values)
+    if not ordered:
+        raise ValueError("No values to compute percentile of")
+    rank = (len(ordered) - 1) * percent / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(seconds: list[float]) -> dict:
+    return {
+        'min': min(seconds),
+        'median': statistics.median(seconds),
+        'mean': statistics.fmean(seconds),
+        'max': max(seconds),
+        'repeat': len(seconds),
+    }
+
+
+def measure(func, repeat: int = DEFAULT_REPEAT, number: int = 1) -> dict:
+    """
+    :param func: function without arguments to measure
+    :param repeat: number of the measurements
+    :param number: number of the calls in one measurement
+    :return: statistics of the seconds per one call
+    """
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        seconds.append((time.perf_counter() - start) / number)
+    return {**summarize(seconds), 'number': number}
+
+
+def environment() -> dict:
+    return {
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'time': time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def save_results(results: dict, file, config: dict | None = None):
+    json.dump({'environment': environment(), 'config': config, 'results': results}, file,
+              indent=2)
+
+
+def load_results(file) -> dict:
+    return json.load(file)
+
+
+def compare_results(old: dict, new: dict, threshold: float = DEFAULT_THRESHOLD) -> list[tuple]:
+    """
+    :param old: saved results of a previous run
+    :param new: saved results of the current run
+    :param threshold: relative slowdown of the median which is considered as a regression
+    :return: list of (name, old median, new median, ratio, is regression) of the benchmarks present
+             in both runs
+    """
+    comparison = []
+    old_results, new_results = old['results'], new['results']
+    for name, new_result in new_results.items():
+        old_result = old_results.get(name)
+        if old_result is None or 'median' not in old_result or 'median' not in new_result:
+            continue
+        old_median, new_median = old_result['median'], new_result['median']
+        ratio = new_median / old_median if old_median else float('inf')
+        comparison.append((name, old_median, new_median, ratio, ratio > 1 + threshold))
+    return comparison
@@ -1,13 +1,200 @@
 #include <stdbool.h>
+#include <stdint.h>
 #include <stdio.h>
+#include <string.h>
 #include <Python.h>
 
+#if defined(__AVX2__)
+#include <immintrin.h>
+#elif defined(__SSE2__)
+#include <emmintrin.h>
+#endif
+
 const unsigned char FILL_TYPES[] = {0x00, 0xFF};
-const int MAX_ITERS = 64;
 const int GET_LIST = 0;
 const int GET_COUNT = 1;
 const int IS_EXIST = 2;
 
+/* The longest noise run which a control byte can describe */
+#define MAX_NOISE_RUN 0x3FFF
+
+/*
+ * Word-at-a-time helpers. Bits of a compressed sequence are ordered from the most significant bit
+ * of the first byte, thus bytes are loaded into 64-bit words as big endian: the first bit of the
+ * sequence becomes the most significant bit of the word.
+ */
+#if defined(__GNUC__) || defined(__clang__)
+#define POPCOUNT64(word) ((size_t) __builtin_popcountll(word))
+#define CLZ64(word) ((size_t) __builtin_clzll(word))
+#else
+static size_t POPCOUNT64(uint64_t word) {
+    size_t count = 0;
+    for (; word; word &= word - 1) {
+        count++;
+    }
+    return count;
+}
+
+static size_t CLZ64(uint64_t word) {
+    size_t count = 0;
+    for (uint64_t mask = UINT64_C(1) << 63; !(word & mask); mask >>= 1) {
+        count++;
+    }
+    return count;
+}
+#endif
+
+/* Loads up to 8 bytes as a big endian word, missing bytes are zeros */
+static inline uint64_t _load_be64(const unsigned char* data, size_t n) {
+    uint64_t word = 0;
+    if (n == 8) {
+        memcpy(&word, data, 8);
+#if defined(__BYTE_ORDER__) && __BYTE_ORDER__ == __ORDER_LITTLE_ENDIAN__ && (defined(__GNUC__) || defined(__clang__))
+        word = __builtin_bswap64(word);
+#elif !(defined(__BYTE_ORDER__) && __BYTE_ORDER__ == __ORDER_BIG_ENDIAN__)
+        word = 0;
+        for (size_t i = 0; i < 8; i++) {
+            word = (word << 8) | data[i];
+        }
+#endif
+        return word;
+    }
+    for (size_t i = 0; i < n; i++) {
+        word |= (uint64_t) data[i] << (56 - 8 * i);
+    }
+    return word;
+}
+
+/* Word of n turned on bytes */
+static inline uint64_t _ones_be64(size_t n) {
+    return n == 8 ? ~UINT64_C(0) : ~(~UINT64_C(0) >> (8 * n));
+}
+
+static inline uint64_t _load_64(const unsigned char* data) {
+    uint64_t word;
+    memcpy(&word, data, 8);
+    return word;
+}
+
+/* dst &= src over len bytes */
+static void _and_into(unsigned char* dst, const unsigned char* src, size_t len) {
+    size_t i = 0;
+#if defined(__AVX2__)
+    for (; i + 32 <= len; i += 32) {
+        __m256i a = _mm256_loadu_si256((const __m256i*) (dst + i));
+        __m256i b = _mm256_loadu_si256((const __m256i*) (src + i));
+        _mm256_storeu_si256((__m256i*) (dst + i), _mm256_and_si256(a, b));
+    }
+#elif defined(__SSE2__)
+    for (; i + 16 <= len; i += 16) {
+        __m128i a = _mm_loadu_si128((const __m128i*) (dst + i));
+        __m128i b = _mm_loadu_si128((const __m128i*) (src + i));
+        _mm_storeu_si128((__m128i*) (dst + i), _mm_and_si128(a, b));
+    }
+#endif
+    for (; i + 8 <= len; i += 8) {
+        uint64_t word = _load_64(dst + i) & _load_64(src + i);
+        memcpy(dst + i, &word, 8);
+    }
+    for (; i < len; i++) {
+        dst[i] &= src[i];
+    }
+}
+
+/* dst |= src over len bytes */
+static void _or_into(unsigned char* dst, const unsigned char* src, size_t len) {
+    size_t i = 0;
+#if defined(__AVX2__)
+    for (; i + 32 <= len; i += 32) {
+        __m256i a = _mm256_loadu_si256((const __m256i*) (dst + i));
+        __m256i b = _mm256_loadu_si256((const __m256i*) (src + i));
+        _mm256_storeu_si256((__m256i*) (dst + i), _mm256_or_si256(a, b));
+    }
+#elif defined(__SSE2__)
+    for (; i + 16 <= len; i += 16) {
+        __m128i a = _mm_loadu_si128((const __m128i*) (dst + i));
+        __m128i b = _mm_loadu_si128((const __m128i*) (src + i));
+        _mm_storeu_si128((__m128i*) (dst + i), _mm_or_si128(a, b));
+    }
+#endif
+    for (; i + 8 <= len; i += 8) {
+        uint64_t word = _load_64(dst + i) | _load_64(src + i);
+        memcpy(dst + i, &word, 8);
+    }
+    for (; i < len; i++) {
+        dst[i] |= src[i];
+    }
+}
+
+/* dst &= ~src over len bytes */
+static void _andnot_into(unsigned char* dst, const unsigned char* src, size_t len) {
+    size_t i = 0;
+#if defined(__AVX2__)
+    for (; i + 32 <= len; i += 32) {
+        __m256i a = _mm256_loadu_si256((const __m256i*) (dst + i));
+        __m256i b = _mm256_loadu_si256((const __m256i*) (src + i));
+        _mm256_storeu_si256((__m256i*) (dst + i), _mm256_andnot_si256(b, a));
+    }
+#elif defined(__SSE2__)
+    for (; i + 16 <= len; i += 16) {
+        __m128i a = _mm_loadu_si128((const __m128i*) (dst + i));
+        __m128i b = _mm_loadu_si128((const __m128i*) (src + i));
+        _mm_storeu_si128((__m128i*) (dst + i), _mm_andnot_si128(b, a));
+    }
+#endif
+    for (; i + 8 <= len; i += 8) {
+        uint64_t word = _load_64(dst + i) & ~_load_64(src + i);
+        memcpy(dst + i, &word, 8);
+    }
+    for (; i < len; i++) {
+        dst[i] &= (unsigned char) ~src[i];
+    }
+}
+
+/* dst = a & b over len bytes */
+static void _and_to(unsigned char* dst, const unsigned char* a, const unsigned char* b, size_t len) {
+    memcpy(dst, a, len);
+    _and_into(dst, b, len);
+}
+
+static size_t _popcount_bytes(const unsigned char* data, size_t len) {
+    size_t count = 0;
+    size_t i = 0;
+    for (; i + 8 <= len; i += 8) {
+        count += POPCOUNT64(_load_64(data + i));
+    }
+    for (; i < len; i++) {
+        count += POPCOUNT64(data[i]);
+    }
+    return count;
+}
+
+static bool _any_bytes(const unsigned char* data, size_t len) {
+    size_t i = 0;
+    for (; i + 8 <= len; i += 8) {
+        if (_load_64(data + i)) {
+            return true;
+        }
+    }
+    for (; i < len; i++) {
+        if (data[i]) {
+            return true;
+        }
+    }
+    return false;
+}
+
+/* Writes the indexes of the turned on bits of the big endian word, returns their number */
+static inline size_t _emit_word(uint64_t word, size_t bit_base, unsigned int* output) {
+    size_t emitted = 0;
+    while (word) {
+        size_t leading = CLZ64(word);
+        output[emitted++] = (unsigned int) (bit_base + leading);
+        word &= ~(UINT64_C(1) << (63 - leading));
+    }
+    return emitted;
+}
+
 
 typedef struct CompressedSeqIter {
     size_t pos;
@@ -23,6 +210,8 @@ typedef struct CompressedSeqIter {
 void CompressedSeqIter_read_control_byte(CompressedSeqIter* seq_iter) {
     if (seq_iter->pos >= (size_t) seq_iter->len) {
         seq_iter->stop_iteration = true;
+        seq_iter->remaining_bytes = 0;
+        return;
     }
     unsigned char* buffer = seq_iter->buffer;
     unsigned char byte = buffer[seq_iter->pos];
@@ -89,6 +278,27 @@ int CompressedSeqIter_next(CompressedSeqIter* seq_iter) {
     return ret_val;
 }
 
+/* ORs the next n decoded bytes of the sequence into the output and advances the iterator */
+void CompressedSeqIter_or_into(CompressedSeqIter* seq_iter, unsigned char* output, size_t n) {
+    while (n > 0) {
+        while (!seq_iter->stop_iteration && seq_iter->remaining_bytes == 0) {
+            CompressedSeqIter_read_control_byte(seq_iter);
+        }
+        if (seq_iter->stop_iteration) {
+            return;
+        }
+        size_t taken = seq_iter->remaining_bytes < n ? seq_iter->remaining_bytes : n;
+        if (seq_iter->is_noise) {
+            _or_into(output, seq_iter->buffer + seq_iter->pos, taken);
+        } else if (seq_iter->fill_type == 0xFF) {
+            memset(output, 0xFF, taken);
+        }
+        CompressedSeqIter_seek(seq_iter, taken);
+        output += taken;
+        n -= taken;
+    }
+}
+
 size_t CompressedSeqIter_seekable_bytes(CompressedSeqIter* seq_iter) {
     if (seq_iter->is_noise || seq_iter->fill_type == 0xFF) {
         return 0;
@@ -96,6 +306,33 @@ size_t CompressedSeqIter_seekable_bytes(CompressedSeqIter* seq_iter) {
     return seq_iter->remaining_bytes;
 }
 
+/* Number of decoded bytes of the compressed sequence */
+size_t _decoded_len(const unsigned char* buffer, size_t len) {
+    size_t pos = 0;
+    size_t decoded_len = 0;
+    while (pos < len) {
+        unsigned char byte = buffer[pos];
+        size_t bytes_count;
+        if (byte >> 7) {
+            bytes_count = byte & 0x3F;
+            if ((byte >> 6) & 1) {
+                pos++;
+                bytes_count = (bytes_count << 8) | buffer[pos];
+            }
+            pos += bytes_count;
+        } else {
+            bytes_count = byte & 0x1F;
+            if ((byte >> 5) & 1) {
+                pos++;
+                bytes_count = (bytes_count << 8) | buffer[pos];
+            }
+        }
+        pos++;
+        decoded_len += bytes_count;
+    }
+    return decoded_len;
+}
+
 bool _check_request(int request) {
     if (request != GET_LIST && request != GET_COUNT && request != IS_EXIST) {
         PyErr_SetString(PyExc_ValueError, "Selected mode should be GET_LIST=0, GET_COUNT=1, IS_EXIST=2");
@@ -104,107 +341,259 @@ bool _check_request(int request) {
     return true;
 }
 
-PyObject* _calc_bit_index_result(int request,
-                                 CompressedSeqIter* seq_iters,
-                                 size_t iters_num,
-                                 unsigned int alloc_size) {
-    unsigned int *result_list_native = NULL;
-    if (request == GET_LIST) {
-        result_list_native = malloc(sizeof(unsigned int) * alloc_size);
-        if (NULL == result_list_native) {
-            PyErr_SetString(PyExc_MemoryError, "Cannot allocate result list");
-            return NULL;
+/*
+ * AND of any number of compressed sequences. The buffers of the sequences are held until the
+ * operands are released, thus the operands may outlive the call which created them.
+ */
+typedef struct SeqOperands {
+    CompressedSeqIter* iters;
+    Py_buffer* buffers;
+    unsigned char* scratch;
+    size_t num;
+    size_t byte_index;
+} SeqOperands;
+
+void SeqOperands_release(SeqOperands* operands) {
+    if (NULL != operands->buffers) {
+        for (size_t i = 0; i < operands->num; i++) {
+            PyBuffer_Release(&operands->buffers[i]);
         }
     }
-    int iter_results[MAX_ITERS]; 
-    bool value_exists = false;
-    int byte_index = 0;
-    size_t result_index = 0;
-    while(1) {
-        for (size_t i = 0; i < iters_num; i++) {
-            iter_results[i] = CompressedSeqIter_next(&seq_iters[i]);
+    free(operands->buffers);
+    free(operands->iters);
+    free(operands->scratch);
+    operands->buffers = NULL;
+    operands->iters = NULL;
+    operands->scratch = NULL;
+    operands->num = 0;
+}
+
+bool SeqOperands_init(SeqOperands* operands, PyObject* sequence_of_buffers, size_t min_num) {
+    operands->iters = NULL;
+    operands->buffers = NULL;
+    operands->scratch = NULL;
+    operands->num = 0;
+    operands->byte_index = 0;
+    PyObject* buffers_seq = PySequence_Fast(sequence_of_buffers, "Expected a sequence of buffers");
+    if (NULL == buffers_seq) {
+        return false;
+    }
+    size_t buffers_num = (size_t) PySequence_Fast_GET_SIZE(buffers_seq);
+    if (buffers_num < min_num) {
+        Py_DECREF(buffers_seq);
+        PyErr_Format(PyExc_BufferError, "Too few buffers to process, should be at least %zu", min_num);
+        return false;
+    }
+    operands->iters = malloc(sizeof(CompressedSeqIter) * buffers_num);
+    operands->buffers = malloc(sizeof(Py_buffer) * buffers_num);
+    operands->scratch = buffers_num > 1 ? malloc(MAX_NOISE_RUN) : NULL;
+    if (NULL == operands->iters || NULL == operands->buffers || (buffers_num > 1 && NULL == operands->scratch)) {
+        Py_DECREF(buffers_seq);
+        SeqOperands_release(operands);
+        PyErr_SetString(PyExc_MemoryError, "Cannot allocate buffers iterators");
+        return false;
+    }
+    for (size_t i = 0; i < buffers_num; i++) {
+        if (PyObject_GetBuffer(PySequence_Fast_GET_ITEM(buffers_seq, i), &operands->buffers[i], PyBUF_SIMPLE) < 0) {
+            Py_DECREF(buffers_seq);
+            SeqOperands_release(operands);
+            return false;
         }
-        if (iter_results[0] < 0) {
-            break;
+        operands->num++;
+        CompressedSeqIter_new(&operands->iters[i], &operands->buffers[i]);
+    }
+    Py_DECREF(buffers_seq);
+    return true;
+}
+
+/*
+ * The operands are merged run by run: a span is a range of bytes in which every operand stays in
+ * one run. A zero fill of any operand skips the span at once, when all operands are ones fills the
+ * span is ones, otherwise the noise runs are AND-ed a machine word (or a SIMD register) at a time.
+ */
+enum SpanType {SPAN_ZEROS, SPAN_ONES, SPAN_NOISE};
+
+typedef struct SeqSpan {
+    enum SpanType type;
+    size_t byte_index;
+    size_t len;
+    const unsigned char* data;
+} SeqSpan;
+
+/* Produces the next span of AND of the operands. Returns false if the operands are exhausted. */
+bool SeqOperands_next_span(SeqOperands* operands, SeqSpan* span) {
+    CompressedSeqIter* seq_iters = operands->iters;
+    size_t iters_num = operands->num;
+    size_t zeros_len = 0;
+    size_t span_len = SIZE_MAX;
+    size_t noise_num = 0;
+    const unsigned char* noise_data = NULL;
+    for (size_t i = 0; i < iters_num; i++) {
+        CompressedSeqIter* seq_iter = &seq_iters[i];
+        while (!seq_iter->stop_iteration && seq_iter->remaining_bytes == 0) {
+            CompressedSeqIter_read_control_byte(seq_iter);
         }
-        unsigned char byte = (unsigned char)iter_results[0];
-        unsigned char all_merged_bytes = (unsigned char)iter_results[0];
-        for (size_t i = 1; i < iters_num; i++) {
-            byte &= iter_results[i];
-            all_merged_bytes |= iter_results[i];
+        if (seq_iter->stop_iteration) {
+            return false;
         }
-        if (all_merged_bytes == 0) {
-            int max_seekable_bytes = -1;
+        if (!seq_iter->is_noise && seq_iter->fill_type == 0x00) {
+            if (seq_iter->remaining_bytes > zeros_len) {
+                zeros_len = seq_iter->remaining_bytes;
+            }
+            continue;
+        }
+        if (seq_iter->remaining_bytes < span_len) {
+            span_len = seq_iter->remaining_bytes;
+        }
+        if (seq_iter->is_noise) {
+            noise_num++;
+            noise_data = seq_iter->buffer + seq_iter->pos;
+        }
+    }
+    span->byte_index = operands->byte_index;
+    if (zeros_len > 0) {
+        span->type = SPAN_ZEROS;
+        span->len = zeros_len;
+    } else if (noise_num == 0) {
+        span->type = SPAN_ONES;
+        span->len = span_len;
+    } else {
+        span->type = SPAN_NOISE;
+        span->len = span_len;
+        if (noise_num == 1) {
+            span->data = noise_data;
+        } else {
+            const unsigned char* first = NULL;
+            bool merged = false;
             for (size_t i = 0; i < iters_num; i++) {
-                int seekable_bytes = (int)CompressedSeqIter_seekable_bytes(&seq_iters[i]);
-                if (seekable_bytes > max_seekable_bytes) {
-                    max_seekable_bytes = seekable_bytes;
+                CompressedSeqIter* seq_iter = &seq_iters[i];
+                if (!seq_iter->is_noise) {
+                    continue;
                 }
-            }
-            if (max_seekable_bytes > 0) {
-                byte_index += max_seekable_bytes;
-                for (size_t i = 0; i < iters_num; i++) {
-                    CompressedSeqIter_seek(&seq_iters[i], (size_t) max_seekable_bytes);
+                const unsigned char* data = seq_iter->buffer + seq_iter->pos;
+                if (NULL == first) {
+                    first = data;
+                } else if (!merged) {
+                    _and_to(operands->scratch, first, data, span_len);
+                    merged = true;
+                } else {
+                    _and_into(operands->scratch, data, span_len);
                 }
             }
+            span->data = operands->scratch;
         }
-        if (byte != 0) {
-            for (int bit_num = 7; bit_num >= 0; bit_num--) {
-                if ((byte >> bit_num) & 1) {
-                    unsigned int output_val = byte_index * 8 + (7 - bit_num);
-                    if (IS_EXIST == request) {
-                        value_exists = true;
-                        goto end_of_loop;
-                    }
-                    if (result_index == alloc_size) {
-                        if (request == GET_LIST) {
-                            free(result_list_native);
-                        }
-                        PyErr_SetString(PyExc_MemoryError, "The number of results greater than allocated size");
-                        return NULL;
-                    }
-                    if (request == GET_LIST) {
-                        result_list_native[result_index] = output_val;
-                    }
-                    result_index++;
-                }
+    }
+    for (size_t i = 0; i < iters_num; i++) {
+        CompressedSeqIter_seek(&seq_iters[i], span->len);
+    }
+    operands->byte_index += span->len;
+    return true;
+}
+
+/* Big endian word of up to 8 bytes of the span from the offset, n is set to the number of bytes */
+static inline uint64_t _span_word(const SeqSpan* span, size_t offset, size_t* n) {
+    size_t remaining = span->len - offset;
+    *n = remaining < 8 ? remaining : 8;
+    if (span->type == SPAN_ONES) {
+        return _ones_be64(*n);
+    }
+    return _load_be64(span->data + offset, *n);
+}
+
+/*
+ * Result of an intersection collected by pure C code. It does not touch Python objects, thus it
+ * runs with the GIL released; Python objects are built from it after the GIL is reacquired.
+ */
+typedef struct BitIndexResult {
+    unsigned int* indexes;
+    size_t count;
+    bool exists;
+    bool out_of_memory;
+} BitIndexResult;
+
+void _collect_bit_index_result(int request, SeqOperands* operands, unsigned int alloc_size,
+                               BitIndexResult* result) {
+    size_t result_capacity = 0;
+    SeqSpan span;
+    if (request == GET_LIST) {
+        // the allocation grows on demand, the provided size is only a hint
+        result_capacity = alloc_size < 64 ? 64 : (alloc_size > 4096 ? 4096 : alloc_size);
+        result->indexes = malloc(sizeof(unsigned int) * result_capacity);
+        if (NULL == result->indexes) {
+            result->out_of_memory = true;
+            return;
+        }
+    }
+    while (SeqOperands_next_span(operands, &span)) {
+        if (span.type == SPAN_ZEROS) {
+            continue;
+        }
+        if (IS_EXIST == request) {
+            if (span.type == SPAN_ONES || _any_bytes(span.data, span.len)) {
+                result->exists = true;
+                return;
+            }
+            continue;
+        }
+        if (GET_COUNT == request) {
+            result->count += span.type == SPAN_ONES ? span.len * 8 : _popcount_bytes(span.data, span.len);
+            continue;
+        }
+        if (result->count + span.len * 8 > result_capacity) {
+            size_t new_capacity = result_capacity * 2;
+            if (new_capacity < result->count + span.len * 8) {
+                new_capacity = result->count + span.len * 8;
+            }
+            unsigned int* new_indexes = realloc(result->indexes, sizeof(unsigned int) * new_capacity);
+            if (NULL == new_indexes) {
+                result->out_of_memory = true;
+                return;
             }
+            result->indexes = new_indexes;
+            result_capacity = new_capacity;
+        }
+        size_t n;
+        for (size_t offset = 0; offset < span.len; offset += n) {
+            uint64_t word = _span_word(&span, offset, &n);
+            result->count += _emit_word(word, (span.byte_index + offset) * 8, result->indexes + result->count);
         }
-        byte_index++;
     }
+}
 
-    end_of_loop:
+PyObject* _calc_bit_index_result(int request, SeqOperands* operands, unsigned int alloc_size) {
+    BitIndexResult result = {NULL, 0, false, false};
+    // the buffers are held by the operands, thus they stay valid while the GIL is released
+    Py_BEGIN_ALLOW_THREADS
+    _collect_bit_index_result(request, operands, alloc_size, &result);
+    Py_END_ALLOW_THREADS
+    if (result.out_of_memory) {
+        free(result.indexes);
+        PyErr_SetString(PyExc_MemoryError, "Cannot allocate result list");
+        return NULL;
+    }
 
     switch (request)
     {
     case IS_EXIST:
-        if (value_exists) Py_RETURN_TRUE;
-        Py_RETURN_FALSE;
+        return PyBool_FromLong(result.exists);
     case GET_COUNT:
-        return PyLong_FromLong(result_index);
+        return PyLong_FromSize_t(result.count);
     case GET_LIST:
-        PyObject* result_list = PyList_New(result_index);
+        PyObject* result_list = PyList_New(result.count);
         if (NULL == result_list) {
-            free(result_list_native);
-            PyErr_SetString(PyExc_MemoryError, "Cannot create result list");
+            free(result.indexes);
             return NULL;
         }
-        for (size_t i = 0; i < result_index; i++) {
-            PyObject* py_long = PyLong_FromLong(result_list_native[i]);
+        for (size_t i = 0; i < result.count; i++) {
+            PyObject* py_long = PyLong_FromUnsignedLong(result.indexes[i]);
             if (NULL == py_long) {
-                free(result_list_native);
-                PyErr_SetString(PyExc_MemoryError, "Cannot create result list element");
-                Py_CLEAR(result_list);
-            }
-            int set_res = PyList_SetItem(result_list, i, py_long);
-            if (set_res < 0) {
-                free(result_list_native);
+                free(result.indexes);
                 Py_CLEAR(result_list);
                 return NULL;
             }
+            PyList_SET_ITEM(result_list, i, py_long);
         }
-        free(result_list_native);
-
+        free(result.indexes);
         return result_list;
     default:
         PyErr_SetString(PyExc_ValueError, "Impossible state. Selected mode should be GET_LIST=0, GET_COUNT=1, IS_EXIST=2");
@@ -212,6 +601,216 @@ PyObject* _calc_bit_index_result(int request,
     return NULL;
 }
 
+/*
+ * Expressions: AND of clauses, every clause is OR of its sequences, optionally negated (i.e.,
+ * AND NOT). All sequences are decoded in one pass, block by block, into the clause and the
+ * accumulator blocks. Bits at or beyond the number of bits are masked since negation turns on the
+ * padding bits of the sequences.
+ */
+#define EXPR_BLOCK 4096
+
+typedef struct ExprClause {
+    size_t first;
+    size_t num;
+    bool negated;
+} ExprClause;
+
+static void _clause_block(SeqOperands* operands, const ExprClause* clause, unsigned char* block, size_t n) {
+    memset(block, 0, n);
+    for (size_t i = clause->first; i < clause->first + clause->num; i++) {
+        CompressedSeqIter_or_into(&operands->iters[i], block, n);
+    }
+}
+
+static void _skip_clause(SeqOperands* operands, const ExprClause* clause, size_t n) {
+    for (size_t i = clause->first; i < clause->first + clause->num; i++) {
+        CompressedSeqIter_seek(&operands->iters[i], n);
+    }
+}
+
+void _collect_expr_result(int request, SeqOperands* operands, const ExprClause* clauses,
+                          size_t clauses_num, size_t bits_num, BitIndexResult* result) {
+    size_t total_len = _decoded_len(operands->buffers[0].buf, (size_t) operands->buffers[0].len);
+    if (total_len > (bits_num + 7) / 8) {
+        total_len = (bits_num + 7) / 8;
+    }
+    size_t result_capacity = 0;
+    unsigned char* acc = malloc(EXPR_BLOCK);
+    unsigned char* block = malloc(EXPR_BLOCK);
+    if (NULL == acc || NULL == block) {
+        result->out_of_memory = true;
+        goto done;
+    }
+    size_t n;
+    for (size_t block_start = 0; block_start < total_len; block_start += n) {
+        n = total_len - block_start < EXPR_BLOCK ? total_len - block_start : EXPR_BLOCK;
+        bool acc_set = false;
+        for (size_t c = 0; c < clauses_num; c++) {
+            if (clauses[c].negated) {
+                continue;
+            }
+            if (!acc_set) {
+                _clause_block(operands, &clauses[c], acc, n);
+                acc_set = true;
+            } else {
+                _clause_block(operands, &clauses[c], block, n);
+                _and_into(acc, block, n);
+            }
+        }
+        if (!acc_set) {
+            memset(acc, 0xFF, n);
+        }
+        bool any = _any_bytes(acc, n);
+        for (size_t c = 0; c < clauses_num; c++) {
+            if (!clauses[c].negated) {
+                continue;
+            }
+            if (any) {
+                _clause_block(operands, &clauses[c], block, n);
+                _andnot_into(acc, block, n);
+            } else {
+                _skip_clause(operands, &clauses[c], n);
+            }
+        }
+        if (!any) {
+            continue;
+        }
+        if ((block_start + n) * 8 > bits_num) {
+            size_t last = bits_num / 8 - block_start;
+            acc[last] &= (unsigned char) (0xFF << (8 - bits_num % 8));
+            memset(acc + last + 1, 0, n - last - 1);
+        }
+        if (IS_EXIST == request) {
+            if (_any_bytes(acc, n)) {
+                result->exists = true;
+                goto done;
+            }
+            continue;
+        }
+        if (GET_COUNT == request) {
+            result->count += _popcount_bytes(acc, n);
+            continue;
+        }
+        if (result->count + n * 8 > result_capacity) {
+            size_t new_capacity = result_capacity ? result_capacity * 2 : 64;
+            while (new_capacity < result->count + n * 8) {
+                new_capacity *= 2;
+            }
+            unsigned int* new_indexes = realloc(result->indexes, sizeof(unsigned int) * new_capacity);
+            if (NULL == new_indexes) {
+                result->out_of_memory = true;
+                goto done;
+            }
+            result->indexes = new_indexes;
+            result_capacity = new_capacity;
+        }
+        size_t taken;
+        for (size_t offset = 0; offset < n; offset += taken) {
+            taken = n - offset < 8 ? n - offset : 8;
+            uint64_t word = _load_be64(acc + offset, taken);
+            result->count += _emit_word(word, (block_start + offset) * 8, result->indexes + result->count);
+        }
+    }
+    done:
+    free(acc);
+    free(block);
+}
+
+static PyObject* bit_expr_index_native(PyObject* self, PyObject* args) {
+    PyObject* clauses_obj;
+    Py_ssize_t bits_num;
+    int request;
+
+    if (!PyArg_ParseTuple(args, "Oni", &clauses_obj, &bits_num, &request)) {
+        return NULL;
+    }
+    if (!_check_request(request)) {
+        return NULL;
+    }
+    if (bits_num < 0) {
+        PyErr_SetString(PyExc_ValueError, "Number of bits should not be negative");
+        return NULL;
+    }
+    PyObject* clauses_seq = PySequence_Fast(clauses_obj, "bit_expr_index_native expects a sequence of clauses");
+    if (NULL == clauses_seq) {
+        return NULL;
+    }
+    Py_ssize_t clauses_num = PySequence_Fast_GET_SIZE(clauses_seq);
+    ExprClause* clauses = malloc(sizeof(ExprClause) * (clauses_num ? clauses_num : 1));
+    PyObject* all_buffers = PyList_New(0);
+    SeqOperands operands = {NULL, NULL, NULL, 0, 0};
+    PyObject* result_obj = NULL;
+    if (NULL == clauses || NULL == all_buffers) {
+        if (NULL == clauses) {
+            PyErr_SetString(PyExc_MemoryError, "Cannot allocate clauses");
+        }
+        goto done;
+    }
+    for (Py_ssize_t c = 0; c < clauses_num; c++) {
+        PyObject* buffers;
+        int negated;
+        if (!PyArg_ParseTuple(PySequence_Fast_GET_ITEM(clauses_seq, c), "Op", &buffers, &negated)) {
+            goto done;
+        }
+        PyObject* buffers_seq = PySequence_Fast(buffers, "Clause should have a sequence of buffers");
+        if (NULL == buffers_seq) {
+            goto done;
+        }
+        Py_ssize_t buffers_num = PySequence_Fast_GET_SIZE(buffers_seq);
+        if (buffers_num < 1) {
+            Py_DECREF(buffers_seq);
+            PyErr_SetString(PyExc_BufferError, "Too few buffers in the clause, should be at least 1");
+            goto done;
+        }
+        clauses[c].first = (size_t) PyList_GET_SIZE(all_buffers);
+        clauses[c].num = (size_t) buffers_num;
+        clauses[c].negated = negated;
+        for (Py_ssize_t b = 0; b < buffers_num; b++) {
+            if (PyList_Append(all_buffers, PySequence_Fast_GET_ITEM(buffers_seq, b)) < 0) {
+                Py_DECREF(buffers_seq);
+                goto done;
+            }
+        }
+        Py_DECREF(buffers_seq);
+    }
+    if (!SeqOperands_init(&operands, all_buffers, 1)) {
+        goto done;
+    }
+
+    BitIndexResult result = {NULL, 0, false, false};
+    Py_BEGIN_ALLOW_THREADS
+    _collect_expr_result(request, &operands, clauses, (size_t) clauses_num, (size_t) bits_num, &result);
+    Py_END_ALLOW_THREADS
+    if (result.out_of_memory) {
+        free(result.indexes);
+        PyErr_SetString(PyExc_MemoryError, "Cannot allocate result list");
+        goto done;
+    }
+    if (IS_EXIST == request) {
+        result_obj = PyBool_FromLong(result.exists);
+    } else if (GET_COUNT == request) {
+        result_obj = PyLong_FromSize_t(result.count);
+    } else {
+        result_obj = PyList_New(result.count);
+        for (size_t i = 0; NULL != result_obj && i < result.count; i++) {
+            PyObject* py_long = PyLong_FromUnsignedLong(result.indexes[i]);
+            if (NULL == py_long) {
+                Py_CLEAR(result_obj);
+                break;
+            }
+            PyList_SET_ITEM(result_obj, i, py_long);
+        }
+        free(result.indexes);
+    }
+
+    done:
+    SeqOperands_release(&operands);
+    Py_XDECREF(all_buffers);
+    free(clauses);
+    Py_DECREF(clauses_seq);
+    return result_obj;
+}
+
 static PyObject* bit_index_native(PyObject* self, PyObject* args) {
     PyObject* compressed_seq;
     unsigned int alloc_size;
@@ -225,23 +824,19 @@ static PyObject* bit_index_native(PyObject* self, PyObject* args) {
         return NULL;
     }
 
-
-    Py_buffer buffer;
-    if (PyObject_GetBuffer(compressed_seq, &buffer, PyBUF_SIMPLE) < 0) {
+    PyObject* operands_tuple = PyTuple_Pack(1, compressed_seq);
+    if (NULL == operands_tuple) {
         return NULL;
     }
-
-    CompressedSeqIter seq_iter;
-    CompressedSeqIter_new(&seq_iter, &buffer);
-
-    PyBuffer_Release(&buffer);
-
-    return _calc_bit_index_result(
-        request,
-        &seq_iter,
-        1,
-        alloc_size
-    );
+    SeqOperands operands;
+    bool initialized = SeqOperands_init(&operands, operands_tuple, 1);
+    Py_DECREF(operands_tuple);
+    if (!initialized) {
+        return NULL;
+    }
+    PyObject* result = _calc_bit_index_result(request, &operands, alloc_size);
+    SeqOperands_release(&operands);
+    return result;
 }
 
 
@@ -250,7 +845,7 @@ static PyObject* bit_and_op_index_native(PyObject* self, PyObject* args) {
     PyObject* iterable_of_buffers;
     unsigned int alloc_size;
     int request;
-    
+
     if (!PyArg_ParseTuple(args, "OIi", &iterable_of_buffers, &alloc_size, &request)) {
         return NULL;
     }
@@ -258,60 +853,353 @@ static PyObject* bit_and_op_index_native(PyObject* self, PyObject* args) {
     if (!_check_request(request)) {
         return NULL;
     }
-    
 
     if (!PySequence_Check(iterable_of_buffers)) {
         PyErr_SetString(PyExc_TypeError, "bit_and_op_index_native expects a sequence");
         return NULL;
     }
 
-    size_t iters_num = 0;
-    CompressedSeqIter seq_iters[MAX_ITERS];
+    SeqOperands operands;
+    if (!SeqOperands_init(&operands, iterable_of_buffers, 2)) {
+        return NULL;
+    }
+    PyObject* result = _calc_bit_index_result(request, &operands, alloc_size);
+    SeqOperands_release(&operands);
+    return result;
+}
+
+/*
+ * Iterator over the indexes of the turned on bits of AND of compressed sequences. The indexes are
+ * decoded lazily in chunks, thus a consumer which stops early does not pay for the rest.
+ */
+typedef struct BitIndexIterator {
+    PyObject_HEAD
+    SeqOperands operands;
+    SeqSpan span;
+    size_t span_offset;
+    unsigned int* chunk;
+    size_t chunk_size;
+    size_t chunk_len;
+    size_t chunk_pos;
+    bool exhausted;
+    bool running;
+} BitIndexIterator;
 
-    PyObject *iter = PyObject_GetIter(iterable_of_buffers);
-    if (NULL == iter) {
+static void BitIndexIterator_dealloc(BitIndexIterator* self) {
+    SeqOperands_release(&self->operands);
+    free(self->chunk);
+    Py_TYPE(self)->tp_free((PyObject*) self);
+}
+
+static PyObject* BitIndexIterator_new(PyTypeObject* type, PyObject* args, PyObject* kwds) {
+    static char* kwlist[] = {"buffers", "chunk_size", NULL};
+    PyObject* buffers;
+    Py_ssize_t chunk_size = 256;
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|n", kwlist, &buffers, &chunk_size)) {
+        return NULL;
+    }
+    if (chunk_size < 1) {
+        PyErr_SetString(PyExc_ValueError, "Chunk size should be positive");
         return NULL;
     }
+    BitIndexIterator* self = (BitIndexIterator*) type->tp_alloc(type, 0);
+    if (NULL == self) {
+        return NULL;
+    }
+    self->chunk = NULL;
+    self->operands.iters = NULL;
+    self->operands.buffers = NULL;
+    self->operands.scratch = NULL;
+    self->operands.num = 0;
+    if (!SeqOperands_init(&self->operands, buffers, 1)) {
+        Py_DECREF(self);
+        return NULL;
+    }
+    self->chunk_size = (size_t) chunk_size;
+    // a word may emit up to 64 indexes beyond the chunk size
+    self->chunk = malloc(sizeof(unsigned int) * (self->chunk_size + 64));
+    if (NULL == self->chunk) {
+        Py_DECREF(self);
+        PyErr_SetString(PyExc_MemoryError, "Cannot allocate chunk");
+        return NULL;
+    }
+    self->chunk_len = 0;
+    self->chunk_pos = 0;
+    self->span.len = 0;
+    self->span_offset = 0;
+    self->exhausted = false;
+    self->running = false;
+    return (PyObject*) self;
+}
 
-    for (PyObject *next; (next = PyIter_Next(iter)) != NULL;) {
+static void BitIndexIterator_fill_chunk(BitIndexIterator* self) {
+    SeqSpan* span = &self->span;
+    size_t n;
+    self->chunk_len = 0;
+    self->chunk_pos = 0;
+    while (self->chunk_len < self->chunk_size) {
+        if (self->span_offset == span->len) {
+            if (!SeqOperands_next_span(&self->operands, span)) {
+                self->exhausted = true;
+                break;
+            }
+            self->span_offset = span->type == SPAN_ZEROS ? span->len : 0;
+            continue;
+        }
+        uint64_t word = _span_word(span, self->span_offset, &n);
+        self->chunk_len += _emit_word(word, (span->byte_index + self->span_offset) * 8,
+                                      self->chunk + self->chunk_len);
+        self->span_offset += n;
+    }
+}
 
-        Py_buffer buffer;
-        if (PyObject_GetBuffer(next, &buffer, PyBUF_SIMPLE) < 0) {
-            Py_DECREF(next);
-            Py_DECREF(iter);
+static PyObject* BitIndexIterator_iternext(BitIndexIterator* self) {
+    /* the chunk is refilled without the GIL, other threads must not touch it meanwhile */
+    if (self->running) {
+        PyErr_SetString(PyExc_ValueError, "BitIndexIterator is already running");
+        return NULL;
+    }
+    if (self->chunk_pos == self->chunk_len) {
+        if (self->exhausted) {
             return NULL;
         }
-        if (iters_num == MAX_ITERS) {
-            PyBuffer_Release(&buffer);
-            Py_DECREF(next);
-            Py_DECREF(iter);
-            PyErr_SetString(PyExc_BufferError, "Too many buffers to process");
+        self->running = true;
+        Py_BEGIN_ALLOW_THREADS
+        BitIndexIterator_fill_chunk(self);
+        Py_END_ALLOW_THREADS
+        self->running = false;
+        if (self->chunk_len == 0) {
             return NULL;
         }
-        CompressedSeqIter_new(&seq_iters[iters_num], &buffer);
-        iters_num++;
+    }
+    return PyLong_FromUnsignedLong(self->chunk[self->chunk_pos++]);
+}
 
-        PyBuffer_Release(&buffer);
-        Py_DECREF(next);
+static PyTypeObject BitIndexIteratorType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "compressed_seq.BitIndexIterator",
+    .tp_doc = "Lazy iterator over the bit indexes of AND of compressed sequences",
+    .tp_basicsize = sizeof(BitIndexIterator),
+    .tp_itemsize = 0,
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_new = BitIndexIterator_new,
+    .tp_dealloc = (destructor) BitIndexIterator_dealloc,
+    .tp_iter = PyObject_SelfIter,
+    .tp_iternext = (iternextfunc) BitIndexIterator_iternext,
+};
+
+/*
+ * Batched lookups. The buffer of every compressed sequence which appears in the batch is acquired
+ * only once, the patterns are merged run by run (see SeqOperands_next_span) one after another.
+ */
+
+typedef struct BufferCache {
+    Py_buffer* buffers;
+    size_t size;
+    size_t capacity;
+} BufferCache;
+
+void BufferCache_free(BufferCache* cache) {
+    for (size_t i = 0; i < cache->size; i++) {
+        PyBuffer_Release(&cache->buffers[i]);
     }
-    Py_DECREF(iter);
+    free(cache->buffers);
+    cache->buffers = NULL;
+    cache->size = 0;
+    cache->capacity = 0;
+}
 
-    if (iters_num < 2) {
-        PyErr_SetString(PyExc_BufferError, "Too few buffers to process, should be at least 2");
+/* Returns the position of the buffer of the object in the cache or -1 on error */
+Py_ssize_t BufferCache_get(BufferCache* cache, PyObject* obj) {
+    Py_buffer buffer;
+    if (PyObject_GetBuffer(obj, &buffer, PyBUF_SIMPLE) < 0) {
+        return -1;
+    }
+    for (size_t i = 0; i < cache->size; i++) {
+        if (cache->buffers[i].buf == buffer.buf) {
+            PyBuffer_Release(&buffer);
+            return (Py_ssize_t) i;
+        }
+    }
+    if (cache->size == cache->capacity) {
+        size_t new_capacity = cache->capacity ? cache->capacity * 2 : 16;
+        Py_buffer* buffers = realloc(cache->buffers, sizeof(Py_buffer) * new_capacity);
+        if (NULL == buffers) {
+            PyBuffer_Release(&buffer);
+            PyErr_SetString(PyExc_MemoryError, "Cannot allocate buffers cache");
+            return -1;
+        }
+        cache->buffers = buffers;
+        cache->capacity = new_capacity;
+    }
+    cache->buffers[cache->size] = buffer;
+    return (Py_ssize_t) cache->size++;
+}
+
+/*
+ * Counts (or checks existence of) the turned on bits of AND of the cached buffers of a pattern.
+ * The operands are borrowed: their iterators and scratch are reused by all patterns and their
+ * buffers belong to the cache. Does not touch Python objects.
+ */
+size_t _and_pattern(SeqOperands* operands, BufferCache* cache, const Py_ssize_t* seq_positions,
+                    size_t seqs_num, int request, bool* out_of_memory) {
+    BitIndexResult result = {NULL, 0, false, false};
+    operands->num = seqs_num;
+    operands->byte_index = 0;
+    for (size_t i = 0; i < seqs_num; i++) {
+        CompressedSeqIter_new(&operands->iters[i], &cache->buffers[seq_positions[i]]);
+    }
+    _collect_bit_index_result(request, operands, 0, &result);
+    *out_of_memory = result.out_of_memory;
+    return IS_EXIST == request ? (size_t) result.exists : result.count;
+}
+
+static PyObject* bit_and_op_index_batch_native(PyObject* self, PyObject* args) {
+    PyObject* patterns;
+    int request;
+    int stop_on_empty = 0;
+
+    if (!PyArg_ParseTuple(args, "Oi|p", &patterns, &request, &stop_on_empty)) {
+        return NULL;
+    }
+    if (request != GET_COUNT && request != IS_EXIST) {
+        PyErr_SetString(PyExc_ValueError, "Selected mode should be GET_COUNT=1, IS_EXIST=2");
+        return NULL;
+    }
+    PyObject* patterns_seq = PySequence_Fast(patterns, "bit_and_op_index_batch_native expects a sequence of patterns");
+    if (NULL == patterns_seq) {
         return NULL;
     }
+    Py_ssize_t patterns_num = PySequence_Fast_GET_SIZE(patterns_seq);
+    PyObject* result_list = NULL;
 
-    return _calc_bit_index_result(
-        request,
-        seq_iters,
-        iters_num,
-        alloc_size
-    );
+    BufferCache cache = {NULL, 0, 0};
+    // borrowed operands, see _and_pattern
+    SeqOperands operands = {NULL, NULL, NULL, 0, 0};
+    size_t max_seqs_num = 1;
+    // positions of the sequences of all patterns, the pattern p spans [offsets[p], offsets[p + 1])
+    Py_ssize_t* pattern_seqs = NULL;
+    size_t pattern_seqs_len = 0;
+    size_t pattern_seqs_capacity = 0;
+    size_t* offsets = malloc(sizeof(size_t) * (patterns_num + 1));
+    size_t* results = malloc(sizeof(size_t) * (patterns_num ? patterns_num : 1));
+    if (NULL == offsets || NULL == results) {
+        PyErr_SetString(PyExc_MemoryError, "Cannot allocate patterns");
+        goto error;
+    }
+
+    for (Py_ssize_t p = 0; p < patterns_num; p++) {
+        PyObject* buffers = PySequence_Fast(PySequence_Fast_GET_ITEM(patterns_seq, p), "Pattern should be a sequence of buffers");
+        if (NULL == buffers) {
+            goto error;
+        }
+        Py_ssize_t buffers_num = PySequence_Fast_GET_SIZE(buffers);
+        if (buffers_num < 1) {
+            Py_DECREF(buffers);
+            PyErr_SetString(PyExc_BufferError, "Too few buffers to process, should be at least 1");
+            goto error;
+        }
+        if ((size_t) buffers_num > max_seqs_num) {
+            max_seqs_num = (size_t) buffers_num;
+        }
+        if (pattern_seqs_len + (size_t) buffers_num > pattern_seqs_capacity) {
+            size_t new_capacity = pattern_seqs_capacity ? pattern_seqs_capacity * 2 : 64;
+            while (new_capacity < pattern_seqs_len + (size_t) buffers_num) {
+                new_capacity *= 2;
+            }
+            Py_ssize_t* new_pattern_seqs = realloc(pattern_seqs, sizeof(Py_ssize_t) * new_capacity);
+            if (NULL == new_pattern_seqs) {
+                Py_DECREF(buffers);
+                PyErr_SetString(PyExc_MemoryError, "Cannot allocate pattern sequences");
+                goto error;
+            }
+            pattern_seqs = new_pattern_seqs;
+            pattern_seqs_capacity = new_capacity;
+        }
+        offsets[p] = pattern_seqs_len;
+        for (Py_ssize_t b = 0; b < buffers_num; b++) {
+            Py_ssize_t seq_position = BufferCache_get(&cache, PySequence_Fast_GET_ITEM(buffers, b));
+            if (seq_position < 0) {
+                Py_DECREF(buffers);
+                goto error;
+            }
+            pattern_seqs[pattern_seqs_len++] = seq_position;
+        }
+        Py_DECREF(buffers);
+    }
+    offsets[patterns_num] = pattern_seqs_len;
+
+    operands.iters = malloc(sizeof(CompressedSeqIter) * max_seqs_num);
+    operands.scratch = malloc(MAX_NOISE_RUN);
+    if (NULL == operands.iters || NULL == operands.scratch) {
+        PyErr_SetString(PyExc_MemoryError, "Cannot allocate buffers iterators");
+        goto error;
+    }
+
+    bool out_of_memory = false;
+    Py_ssize_t processed = 0;
+    Py_BEGIN_ALLOW_THREADS
+    while (processed < patterns_num && !out_of_memory) {
+        size_t result = _and_pattern(&operands, &cache, pattern_seqs + offsets[processed],
+                                     offsets[processed + 1] - offsets[processed], request,
+                                     &out_of_memory);
+        results[processed++] = result;
+        if (stop_on_empty && 0 == result) {
+            break;
+        }
+    }
+    Py_END_ALLOW_THREADS
+    if (out_of_memory) {
+        PyErr_SetString(PyExc_MemoryError, "Cannot allocate result");
+        goto error;
+    }
+
+    result_list = PyList_New(processed);
+    if (NULL == result_list) {
+        goto error;
+    }
+    for (Py_ssize_t p = 0; p < processed; p++) {
+        PyObject* py_result;
+        if (IS_EXIST == request) {
+            py_result = PyBool_FromLong((long) results[p]);
+        } else {
+            py_result = PyLong_FromSize_t(results[p]);
+        }
+        if (NULL == py_result) {
+            goto error;
+        }
+        PyList_SET_ITEM(result_list, p, py_result);
+    }
+
+    free(operands.iters);
+    free(operands.scratch);
+    free(offsets);
+    free(results);
+    free(pattern_seqs);
+    BufferCache_free(&cache);
+    Py_DECREF(patterns_seq);
+    return result_list;
+
+    error:
+    free(operands.iters);
+    free(operands.scratch);
+    free(offsets);
+    free(results);
+    free(pattern_seqs);
+    BufferCache_free(&cache);
+    Py_DECREF(patterns_seq);
+    Py_XDECREF(result_list);
+    return NULL;
 }
 
 static PyMethodDef methods[] = {
     {"bit_index_native", bit_index_native, METH_VARARGS, "Bit index"},
     {"bit_and_op_index_native", bit_and_op_index_native, METH_VARARGS, "Bit indexes with operator"},
+    {"bit_and_op_index_batch_native", bit_and_op_index_batch_native, METH_VARARGS,
+     "Counts or existence flags of many AND patterns in one call, optionally stopped on the first "
+     "pattern without matches"},
+    {"bit_expr_index_native", bit_expr_index_native, METH_VARARGS,
+     "Bit indexes of AND of OR-ed (optionally negated) clauses"},
     {NULL, NULL, 0, NULL}
 };
 
@@ -323,5 +1211,18 @@ static PyModuleDef compressed_seq = {
 };
 
 PyMODINIT_FUNC PyInit_compressed_seq() {
-    return PyModule_Create(&compressed_seq);
+    if (PyType_Ready(&BitIndexIteratorType) < 0) {
+        return NULL;
+    }
+    PyObject* module = PyModule_Create(&compressed_seq);
+    if (NULL == module) {
+        return NULL;
+    }
+    Py_INCREF(&BitIndexIteratorType);
+    if (PyModule_AddObject(module, "BitIndexIterator", (PyObject*) &BitIndexIteratorType) < 0) {
+        Py_DECREF(&BitIndexIteratorType);
+        Py_DECREF(module);
+        return NULL;
+    }
+    return module;
 }
\ No newline at end of file
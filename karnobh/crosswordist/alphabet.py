@@ -0,0 +1,123 @@
+"""
+This module contains the alphabet coding layer. Every letter of a configured alphabet is mapped to
+a small integer (a letter code) which is the position of the letter in the alphabet. Index lookups
+and the solver work with the letter codes, strings are built only at the edges (i.e., rendering
+and dumping of the index).
+
+Examples:
+    >>> abc = Alphabet("ABC")
+    >>> abc.code('C')
+    2
+    >>> abc.letter(1)
+    'B'
+    >>> list(abc.encode("CAB"))
+    [2, 0, 1]
+    >>> abc.decode([1, 0, 2])
+    'BAC'
+    >>> abc.encode_mapping({0: 'B', 2: 1})
+    {0: 1, 2: 1}
+    >>> abc.encode("CAT")
+    Traceback (most recent call last):
+    ...
+    KeyError: 'T'
+"""
+
+LATIN_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+class AlphabetError(Exception):
+    pass
+
+
+class Alphabet:
+    """
+    Bidirectional mapping between letters and their integer codes.
+    """
+
+    def __init__(self, letters):
+        super().__init__()
+        letters = "".join(letters)
+        if len(set(letters)) != len(letters):
+            raise AlphabetError(f"Alphabet '{letters}' contains duplicated letters")
+        self._letters = letters
+        self._codes = {letter: code for code, letter in enumerate(letters)}
+        # alphabets of single byte letters are translated in bulk by bytes.translate
+        self._translatable = len(letters) <= 256 and all(ord(letter) < 256 for letter in letters)
+        if self._translatable:
+            self._encode_table = bytes(self._codes.get(chr(b), 0) for b in range(256))
+            # bytes of the letters which are not in the alphabet are deleted by the translation
+            self._encode_delete = bytes(b for b in range(256) if chr(b) not in self._codes)
+            self._decode_table = bytes(ord(letters[c]) if c < len(letters) else 0
+                                       for c in range(256))
+
+    @staticmethod
+    def of(letters) -> 'Alphabet':
+        if isinstance(letters, Alphabet):
+            return letters
+        return Alphabet(letters)
+
+    @property
+    def letters(self) -> str:
+        return self._letters
+
+    def code(self, letter: str) -> int:
+        return self._codes[letter]
+
+    def letter(self, code: int) -> str:
+        return self._letters[code]
+
+    def to_code(self, letter) -> int:
+        """
+        :param letter: either a letter or already a letter code
+        :return: letter code
+        """
+        if isinstance(letter, int):
+            return letter
+        return self._codes[letter]
+
+    def encode(self, word: str):
+        """
+        :param word: word in the letters of the alphabet
+        :return: sequence of the letter codes (bytes if the codes fit into a byte)
+        """
+        if self._translatable:
+            try:
+                codes = word.encode('latin-1').translate(self._encode_table, self._encode_delete)
+            except UnicodeEncodeError:
+                codes = b''
+            if len(codes) != len(word):
+                raise KeyError(next(letter for letter in word if letter not in self._codes))
+            return codes
+        letter_codes = [self._codes[letter] for letter in word]
+        return bytes(letter_codes) if len(self._letters) <= 256 else tuple(letter_codes)
+
+    def decode(self, codes) -> str:
+        if self._translatable:
+            return bytes(codes).translate(self._decode_table).decode('latin-1')
+        return "".join(self._letters[code] for code in codes)
+
+    def encode_mapping(self, mapping: dict) -> dict[int, int]:
+        return {pos: self.to_code(letter) for pos, letter in mapping.items()}
+
+    def __len__(self):
+        return len(self._letters)
+
+    def __iter__(self):
+        return iter(self._letters)
+
+    def __contains__(self, letter):
+        return letter in self._codes
+
+    def __eq__(self, other):
+        if isinstance(other, Alphabet):
+            return self._letters == other._letters
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self._letters)
+
+    def __str__(self):
+        return self._letters
+
+    def __repr__(self):
+        return f"Alphabet('{self._letters}')"
@@ -17,87 +17,110 @@ Encoding Scheme:
   11XX XXXX XXXX XXXX -> Long sequence
 """
 
-import operator
+import bisect
 import functools
+import operator
+import re
+
+
+# the longest fill (0x00 or 0xFF) sequence encoded by one control
+MAX_FILL_BYTES = 0x1FFF
+# the longest noise sequence encoded by one control
+MAX_NOISE_BYTES = 0x3FFF
+
+# number of the decoded bytes between the checkpoints of a compressed bitmap
+CHECKPOINT_INTERVAL_BYTES = 1024
+
+# splits a sequence into noise sequences (possibly empty) separated by fill sequences
+_FILL_RUNS_SPLIT = re.compile(rb'(\x00+|\xff+)').split
+# single control bytes of the short sequences by their lengths
+_SHORT_NOISE_CONTROLS = [bytes((0x80 | count,)) for count in range(64)]
+_SHORT_FILL_CONTROLS = [[bytes(((fill_bit << 6) | count,)) for count in range(32)]
+                        for fill_bit in (0, 1)]
+
+
+def _emit_noise_bytes(compressed_seq, noise_bytes):
+    for start in range(0, len(noise_bytes), MAX_NOISE_BYTES):
+        chunk = noise_bytes[start:start + MAX_NOISE_BYTES]
+        if len(chunk) > 63:
+            compressed_seq += (0xC000 | len(chunk)).to_bytes(2, 'big')
+        else:
+            compressed_seq += _SHORT_NOISE_CONTROLS[len(chunk)]
+        compressed_seq += chunk
+
+
+def _emit_fill_bytes(compressed_seq, fill_bit, count):
+    while count:
+        chunk = min(count, MAX_FILL_BYTES)
+        if chunk > 31:
+            compressed_seq += (0x2000 | (fill_bit << 14) | chunk).to_bytes(2, 'big')
+        else:
+            compressed_seq += _SHORT_FILL_CONTROLS[fill_bit][chunk]
+        count -= chunk
 
 
 def compress(byte_sequence) -> bytearray:
-    """ This function compresses the byte sequence by the simplified algorithm
+    """ This function compresses the byte sequence by the simplified algorithm. Fill sequences are
+    found in bulk by a regular expression, noise sequences between them are copied as a whole.
 
     :param byte_sequence: the sequence of incoming bytes
     :return: compressed byte sequence
 
     See module description for the algorithm
+
+    Examples:
+        >>> compress(bytes.fromhex("0000001F1F") + b"\\xff" * 40).hex()
+        '03821f1f6028'
     """
-    fill_byte_type = 0
-    fill_byte_count = 0
-    noise_bytes = bytearray()
+    data = byte_sequence if isinstance(byte_sequence, (bytes, bytearray)) else bytes(byte_sequence)
+    parts = _FILL_RUNS_SPLIT(data)
     compressed_seq = bytearray()
-
-    def emmit_noise_bytes():
-        while nb_cnt := len(noise_bytes):
-            if nb_cnt > 16383:
-                noise_seq_control_bytes = bytes.fromhex('FF FF')
-                compressed_seq.extend(noise_seq_control_bytes)
-                compressed_seq.extend(noise_bytes[:16383])
-                del noise_bytes[:16383]  # does performance suffer?..
+    short_fill_controls = _SHORT_FILL_CONTROLS
+    short_noise_controls = _SHORT_NOISE_CONTROLS
+    parts_iter = iter(parts)
+    # parts are: noise, fill, noise, fill, ..., noise
+    for noise_bytes, fill_bytes in zip(parts_iter, parts_iter):
+        count = len(noise_bytes)
+        if count:
+            if count < 64:
+                compressed_seq += short_noise_controls[count]
+                compressed_seq += noise_bytes
             else:
-                if nb_cnt > 63:
-                    noise_seq_control_bytes = (0xC000 | nb_cnt).to_bytes(2, 'big')
-                else:
-                    noise_seq_control_bytes = (0x80 | nb_cnt).to_bytes(1, 'big')
-                compressed_seq.extend(noise_seq_control_bytes)
-                compressed_seq.extend(noise_bytes)
-                del noise_bytes[:nb_cnt]
-
-    def emmit_fill_bytes():
-        fb_cnt = fill_byte_count
-        fill_bit = fill_byte_type & 1
-        while fb_cnt:
-            if fb_cnt > 8191:
-                fill_seq_control_bytes = 0x3FFF | (fill_bit << 14)
-                compressed_seq.extend(fill_seq_control_bytes.to_bytes(2,
-                                                                      'big'))
-                fb_cnt -= 8191
-            else:
-                if fb_cnt > 31:
-                    fill_seq_control_bytes = ((0x2000 | (fill_bit << 14)) | fb_cnt).to_bytes(
-                        2,
-                        'big')
-                else:
-                    fill_seq_control_bytes = ((fill_bit << 6) | fb_cnt).to_bytes(1,
-                                                                                 'big')
-                compressed_seq.extend(fill_seq_control_bytes)
-                fb_cnt -= fb_cnt
-
-    for byte in byte_sequence:
-        if byte == 0x00 or byte == 0xFF:
-            if noise_bytes:
-                emmit_noise_bytes()
-            if fill_byte_count == 0:
-                fill_byte_type = byte
-                fill_byte_count = 1
-            elif fill_byte_type != byte:
-                emmit_fill_bytes()
-                fill_byte_type = byte
-                fill_byte_count = 1
-            else:
-                fill_byte_count += 1
+                _emit_noise_bytes(compressed_seq, noise_bytes)
+        count = len(fill_bytes)
+        if count < 32:
+            compressed_seq += short_fill_controls[fill_bytes[0] & 1][count]
         else:
-            if fill_byte_count != 0:
-                emmit_fill_bytes()
-                fill_byte_count = 0
-            noise_bytes.append(byte)
-    if noise_bytes:
-        emmit_noise_bytes()
-    elif fill_byte_count != 0:
-        emmit_fill_bytes()
+            _emit_fill_bytes(compressed_seq, fill_bytes[0] & 1, count)
+    if parts[-1]:
+        _emit_noise_bytes(compressed_seq, parts[-1])
     return compressed_seq
 
 
 FILL_TYPES = [0x00, 0xFF]
 
 
+def is_zero_fill(compressed_seq) -> bool:
+    """ Checks whether compressed byte sequence decodes only to zero bytes (i.e., no bit is on)
+
+    :param compressed_seq: compressed byte sequence
+    :return: True if the sequence consists only of the fill bytes of zeros
+
+    Examples:
+        >>> is_zero_fill(compress(bytes(10000)))
+        True
+        >>> is_zero_fill(compress(bytes(100) + b'\\x01'))
+        False
+    """
+    byte_index = 0
+    while byte_index < len(compressed_seq):
+        byte = compressed_seq[byte_index]
+        if byte >> 6:  # noise bytes or fill bytes of ones
+            return False
+        byte_index += 2 if (byte >> 5) & 1 else 1
+    return True
+
+
 class CompressedBitmap:
     """
     Simplified class wrapper for the byte sequence for decoding purposes of compressed
@@ -144,6 +167,50 @@ class CompressedBitmap:
                 byte_index += 1
 
 
+def build_checkpoints(compressed_seq,
+                      interval_bytes=CHECKPOINT_INTERVAL_BYTES) -> tuple[list, list]:
+    """ Builds the sparse checkpoint table of a compressed byte sequence. A checkpoint is the start
+    of a run (i.e., of a control byte), the first run starting at or after every interval of the
+    decoded bytes is a checkpoint.
+
+    :param compressed_seq: compressed byte sequence
+    :param interval_bytes: number of the decoded bytes between the checkpoints
+    :return: decoded offsets of the checkpoints and their compressed offsets, both ascending
+
+    Examples:
+        >>> seq = compress(bytes(10) + b"\x01" * 10 + bytes(10))
+        >>> build_checkpoints(seq, 8)
+        ([10, 20], [1, 12])
+        >>> build_checkpoints(seq, 100)
+        ([], [])
+    """
+    decoded_offsets, compressed_offsets = [], []
+    next_checkpoint = interval_bytes
+    decoded_offset = 0
+    byte_index = 0
+    seq_len = len(compressed_seq)
+    while byte_index < seq_len:
+        if decoded_offset >= next_checkpoint:
+            decoded_offsets.append(decoded_offset)
+            compressed_offsets.append(byte_index)
+            next_checkpoint = decoded_offset - decoded_offset % interval_bytes + interval_bytes
+        byte = compressed_seq[byte_index]
+        if byte >> 7:
+            bytes_count = byte & 0x3F
+            if (byte >> 6) & 1:
+                byte_index += 1
+                bytes_count = (bytes_count << 8) | compressed_seq[byte_index]
+            byte_index += 1 + bytes_count
+        else:
+            bytes_count = byte & 0x1F
+            if (byte >> 5) & 1:
+                byte_index += 1
+                bytes_count = (bytes_count << 8) | compressed_seq[byte_index]
+            byte_index += 1
+        decoded_offset += bytes_count
+    return decoded_offsets, compressed_offsets
+
+
 class CompressedBitmap2:
     """
     This class is a wrapper for decoding compressed byte sequence. In addition, the iterator
@@ -152,6 +219,9 @@ class CompressedBitmap2:
     indexes, if there is contiguous sequence of zeroes in one of them, all others may be sought
     in the number of such zeroes.
 
+    Long seeks jump to the last checkpoint before the target (see build_checkpoints) and walk the
+    runs only from there. The checkpoints are built once, on the first iteration of the bitmap.
+
     Examples:
         >>> bs = bytearray.fromhex("000000FFFF8888")
         >>> cbmp = CompressedBitmap2(bs)
@@ -163,19 +233,26 @@ class CompressedBitmap2:
         >>> icbmp.seek(icbmp.seekable_bytes)
         >>> next(icbmp)
         255
+        >>> icbmp = iter(CompressedBitmap2(bytes(5000) + b"\x01" * 5000, checkpoint_interval=1024))
+        >>> icbmp.seek_to(7000)
+        >>> icbmp.position, next(icbmp)
+        (7000, 1)
     """
 
     class CompressedBitmap2Iter:
 
-        def __init__(self, compressed_seq):
+        def __init__(self, compressed_seq, checkpoints=None):
             super().__init__()
             self._compressed_seq = compressed_seq
             self._compressed_byte_index = 0
             self._is_noise = None
             self._fill_type = None
             self._remaining_bytes = 0
-            self._read_control_byte()
             self._stop_on_next_iter = False
+            # decoded offset of the next byte
+            self._position = 0
+            self._checkpoints = checkpoints if checkpoints and checkpoints[0] else None
+            self._read_control_byte()
 
         @property
         def seekable_bytes(self):
@@ -183,9 +260,18 @@ class CompressedBitmap2:
                 return 0
             return self._remaining_bytes
 
+        @property
+        def position(self) -> int:
+            return self._position
+
+        @property
+        def exhausted(self) -> bool:
+            return self._stop_on_next_iter
+
         def _read_control_byte(self):
             if self._compressed_byte_index >= len(self._compressed_seq):
                 self._stop_on_next_iter = True
+                self._remaining_bytes = 0
                 return
             byte = self._compressed_seq[self._compressed_byte_index]
             self._is_noise = byte >> 7
@@ -208,8 +294,27 @@ class CompressedBitmap2:
                 self._compressed_byte_index += 1
             self._remaining_bytes = bytes_count
 
+        def _jump_to_checkpoint(self, target):
+            """
+            Moves to the last checkpoint before the target if it is ahead of the current run
+            """
+            decoded_offsets, compressed_offsets = self._checkpoints
+            checkpoint = bisect.bisect_right(decoded_offsets, target) - 1
+            if checkpoint < 0 or decoded_offsets[checkpoint] <= self._position:
+                return
+            self._compressed_byte_index = compressed_offsets[checkpoint]
+            self._position = decoded_offsets[checkpoint]
+            self._read_control_byte()
+
         def seek(self, bytes_to_seek):
+            if bytes_to_seek > self._remaining_bytes and self._checkpoints is not None:
+                target = self._position + bytes_to_seek
+                self._jump_to_checkpoint(target)
+                bytes_to_seek = target - self._position
+            self._position += bytes_to_seek
             while self._remaining_bytes < bytes_to_seek:
+                if self._stop_on_next_iter:
+                    return
                 bytes_to_seek -= self._remaining_bytes
                 if self._is_noise:
                     self._compressed_byte_index += self._remaining_bytes
@@ -220,6 +325,13 @@ class CompressedBitmap2:
             if self._remaining_bytes == 0:
                 self._read_control_byte()
 
+        def seek_to(self, position):
+            """
+            Seeks forward to the decoded byte offset, a position behind the current one is ignored
+            """
+            if position > self._position:
+                self.seek(position - self._position)
+
         def __next__(self):
             if self._stop_on_next_iter:
                 raise StopIteration()
@@ -230,19 +342,31 @@ class CompressedBitmap2:
             self.seek(1)
             return ret_val
 
-    def __init__(self, byte_sequence, compressed_sequence=None):
+    def __init__(self, byte_sequence, compressed_sequence=None,
+                 checkpoint_interval=CHECKPOINT_INTERVAL_BYTES):
         super().__init__()
         if compressed_sequence is None:
-            self._compressed_seq = compress(byte_sequence)
-        else:
-            self._compressed_seq = compressed_sequence
+            compressed_sequence = compress(byte_sequence)
+        self._compressed_seq = bytes(compressed_sequence)
+        self._checkpoint_interval = checkpoint_interval
+        self._checkpoints = None
 
     def __iter__(self):
-        return self.CompressedBitmap2Iter(compressed_seq=self._compressed_seq)
+        return self.CompressedBitmap2Iter(compressed_seq=self._compressed_seq,
+                                          checkpoints=self.checkpoints)
+
+    @property
+    def checkpoints(self) -> tuple[list, list]:
+        """
+        :return: decoded offsets of the checkpoints and their compressed offsets
+        """
+        if self._checkpoints is None:
+            self._checkpoints = build_checkpoints(self._compressed_seq, self._checkpoint_interval)
+        return self._checkpoints
 
     @property
     def compressed_sequence(self):
-        return bytes(self._compressed_seq)
+        return self._compressed_seq
 
 
 def bit_index(byte_sequence):
@@ -321,7 +445,9 @@ def bit_op_index2(*byte_sequences, op=None):
     AND operation the number of bytes that may be bypassed is the maximum number of zero bytes among
     all sequences. For the OR operation the minimal number of zero bytes may be sought. There is no
     reason for seeking ones in the OR operation since the function returns indexes of turned on
-    bits, and thus they turned on bits should be reported anyway.
+    bits, and thus they turned on bits should be reported anyway. If all iterators seek to decoded
+    positions (i.e., iterators of CompressedBitmap2), the AND operation gallops: every zero fill of
+    any sequence is skipped by all others at once.
 
     :param byte_sequences: at least 2 byte sequences
     :param op: operator from the built-in operator module: only or_(), and_() supported
@@ -357,8 +483,11 @@ def bit_op_index2(*byte_sequences, op=None):
     if behavior_op is None:
         raise UnsupportedOperator(f"Cannot process with operator: {op}")
 
-    byte_index = 0
     bs_iters = [iter(bs) for bs in byte_sequences]
+    if op is operator.and_ and all(hasattr(ibs, 'seek_to') for ibs in bs_iters):
+        yield from _galloping_and_index(bs_iters)
+        return
+    byte_index = 0
     while True:
         main_byte, *other_bytes = [next(i, None) for i in bs_iters]
         if main_byte is None:
@@ -378,6 +507,40 @@ def bit_op_index2(*byte_sequences, op=None):
         byte_index += 1
 
 
+def _galloping_and_index(bs_iters):
+    """ AND of the iterators which seek to decoded positions (see CompressedBitmap2Iter.seek_to).
+    The iterators are aligned on the first position which is inside a zero fill of none of them.
+    A zero fill of any iterator moves the candidate position of all others past its end, thus the
+    others jump over the fill (by their checkpoints) without decoding it.
+    """
+    iters_num = len(bs_iters)
+    position = 0
+    while True:
+        aligned = 0
+        iter_num = 0
+        while aligned < iters_num:
+            bs_iter = bs_iters[iter_num]
+            bs_iter.seek_to(position)
+            while zero_bytes := bs_iter.seekable_bytes:
+                bs_iter.seek(zero_bytes)
+            if bs_iter.exhausted:
+                return
+            if bs_iter.position > position:
+                position = bs_iter.position
+                aligned = 1
+            else:
+                aligned += 1
+            iter_num = (iter_num + 1) % iters_num
+        byte = 0xFF
+        for bs_iter in bs_iters:
+            byte &= next(bs_iter)
+        if byte != 0:
+            for bit_num in range(7, -1, -1):
+                if (byte >> bit_num) & 1:
+                    yield position * 8 + (7 - bit_num)
+        position += 1
+
+
 def bit_op_index3(*byte_sequences, op=None):
     if op is None:
         raise MakeOpError("Operator is not defined")
@@ -412,6 +575,200 @@ def bit_op_index3(*byte_sequences, op=None):
     return res
 
 
+def decompress(compressed_seq) -> bytes:
+    """ Decodes compressed byte sequence at once, run by run
+
+    :param compressed_seq: compressed byte sequence
+    :return: decoded bytes
+
+    Examples:
+        >>> bs = bytes.fromhex("000000FFFF8888") + bytes(1000)
+        >>> decompress(compress(bs)) == bs
+        True
+    """
+    seq = bytes(compressed_seq)
+    chunks = []
+    byte_index = 0
+    while byte_index < len(seq):
+        byte = seq[byte_index]
+        if byte >> 7:
+            bytes_count = byte & 0x3F
+            if (byte >> 6) & 1:
+                byte_index += 1
+                bytes_count = (bytes_count << 8) | seq[byte_index]
+            byte_index += 1
+            chunks.append(seq[byte_index:byte_index + bytes_count])
+            byte_index += bytes_count
+        else:
+            bytes_count = byte & 0x1F
+            fill_byte = FILL_TYPES[byte >> 6]
+            if (byte >> 5) & 1:
+                byte_index += 1
+                bytes_count = (bytes_count << 8) | seq[byte_index]
+            byte_index += 1
+            chunks.append(bytes((fill_byte,)) * bytes_count)
+    return b''.join(chunks)
+
+
+# kinds of the runs of a compressed sequence
+_ZERO_RUN, _ONES_RUN, _NOISE_RUN = 0, 1, 2
+
+
+def _read_run(seq, index) -> tuple[int, int, int]:
+    """
+    :return: kind of the run which starts at the index, number of its decoded bytes and the index
+             of its first noise byte (or the next run for a fill)
+    """
+    byte = seq[index]
+    if byte >> 7:
+        count = byte & 0x3F
+        if (byte >> 6) & 1:
+            index += 1
+            count = (count << 8) | seq[index]
+        return _NOISE_RUN, count, index + 1
+    count = byte & 0x1F
+    if (byte >> 5) & 1:
+        index += 1
+        count = (count << 8) | seq[index]
+    return byte >> 6, count, index + 1
+
+
+def bit_count(compressed_seq) -> int:
+    """ Counts the turned on bits of a compressed sequence run by run, fills of ones are counted
+    arithmetically.
+
+    Examples:
+        >>> bit_count(compress(b"\\xff" * 100 + bytes(100) + b"\\x0f"))
+        804
+    """
+    count = 0
+    index = 0
+    seq_len = len(compressed_seq)
+    while index < seq_len:
+        kind, bytes_num, index = _read_run(compressed_seq, index)
+        if kind == _NOISE_RUN:
+            count += int.from_bytes(compressed_seq[index:index + bytes_num], 'big').bit_count()
+            index += bytes_num
+        elif kind == _ONES_RUN:
+            count += bytes_num * 8
+    return count
+
+
+def bit_and_count(*compressed_seqs) -> int:
+    """ Counts the turned on bits of AND of the compressed sequences without producing the bit
+    indexes. The runs of all sequences are walked together (a single sequence is counted by
+    bit_count): a span where any sequence has a fill of zeros is skipped at once, a span where all
+    sequences have fills of ones is counted arithmetically and only the overlapping noise bytes are
+    AND-ed and counted.
+
+    :param compressed_seqs: at least one compressed byte sequence
+    :return: number of the turned on bits
+
+    Examples:
+        >>> s1 = compress(b"\\xff" * 100 + b"\\x0f")
+        >>> s2 = compress(b"\\xff" * 50 + bytes(50) + b"\\x3c")
+        >>> bit_and_count(s1, s2)
+        402
+        >>> bit_and_count(s1)
+        804
+    """
+    if len(compressed_seqs) == 1:
+        return bit_count(compressed_seqs[0])
+    operands = range(len(compressed_seqs))
+    kinds = [_ZERO_RUN] * len(compressed_seqs)
+    # not walked bytes of the current runs of the sequences
+    run_bytes = [0] * len(compressed_seqs)
+    # indexes of the next runs, or of the next noise bytes inside the noise runs
+    indexes = [0] * len(compressed_seqs)
+    count = 0
+    span = 0
+    while True:
+        # every sequence walks the span, the runs ended inside it are read
+        for operand in operands:
+            seq = compressed_seqs[operand]
+            skip = span
+            while skip >= run_bytes[operand]:
+                skip -= run_bytes[operand]
+                if kinds[operand] == _NOISE_RUN:
+                    indexes[operand] += run_bytes[operand]
+                if indexes[operand] >= len(seq):
+                    # the rest of AND is zeros
+                    return count
+                kinds[operand], run_bytes[operand], indexes[operand] = _read_run(seq,
+                                                                                 indexes[operand])
+            run_bytes[operand] -= skip
+            if kinds[operand] == _NOISE_RUN:
+                indexes[operand] += skip
+        if _ZERO_RUN in kinds:
+            # the longest fill of zeros is skipped by all sequences at once
+            span = max(run_bytes[operand] for operand in operands
+                       if kinds[operand] == _ZERO_RUN)
+            continue
+        span = min(run_bytes)
+        if _NOISE_RUN not in kinds:
+            count += span * 8
+            continue
+        value = -1
+        for operand in operands:
+            if kinds[operand] == _NOISE_RUN:
+                index = indexes[operand]
+                value &= int.from_bytes(compressed_seqs[operand][index:index + span], 'big')
+        count += value.bit_count()
+
+
+def _bit_expr_value(clauses, bits_num) -> tuple[int, int]:
+    bytes_len = bits_num // 8 + 1
+    value = 0
+    # without a positive clause every valid bit is set before the negated clauses are applied
+    has_positive = False
+    negated = []
+    for sequences, is_negated in clauses:
+        clause_value = 0
+        for compressed_seq in sequences:
+            decoded = decompress(compressed_seq)
+            bytes_len = len(decoded)
+            clause_value |= int.from_bytes(decoded, 'big')
+        if is_negated:
+            negated.append(clause_value)
+        else:
+            value = value & clause_value if has_positive else clause_value
+            has_positive = True
+    bits_len = bytes_len * 8
+    # only bits of the existing items are valid, negation turns on the padding bits too
+    valid_bits = ((1 << bits_num) - 1) << (bits_len - bits_num)
+    value = value & valid_bits if has_positive else valid_bits
+    for clause_value in negated:
+        value &= ~clause_value
+    return value, bytes_len
+
+
+def bit_expr_index(clauses, bits_num):
+    """ Evaluates AND of clauses. A clause is a pair of compressed sequences which are OR-ed and the
+    negation flag of the clause, negated clauses are applied as AND NOT.
+
+    :param clauses: sequence of (compressed sequences, is negated) pairs
+    :param bits_num: number of valid bits (i.e., items of the bitmaps)
+    :return: Sequence of integers which are turned on bits of the expression
+
+    Examples:
+        >>> s1, s2, s3 = (compress(bytes.fromhex(h)) for h in ("F0", "0C", "30"))
+        >>> list(bit_expr_index([((s1, s2), False), ((s3,), True)], 6))
+        [0, 1, 4, 5]
+        >>> list(bit_expr_index([((s1,), True)], 6))
+        [4, 5]
+        >>> bit_expr_count([((s1, s2), False)], 6)
+        6
+    """
+    value, bytes_len = _bit_expr_value(clauses, bits_num)
+    return bit_index(value.to_bytes(bytes_len, 'big'))
+
+
+def bit_expr_count(clauses, bits_num) -> int:
+    """ The same as bit_expr_index, however, only the number of turned on bits is returned """
+    value, _ = _bit_expr_value(clauses, bits_num)
+    return value.bit_count()
+
+
 def bool_to_byte_bits_seq(seq):
     """ Converts sequence of True/False values into the byte sequence
     If sequence is not exact byte alligned (i.e., not divisible by 8), LSB of last bytes returned
@@ -0,0 +1,190 @@
+"""
+This module contains small expressions over the letter bitmaps of the words index. An expression is
+AND of clauses, a clause is either a term or OR of terms (AnyOf). Every term restricts one position
+of a word to a set of letters. A negated term excludes the set of letters from the position (i.e.,
+it is applied as AND NOT). Any expressions may be OR-ed: terms of the same position unite their
+letters, other terms are distributed over the clauses of both expressions.
+
+Letters of the terms may be given either as letters or as their codes in the alphabet.
+
+Examples:
+    >>> vowel = letter_in(2, "AEIOU")
+    >>> expr = letter_in(0, "S") & vowel & ~letter_in(4, "S")
+    >>> expr
+    BitmapExpr([Term(0, 'S'), Term(2, 'AEIOU'), ~Term(4, 'S')])
+    >>> letter_in(1, "A") | letter_in(1, "E")
+    BitmapExpr([Term(1, 'AE')])
+    >>> letter_in(0, "S") - letter_in(1, "T")
+    BitmapExpr([Term(0, 'S'), ~Term(1, 'T')])
+    >>> letter_in(0, "S") | letter_in(1, "T")
+    BitmapExpr([AnyOf([Term(0, 'S'), Term(1, 'T')])])
+    >>> (letter_in(0, "S") & letter_in(1, "T")) | letter_in(2, "A")
+    BitmapExpr([AnyOf([Term(0, 'S'), Term(2, 'A')]), AnyOf([Term(1, 'T'), Term(2, 'A')])])
+    >>> ~(letter_in(0, "S") | letter_in(1, "T"))
+    BitmapExpr([~Term(0, 'S'), ~Term(1, 'T')])
+"""
+
+
+class BitmapExprError(Exception):
+    pass
+
+
+class Term:
+    """
+    Restriction of a position to a set of letters
+    """
+
+    __slots__ = ('position', 'letters', 'negated')
+
+    def __init__(self, position: int, letters, negated=False):
+        super().__init__()
+        if isinstance(letters, (str, int)):
+            letters = [letters] if isinstance(letters, int) else list(letters)
+        self.position = position
+        self.letters = tuple(dict.fromkeys(letters))
+        self.negated = negated
+        if not self.letters:
+            raise BitmapExprError(f"Term of the position {position} has no letters")
+
+    def __eq__(self, other):
+        if isinstance(other, Term):
+            return (self.position, set(self.letters), self.negated) == \
+                (other.position, set(other.letters), other.negated)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.position, frozenset(self.letters), self.negated))
+
+    def __repr__(self):
+        letters = "".join(map(str, self.letters)) if all(isinstance(letter, str) for letter
+                                                         in self.letters) else self.letters
+        return f"{'~' if self.negated else ''}Term({self.position}, {letters!r})"
+
+
+class AnyOf:
+    """
+    OR of the terms, the terms may be of different positions. A negated term of the clause matches
+    the words which have any other letter on its position.
+    """
+
+    __slots__ = ('terms',)
+
+    def __init__(self, terms):
+        super().__init__()
+        self.terms = tuple(dict.fromkeys(terms))
+
+    def __eq__(self, other):
+        if isinstance(other, AnyOf):
+            return set(self.terms) == set(other.terms)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(frozenset(self.terms))
+
+    def __iter__(self):
+        return iter(self.terms)
+
+    def __repr__(self):
+        return f"AnyOf([{', '.join(map(repr, self.terms))}])"
+
+
+def _clause_terms(clause) -> tuple[Term, ...]:
+    return clause.terms if isinstance(clause, AnyOf) else (clause,)
+
+
+def _any_of(terms):
+    """
+    :return: clause of the terms, not negated terms of the same position are united into one term
+    """
+    united = {}
+    for term in terms:
+        key = term if term.negated else term.position
+        if key in united and not term.negated:
+            term = Term(term.position, united[key].letters + term.letters)
+        united[key] = term
+    terms = list(united.values())
+    return terms[0] if len(terms) == 1 else AnyOf(terms)
+
+
+class BitmapExpr:
+    """
+    AND of the clauses, a clause is a term or OR of terms (AnyOf)
+    """
+
+    def __init__(self, terms=()):
+        super().__init__()
+        self._terms = tuple(terms)
+
+    @property
+    def terms(self) -> tuple:
+        """
+        :return: clauses of the expression, i.e., terms and AnyOf clauses
+        """
+        return self._terms
+
+    def __and__(self, other):
+        if not isinstance(other, BitmapExpr):
+            return NotImplemented
+        return BitmapExpr(self._terms + other._terms)
+
+    def __sub__(self, other):
+        if not isinstance(other, BitmapExpr):
+            return NotImplemented
+        return self & ~other
+
+    def __or__(self, other):
+        if not isinstance(other, BitmapExpr):
+            return NotImplemented
+        if not self._terms or not other._terms:
+            # an empty expression matches all words
+            return BitmapExpr()
+        # (a AND b) OR (c AND d) = (a OR c) AND (a OR d) AND (b OR c) AND (b OR d)
+        clauses = [_any_of(_clause_terms(clause) + _clause_terms(other_clause))
+                   for clause in self._terms for other_clause in other._terms]
+        return BitmapExpr(dict.fromkeys(clauses))
+
+    def __invert__(self):
+        if not self._terms:
+            raise BitmapExprError("An empty expression cannot be negated")
+        # NOT (a OR b) = NOT a AND NOT b, NOT (x AND y) = NOT x OR NOT y
+        negated = None
+        for clause in self._terms:
+            clause_negated = BitmapExpr(Term(term.position, term.letters, not term.negated)
+                                        for term in _clause_terms(clause))
+            negated = clause_negated if negated is None else negated | clause_negated
+        return negated
+
+    def __iter__(self):
+        return iter(self._terms)
+
+    def __len__(self):
+        return len(self._terms)
+
+    def __eq__(self, other):
+        if isinstance(other, BitmapExpr):
+            return self._terms == other._terms
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self._terms)
+
+    def __repr__(self):
+        return f"BitmapExpr([{', '.join(map(repr, self._terms))}])"
+
+
+def letter_in(position: int, letters) -> BitmapExpr:
+    """
+    :param position: position of the letter in a word
+    :param letters: letters (or letter codes) any of which may be on the position
+    :return: expression of the single term
+    """
+    return BitmapExpr([Term(position, letters)])
+
+
+def letter_not_in(position: int, letters) -> BitmapExpr:
+    """
+    :param position: position of the letter in a word
+    :param letters: letters (or letter codes) none of which may be on the position
+    :return: expression of the single negated term
+    """
+    return BitmapExpr([Term(position, letters, negated=True)])
@@ -1,19 +1,37 @@
 #!/usr/bin/env python3
 
 import argparse
+import asyncio
+import contextlib
+import functools
 import os
+import random
 import sys
 import time
 
-from karnobh.crosswordist.grid_generator import create_random_grid, CrossWordsIndex
-from karnobh.crosswordist.words_index import WordsIndex
-from karnobh.crosswordist.solution_finder import find_solution, FinderResult
+from karnobh.crosswordist.grid_generator import (create_random_grid, CrossWordsIndex,
+                                                 CrossWordsIndexError, cross_words_index_from_rows,
+                                                 read_grid_rows)
+from karnobh.crosswordist.words_index import WordsIndex, parse_scored_word
+from karnobh.crosswordist.multi_language_index import MultiLanguageWordsIndex
+from karnobh.crosswordist.solution_finder import (find_solution, FinderResult, CandidateOrder,
+                                                  check_prefilled_words, PrefilledWordsError)
+from karnobh.crosswordist.slot_letter_tables import SlotLetterTables
 from karnobh.crosswordist.grid_file_writter import write_svg
+from karnobh.crosswordist.search_stats import SearchStats
+from karnobh.crosswordist.solver_trace import TraceWriter, TracingWordsIndex, replay_trace
+from karnobh.crosswordist.pattern_counts import DEFAULT_MAX_FIXED_LETTERS
+from karnobh.crosswordist.service import (CrosswordService, serve, DEFAULT_HOST, DEFAULT_PORT,
+                                          DEFAULT_WORKERS, DEFAULT_MAX_PENDING_JOBS)
+from karnobh.crosswordist.puzzle_pool import (PuzzlePool, PoolKey, PuzzlePoolError,
+                                              DEFAULT_LOW_WATER_RATIO)
 
 MODE_INDEX = "index"
 MODE_CROSSWORD = "crossword"
+MODE_REPLAY = "replay"
+MODE_SERVE = "serve"
 
-ALLOWED_MODES = [MODE_INDEX, MODE_CROSSWORD]
+ALLOWED_MODES = [MODE_INDEX, MODE_CROSSWORD, MODE_REPLAY, MODE_SERVE]
 
 GRID_SYMMETRY_TYPE_X = 'X'
 GRID_SYMMETRY_TYPE_D = 'D'
@@ -27,12 +45,24 @@ ALLOWED_GRID_SYMMETRY_TYPES = [
 
 COMPRESSED_INDEX_TYPE_FAST = "fast"
 COMPRESSED_INDEX_TYPE_SLOW = "slow"
+COMPRESSED_INDEX_TYPE_DAWG = "dawg"
 
 ALLOWED_COMPRESSED_INDEX_TYPES = [
     COMPRESSED_INDEX_TYPE_FAST,
     COMPRESSED_INDEX_TYPE_SLOW,
+    COMPRESSED_INDEX_TYPE_DAWG,
 ]
 
+CANDIDATE_ORDER_RANDOM = "random"
+CANDIDATE_ORDER_BEST_FIRST = "best-first"
+CANDIDATE_ORDER_LEAST_CONSTRAINING = "least-constraining"
+
+CANDIDATE_ORDERS = {
+    CANDIDATE_ORDER_RANDOM: CandidateOrder.RANDOM,
+    CANDIDATE_ORDER_BEST_FIRST: CandidateOrder.BEST_FIRST,
+    CANDIDATE_ORDER_LEAST_CONSTRAINING: CandidateOrder.LEAST_CONSTRAINING,
+}
+
 DEFAULT_GRID_SIZE = 11
 DEFAULT_UNUSED_SQUARES_PERCENTAGE = 16.6
 DEFAULT_SYMMETRY = "D"
@@ -43,6 +73,12 @@ DEFAULT_OUTPUT_DIRECTORY = 'out'
 DEFAULT_NUMBER_OF_CROSSWORDS = 100
 DEFAULT_PIXEL_SIZE = 800
 
+# stats file of this extension is written in Prometheus text format, otherwise in JSON
+PROMETHEUS_STATS_FILE_EXTENSION = ".prom"
+
+# seeds of the random state of the traced crosswords are drawn from [0, MAX_TRACE_SEED)
+MAX_TRACE_SEED = 2 ** 63
+
 ALLOWED_VERBOSITY_LEVELS = [0, 1, 2]
 DEFAULT_VERBOSITY_LEVEL = 0
 
@@ -96,14 +132,46 @@ class App:
                  output_dir: str,
                  number_of_crosswords: int,
                  picture_pixels: int,
-                 verbosity: int):
+                 verbosity: int,
+                 packed_words: bool = False,
+                 alphabet: str | None = None,
+                 language: str | None = None,
+                 candidate_order: str = CANDIDATE_ORDER_RANDOM,
+                 stats_file: str | None = None,
+                 language_words: list[str] | None = None,
+                 language_alphabet: list[str] | None = None,
+                 pattern_counts_max_length: int | None = None,
+                 pattern_counts_fixed_letters: int = DEFAULT_MAX_FIXED_LETTERS,
+                 trace_file: str | None = None,
+                 host: str = DEFAULT_HOST,
+                 port: int = DEFAULT_PORT,
+                 unix_socket: str | None = None,
+                 workers: int = DEFAULT_WORKERS,
+                 max_pending_jobs: int = DEFAULT_MAX_PENDING_JOBS,
+                 pool: list[str] | None = None,
+                 pool_file: str | None = None,
+                 pool_low_water_ratio: float = DEFAULT_LOW_WATER_RATIO,
+                 grid_file: str | None = None):
         super().__init__()
 
         # yep, dirty and straightforward...
         if mode not in ALLOWED_MODES:
             raise ValueError(f"Provided mode {mode} is not in allowed.")
 
-        if mode == MODE_INDEX:
+        language_words_files = self._parse_language_values(language_words, "language words")
+        language_alphabets = self._parse_language_values(language_alphabet, "language alphabet")
+        pool_targets = self._parse_pool_targets(pool)
+
+        if mode == MODE_INDEX and language_words_files:
+            for language, language_words_file in language_words_files.items():
+                if not os.path.isfile(language_words_file):
+                    raise ValueError(f"Words file '{language_words_file}' of language "
+                                     f"'{language}' should exist.")
+            unknown_languages = set(language_alphabets) - set(language_words_files)
+            if unknown_languages:
+                raise ValueError(f"Alphabets are provided for languages without words: "
+                                 f"{sorted(unknown_languages)}")
+        elif mode == MODE_INDEX:
             if not isinstance(words_file, str) or not words_file:
                 raise ValueError(
                     f"Words file should be provided if mode '{MODE_INDEX}' is selected and be of "
@@ -117,11 +185,17 @@ class App:
         if not isinstance(index, str) or not index:
             raise ValueError(f"Index should be of proper type and cannot be empty.")
 
-        if mode == MODE_CROSSWORD and not os.path.isfile(index):
+        if mode in (MODE_CROSSWORD, MODE_REPLAY, MODE_SERVE) and not os.path.isfile(index):
             raise ValueError(
-                f"Index file: '{index}' should exist if mode: '{MODE_CROSSWORD}' is selected."
+                f"Index file: '{index}' should exist if mode: '{mode}' is selected."
             )
 
+        if mode == MODE_REPLAY and (not trace_file or not os.path.isfile(trace_file)):
+            raise ValueError(f"Trace file should exist if mode: '{MODE_REPLAY}' is selected.")
+
+        if mode == MODE_CROSSWORD and grid_file and not os.path.isfile(grid_file):
+            raise ValueError(f"Grid file: '{grid_file}' should exist.")
+
         if not isinstance(grid_size, int):
             raise ValueError("Greed size is not of proper type")
 
@@ -183,6 +257,30 @@ class App:
             raise ValueError(f"Wrong picture size in pixels. "
                              f"Minimal allowed picture pixels is {self.MIN_ALLOWED_PICTURE_PIXELS}")
 
+        if candidate_order not in CANDIDATE_ORDERS:
+            raise ValueError(f"Candidate order: {candidate_order} is not supported. "
+                             f"Supported orders: {list(CANDIDATE_ORDERS)}")
+
+        if pattern_counts_max_length is not None \
+                and pattern_counts_max_length < self.MIN_ALLOWED_WORD_LEN:
+            raise ValueError(f"Maximal length of the words with pattern counts should be at least "
+                             f"{self.MIN_ALLOWED_WORD_LEN}")
+
+        if pattern_counts_fixed_letters < 1:
+            raise ValueError("Number of the fixed letters of the pattern counts should be positive")
+
+        if not 0 <= port <= 65535:
+            raise ValueError("Port should be in range [0, 65535]")
+
+        if workers < 1:
+            raise ValueError("Number of the workers should be positive")
+
+        if max_pending_jobs < 1:
+            raise ValueError("Maximal number of the pending jobs should be positive")
+
+        if not 0 <= pool_low_water_ratio < 1:
+            raise ValueError("Pool low-water ratio should be in range [0, 1)")
+
         if verbosity not in ALLOWED_VERBOSITY_LEVELS:
             raise ValueError(f"Wrong verbosity level. Allowed: {ALLOWED_VERBOSITY_LEVELS}")
 
@@ -200,70 +298,211 @@ class App:
         self._number_of_crosswords = number_of_crosswords
         self._picture_pixels = picture_pixels
         self._verbosity = verbosity
+        self._packed_words = packed_words
+        self._alphabet = alphabet
+        self._language = language
+        self._candidate_order = CANDIDATE_ORDERS[candidate_order]
+        self._stats_file = stats_file
+        self._language_words = language_words_files
+        self._language_alphabet = language_alphabets
+        self._pattern_counts_max_length = pattern_counts_max_length
+        self._pattern_counts_fixed_letters = pattern_counts_fixed_letters
+        self._trace_file = trace_file
+        self._host = host
+        self._port = port
+        self._unix_socket = unix_socket
+        self._workers = workers
+        self._max_pending_jobs = max_pending_jobs
+        self._pool_targets = pool_targets
+        self._pool_file = pool_file
+        self._pool_low_water_ratio = pool_low_water_ratio
+        self._grid_file = grid_file
+
+    @staticmethod
+    def _parse_language_values(values: list[str] | None, name: str) -> dict[str, str]:
+        """
+        :param values: values in the format 'LANGUAGE=VALUE'
+        :return: language to value mapping
+        """
+        parsed = {}
+        for value in values or []:
+            language, sep, language_value = value.partition("=")
+            if not sep or not language or not language_value:
+                raise ValueError(f"Wrong {name} value: '{value}'. Expected 'LANGUAGE=VALUE'.")
+            if language in parsed:
+                raise ValueError(f"The {name} of language '{language}' is provided twice.")
+            parsed[language] = language_value
+        return parsed
+
+    def _parse_pool_targets(self, values: list[str] | None) -> dict[PoolKey, int]:
+        """
+        :param values: values in the format 'SIZE:SYMMETRY:BLACK_RATIO=NUMBER'
+        :return: key of the pool to the number of its puzzles
+        """
+        targets = {}
+        for value in values or []:
+            key, _, number = value.partition("=")
+            try:
+                pool_key = PoolKey.parse(key)
+                targets[pool_key] = int(number)
+            except (ValueError, PuzzlePoolError) as e:
+                raise ValueError(f"Wrong pool value: '{value}'. "
+                                 f"Expected 'SIZE:SYMMETRY:BLACK_RATIO=NUMBER'.") from e
+            if not self.MIN_ALLOWED_GRID_SIZE <= pool_key.size <= self.MAX_ALLOWED_GRID_SIZE \
+                    or pool_key.symmetry not in ALLOWED_GRID_SYMMETRY_TYPES \
+                    or not 0 <= pool_key.black_ratio < 1 or targets[pool_key] < 1:
+                raise ValueError(f"Wrong pool value: '{value}'. The grid parameters should be "
+                                 f"valid and the number of the puzzles should be positive.")
+        return targets
 
     def print_verbose(self, out, level, **kwargs):
         if self._verbosity >= level:
             print(out, **kwargs)
 
-    def index_mode(self):
-        words_size = os.path.getsize(self._words_file)
+    def _add_words(self, words_file, add_word):
+        words_size = os.path.getsize(words_file)
         chunk_size = words_size // self.INDEX_CREATION_WAITING_DOTS
-        with open(self._words_file) as f:
-            with WordsIndex.as_context() as wi:
-                self.print_verbose("Creating index (may require several minutes)", 1, end='')
-                next_chunk = chunk_size
-                while True:
-                    word = f.readline()
-                    if not word:
-                        break
-                    file_pos = f.tell()
-                    while file_pos > next_chunk:
-                        next_chunk += chunk_size
-                        self.print_verbose(".", 1, end='', flush=True)
-                    wi.add_word(word.strip())
+        with open(words_file) as f:
+            next_chunk = chunk_size
+            while True:
+                word = f.readline()
+                if not word:
+                    break
+                file_pos = f.tell()
+                while file_pos > next_chunk:
+                    next_chunk += chunk_size
+                    self.print_verbose(".", 1, end='', flush=True)
+                add_word(*parse_scored_word(word))
+
+    def index_mode(self):
+        if self._language_words:
+            self.multi_language_index_mode()
+            return
+        with WordsIndex.as_context(alphabet=self._alphabet) as wi:
+            self.print_verbose("Creating index (may require several minutes)", 1, end='')
+            self._add_words(self._words_file, wi.add_word)
         self.print_verbose('', 1)
+        self._make_pattern_counts(wi)
         with open(self._index, 'w') as f:
             wi.dump(f)
 
-    def crossword_mode(self):
-        os.makedirs(self._output_dir, exist_ok=True)
+    def multi_language_index_mode(self):
+        alphabets = {language: self._language_alphabet.get(language)
+                     for language in self._language_words}
+        with MultiLanguageWordsIndex.as_context(alphabets) as wi:
+            for language, words_file in self._language_words.items():
+                self.print_verbose(f"Creating index of language '{language}' "
+                                   f"(may require several minutes)", 1, end='')
+                self._add_words(words_file, functools.partial(wi.add_word, language))
+                self.print_verbose('', 1)
+        self._make_pattern_counts(wi)
+        with open(self._index, 'w') as f:
+            wi.dump(f)
+
+    def _make_pattern_counts(self, wi):
+        if self._pattern_counts_max_length is None:
+            return
+        self.print_verbose("Precomputing pattern counts", 1)
+        lengths = range(self.MIN_ALLOWED_WORD_LEN, self._pattern_counts_max_length + 1)
+        wi.make_pattern_counts(lengths, self._pattern_counts_fixed_letters)
+
+    def _load_index(self, file, index_cls):
+        if self._language is None:
+            return index_cls(file=file, packed_words=self._packed_words)
+        multi_language_index = MultiLanguageWordsIndex(file=file,
+                                                       index_cls=index_cls,
+                                                       packed_words=self._packed_words)
+        return multi_language_index.language(self._language)
+
+    def _load_words_index(self):
         with open(self._index) as f:
             if self._compressed_index_type == 'fast':
                 try:
                     from karnobh.crosswordist.word_index_native import WordIndexNative
-                    wi_loaded = WordIndexNative(file=f)
+                    wi_loaded = self._load_index(f, WordIndexNative)
                 except ImportError as ie:
                     raise AppError("Cannot load fast compressed index. (Is it compiled?). "
                                    "Try to use slow compressed index") from ie
                 except (Exception,) as e:
                     raise AppError(f"Cannot load/init fast index. {str(e)}") from e
             elif self._compressed_index_type == 'slow':
-                wi_loaded = WordsIndex(file=f)
+                wi_loaded = self._load_index(f, WordsIndex)
+            elif self._compressed_index_type == COMPRESSED_INDEX_TYPE_DAWG:
+                from karnobh.crosswordist.dawg_index import DawgWordsIndex
+                wi_loaded = self._load_index(f, DawgWordsIndex)
             else:
                 raise AppError(f"Wrong state of the system. "
                                f"Got compressed index type: '{self._compressed_index_type}'")
+        return wi_loaded
+
+    def crossword_mode(self):
+        os.makedirs(self._output_dir, exist_ok=True)
+        wi_loaded = self._load_words_index()
+        grid_rows = self._read_grid_file(self._grid_file, wi_loaded) if self._grid_file else None
+        trace_file = open(self._trace_file, 'wb') if self._trace_file \
+            else contextlib.nullcontext()
+        with trace_file:
+            trace_writer = TraceWriter(trace_file) if self._trace_file else None
+            self._generate_crosswords(wi_loaded, trace_writer, grid_rows)
+
+    @staticmethod
+    def _read_grid_file(grid_file: str, wi_loaded) -> list[str]:
+        """
+        :param grid_file: path of the grid file
+        :return: rows of the grid file, the letters of the grid are checked against the index
+        """
+        try:
+            with open(grid_file, encoding='utf-8') as f:
+                grid_rows = read_grid_rows(f)
+            check_prefilled_words(wi_loaded, cross_words_index_from_rows(grid_rows))
+        except (CrossWordsIndexError, PrefilledWordsError) as e:
+            raise AppError(f"Wrong grid file '{grid_file}'. {e}") from e
+        return grid_rows
+
+    def _generate_crosswords(self, wi_loaded, trace_writer: TraceWriter | None,
+                             grid_rows: list[str] | None = None):
+        stats = SearchStats() if self._stats_file else None
+        # the crosswords of the run share the letter tables (and the domains) of the slots
+        letter_tables = SlotLetterTables(wi_loaded)
         found_times = 0
-        total_found_secs = 0
+        total_found_secs = 0.0
         self.print_verbose("Starting Crosswords Generation. \n"
                            "The operation is time intensive, please be patient...", 1)
         digits_num = len(str(self._number_of_crosswords + 1))
         for num in range(1, self._number_of_crosswords + 1):
             self.print_verbose(f"Generating Crossword Number {num}", 2)
-            grid = create_random_grid(
-                size=self._grid_size,
-                black_ratio=self._grid_unused_percentage / 100.0,
-                symmetry=self._grid_symmetry,
-                min_word_size=self._grid_min_word_length,
-                timeout_seconds=self._crossword_generation_timeout_seconds
-            )
-            self.print_verbose("Generated Random Grid:", 2)
-            self.print_verbose(grid.pretty_log(self.EMPTY_GRID_LOG_MAPPING), 2)
-            cross_words_index = CrossWordsIndex(grid=grid)
+            if trace_writer is not None:
+                # the seed of the trace reproduces the grid and the shuffles of the search
+                seed = random.randrange(MAX_TRACE_SEED)
+                random.seed(seed)
+            if grid_rows is not None:
+                cross_words_index = cross_words_index_from_rows(grid_rows)
+                grid = cross_words_index.grid
+                self.print_verbose("Given Grid:", 2)
+                self.print_verbose("\n".join(grid_rows), 2)
+            else:
+                grid = create_random_grid(
+                    size=self._grid_size,
+                    black_ratio=self._grid_unused_percentage / 100.0,
+                    symmetry=self._grid_symmetry,
+                    min_word_size=self._grid_min_word_length,
+                    timeout_seconds=self._crossword_generation_timeout_seconds
+                )
+                self.print_verbose("Generated Random Grid:", 2)
+                self.print_verbose(grid.pretty_log(self.EMPTY_GRID_LOG_MAPPING), 2)
+                cross_words_index = CrossWordsIndex(grid=grid)
+            word_index = wi_loaded
+            if trace_writer is not None:
+                trace_writer.start_run(seed, grid)
+                word_index = TracingWordsIndex(wi_loaded, trace_writer)
             t0 = time.time()
             solution = find_solution(
-                word_index=wi_loaded,
+                word_index=word_index,
                 cross_words_index=cross_words_index,
                 timeout_after_seconds=self._crossword_generation_timeout_seconds,
+                candidate_order=self._candidate_order,
+                stats=stats,
+                letter_tables=letter_tables,
             )
             solution_secs = time.time() - t0
             if solution == FinderResult.FOUND:
@@ -293,12 +532,76 @@ class App:
         if found_times > 0:
             average_time = total_found_secs / found_times
             self.print_verbose(f"Average time per found solution: {average_time}", 1)
-
+        if stats is not None and self._stats_file:
+            self._write_stats(stats, self._stats_file)
+
+    def replay_mode(self):
+        wi_loaded = self._load_words_index()
+        with open(self._trace_file, 'rb') as f:
+            stats = replay_trace(f, wi_loaded)
+        self.print_verbose(f"Replayed runs: {stats.counter('runs')}", 0)
+        for kind in ('list', 'count', 'exists', 'count_batch', 'exists_batch', 'all_exist'):
+            queries = stats.counter('queries', type=kind)
+            if not queries:
+                continue
+            _, seconds = stats.timer_total('query_seconds', type=kind)
+            self.print_verbose(f"{kind}: queries {queries}, patterns "
+                               f"{stats.counter('patterns', type=kind)}, seconds {seconds:.6f}, "
+                               f"queries per second {queries / seconds if seconds else 0:.1f}", 0)
+        if self._stats_file:
+            self._write_stats(stats, self._stats_file)
+
+    def serve_mode(self):
+        address = self._unix_socket or f"{self._host}:{self._port}"
+        pool = self._load_pool()
+        # every worker process of the service loads the index once
+        with CrosswordService(self._load_words_index, workers=self._workers,
+                              max_pending_jobs=self._max_pending_jobs, pool=pool,
+                              pool_timeout_seconds=self._crossword_generation_timeout_seconds
+                              ) as service:
+            self.print_verbose(f"Serving crosswords on {address}", 1)
+            try:
+                with contextlib.suppress(KeyboardInterrupt):
+                    asyncio.run(serve(service, self._host, self._port, self._unix_socket))
+            finally:
+                self._save_pool(pool)
+
+    def _load_pool(self) -> PuzzlePool | None:
+        if not self._pool_targets:
+            return None
+        pool = PuzzlePool(self._pool_targets, self._pool_low_water_ratio)
+        if self._pool_file and os.path.isfile(self._pool_file):
+            with open(self._pool_file, 'rb') as f:
+                try:
+                    loaded = pool.load(f)
+                except PuzzlePoolError as e:
+                    raise AppError(f"Cannot load the pool file '{self._pool_file}'. {e}") from e
+            self.print_verbose(f"Loaded puzzles of the pool: {loaded}", 1)
+        return pool
+
+    def _save_pool(self, pool: PuzzlePool | None):
+        if pool is None or not self._pool_file:
+            return
+        # the previous pool file is replaced only by a complete one
+        tmp_file = f"{self._pool_file}.tmp"
+        with open(tmp_file, 'wb') as f:
+            pool.dump(f)
+        os.replace(tmp_file, self._pool_file)
+
+    @staticmethod
+    def _write_stats(stats: SearchStats, stats_file: str):
+        with open(stats_file, 'w') as f:
+            if stats_file.endswith(PROMETHEUS_STATS_FILE_EXTENSION):
+                f.write(stats.to_prometheus())
+            else:
+                stats.dump_json(f)
 
     def run(self):
         mode_mapping = {
             MODE_INDEX: self.index_mode,
-            MODE_CROSSWORD: self.crossword_mode
+            MODE_CROSSWORD: self.crossword_mode,
+            MODE_REPLAY: self.replay_mode,
+            MODE_SERVE: self.serve_mode,
         }
         mode_mapping[self._mode]()
 
@@ -322,7 +625,9 @@ def main():
         choices=ALLOWED_MODES,
         default=MODE_CROSSWORD,
         help=f"Working mode. '{MODE_INDEX}' - generate index file of words. "
-             f"'{MODE_CROSSWORD}' - generate crossword."
+             f"'{MODE_CROSSWORD}' - generate crossword. "
+             f"'{MODE_REPLAY}' - replay the index queries of a solver trace. "
+             f"'{MODE_SERVE}' - serve crossword generation requests over HTTP."
     )
 
     parser.add_argument(
@@ -336,7 +641,8 @@ def main():
     parser.add_argument(
         '-wf',
         '--words-file',
-        help=f"File of words (words expected to be in upper case). "
+        help=f"File of words (words expected to be in upper case). A line may have the score of "
+             f"the word in the format 'WORD;SCORE'. "
              f"If mode: '{MODE_INDEX}' is selected then this argument is mandatory."
     )
 
@@ -394,7 +700,8 @@ def main():
         default=COMPRESSED_INDEX_TYPE_FAST,
         help=f"Compressed index type. "
              f"'{COMPRESSED_INDEX_TYPE_FAST}' - C based index (should be compiled). "
-             f"'{COMPRESSED_INDEX_TYPE_SLOW}' - Python based index."
+             f"'{COMPRESSED_INDEX_TYPE_SLOW}' - Python based index. "
+             f"'{COMPRESSED_INDEX_TYPE_DAWG}' - Python based index of the word graphs."
     )
 
     parser.add_argument(
@@ -431,6 +738,169 @@ def main():
              f"Default: {DEFAULT_PIXEL_SIZE}."
     )
 
+    parser.add_argument(
+        '-pw',
+        '--packed-words',
+        action='store_true',
+        help="Keep words of the loaded index in a packed (fixed-width letter codes) form. "
+             "Reduces the memory consumed by the words of the index."
+    )
+
+    parser.add_argument(
+        '-abc',
+        '--alphabet',
+        help=f"Alphabet of the words in the words file. Used in '{MODE_INDEX}' mode. "
+             f"Default: Latin alphabet."
+    )
+
+    parser.add_argument(
+        '-lw',
+        '--language-words',
+        action='append',
+        metavar='LANGUAGE=WORDS_FILE',
+        help=f"Words file of a language of a multi language index. Used in '{MODE_INDEX}' mode "
+             f"instead of the words file, may be repeated for every language."
+    )
+
+    parser.add_argument(
+        '-la',
+        '--language-alphabet',
+        action='append',
+        metavar='LANGUAGE=ALPHABET',
+        help=f"Alphabet of a language given by '--language-words'. Used in '{MODE_INDEX}' mode, "
+             f"may be repeated for every language. Default: Latin alphabet."
+    )
+
+    parser.add_argument(
+        '-pcl',
+        '--pattern-counts-max-length',
+        type=int,
+        help=f"Precompute the numbers of the words per pattern of a few fixed letters for the "
+             f"words up to this length and keep them in the index. Used in '{MODE_INDEX}' mode. "
+             f"Default: not precomputed."
+    )
+
+    parser.add_argument(
+        '-pcf',
+        '--pattern-counts-fixed-letters',
+        type=int,
+        default=DEFAULT_MAX_FIXED_LETTERS,
+        help=f"Maximal number of the fixed letters of the precomputed patterns. "
+             f"Used in '{MODE_INDEX}' mode. Default: {DEFAULT_MAX_FIXED_LETTERS}."
+    )
+
+    parser.add_argument(
+        '-l',
+        '--language',
+        help=f"Language of the words in a multi language index. Used in '{MODE_CROSSWORD}' mode. "
+             f"If not provided the index file is expected to be of one language."
+    )
+
+    parser.add_argument(
+        '-co',
+        '--candidate-order',
+        choices=list(CANDIDATE_ORDERS),
+        default=CANDIDATE_ORDER_RANDOM,
+        help=f"Order of trying the words of the index. Used in '{MODE_CROSSWORD}' mode. "
+             f"'{CANDIDATE_ORDER_RANDOM}' - random order. "
+             f"'{CANDIDATE_ORDER_BEST_FIRST}' - the words of the highest scores first. "
+             f"'{CANDIDATE_ORDER_LEAST_CONSTRAINING}' - the words leaving the most possibilities "
+             f"to the crossing words first. "
+             f"Default: '{CANDIDATE_ORDER_RANDOM}'."
+    )
+
+    parser.add_argument(
+        '-sf',
+        '--stats-file',
+        help=f"File to write the statistics of the solution search to (nodes, backtracks, lookups, "
+             f"time by depth). Used in '{MODE_CROSSWORD}' mode. Written in Prometheus text format "
+             f"if the file has '{PROMETHEUS_STATS_FILE_EXTENSION}' extension, otherwise in JSON."
+    )
+
+    parser.add_argument(
+        '-tf',
+        '--trace-file',
+        help=f"Solver trace file (binary). In '{MODE_CROSSWORD}' mode - the grids, the seeds and "
+             f"the index queries of the solution search are written to the file. In "
+             f"'{MODE_REPLAY}' mode - the queries of the file are replayed against the index."
+    )
+
+    parser.add_argument(
+        '-gf',
+        '--grid-file',
+        help=f"Grid file to fill instead of the random grids, one row per line: '#' is a black "
+             f"cell, '.' is an empty cell and any other character is a pre-placed letter. The "
+             f"pre-placed letters are kept, only the remaining slots are solved. "
+             f"Used in '{MODE_CROSSWORD}' mode."
+    )
+
+    parser.add_argument(
+        '-H',
+        '--host',
+        default=DEFAULT_HOST,
+        help=f"Host to listen on. Used in '{MODE_SERVE}' mode. Default: {DEFAULT_HOST}."
+    )
+
+    parser.add_argument(
+        '-p',
+        '--port',
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"Port to listen on. Used in '{MODE_SERVE}' mode. Default: {DEFAULT_PORT}."
+    )
+
+    parser.add_argument(
+        '-us',
+        '--unix-socket',
+        help=f"Unix socket to listen on instead of the host and the port. "
+             f"Used in '{MODE_SERVE}' mode."
+    )
+
+    parser.add_argument(
+        '-w',
+        '--workers',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Number of the worker processes filling the grids. Used in '{MODE_SERVE}' mode. "
+             f"Default: number of the CPUs ({DEFAULT_WORKERS})."
+    )
+
+    parser.add_argument(
+        '-mpj',
+        '--max-pending-jobs',
+        type=int,
+        default=DEFAULT_MAX_PENDING_JOBS,
+        help=f"Maximal number of the queued and the running jobs, the requests beyond it are "
+             f"rejected. Used in '{MODE_SERVE}' mode. Default: {DEFAULT_MAX_PENDING_JOBS}."
+    )
+
+    parser.add_argument(
+        '-pk',
+        '--pool',
+        action='append',
+        metavar='SIZE:SYMMETRY:BLACK_RATIO=NUMBER',
+        help=f"Keep this number of the puzzles of the grid parameters solved ahead of the "
+             f"requests, e.g., '11:D:0.166=50'. Used in '{MODE_SERVE}' mode, may be repeated for "
+             f"every grid parameters. The black ratio should be equal to the one of the requests."
+    )
+
+    parser.add_argument(
+        '-pf',
+        '--pool-file',
+        help=f"File the pool of the puzzles is loaded from on the start and saved to on the exit. "
+             f"Used in '{MODE_SERVE}' mode."
+    )
+
+    parser.add_argument(
+        '-plw',
+        '--pool-low-water-ratio',
+        type=float,
+        default=DEFAULT_LOW_WATER_RATIO,
+        help=f"The puzzles of the grid parameters are solved once their number falls to this part "
+             f"of their target number. Used in '{MODE_SERVE}' mode. "
+             f"Default: {DEFAULT_LOW_WATER_RATIO}."
+    )
+
     parser.add_argument(
         '-v',
         '--verbosity',
@@ -0,0 +1,336 @@
+"""
+This module contains the words index of the directed acyclic word graphs (DAWG). The words of the
+same length are kept in a minimized trie where the equal subtrees of the suffixes are shared. The
+graph is kept in flat arrays: the edges of a node are contiguous and sorted by the letter codes and
+every node knows the number of the words below it.
+
+A lookup walks only the branches consistent with the mapping. Once no position below a node is
+mapped, all words below the node match and a count takes the number of the words of the node
+without walking further. Thus, patterns fixing the first letters (e.g., words filled left to
+right) are answered by a short walk, while the bitmap index intersects a bitmap per position. The
+index keeps the graph of the reversed words as well, patterns fixing the last letters are walked by
+it.
+
+Examples:
+    >>> dawg = Dawg.build(3, [b"\\x00\\x01\\x02", b"\\x01\\x01\\x02", b"\\x01\\x02\\x02"])
+    >>> dawg.nodes_num
+    5
+    >>> list(dawg.indexes({1: 1}))
+    [0, 1]
+    >>> dawg.count({2: 2})
+    3
+    >>> dawg.count({0: 1, 1: 2})
+    1
+    >>> dawg.exists({0: 0, 1: 2})
+    False
+"""
+
+import operator
+import re
+from array import array
+from bisect import bisect_left
+
+from karnobh.crosswordist.bitmap import decompress
+from karnobh.crosswordist.words_index import WordsIndex
+
+# type code of the arrays of the nodes and the edges
+NODES_TYPE_CODE = 'I'
+# type code of the array of the edge labels (letter codes)
+LABELS_TYPE_CODE = 'H'
+
+# bytes of a decoded bitmap which have turned off bits
+_NOT_FULL_BYTE = re.compile(b'[^\\xff]')
+
+
+class Dawg:
+    """
+    DAWG of the words of the same length. A word is identified by its rank (i.e., its position
+    among the words sorted by their letter codes) which is counted by the edges while walking, the
+    ranks are translated to the indexes of the words in the order they were given.
+    """
+
+    def __init__(self, length: int, first_edges: array, labels: array, targets: array,
+                 edge_ranks: array, counts: array, rank_to_index: array | None = None):
+        """
+        :param length: length of the words
+        :param first_edges: index of the first edge of every node, followed by the number of edges
+        :param labels: letter code of every edge
+        :param targets: node of every edge
+        :param edge_ranks: number of the words below the preceding edges of the same node
+        :param counts: number of the words below every node. The root is the last node.
+        :param rank_to_index: index of the word of every rank, None if the ranks are the indexes
+        """
+        super().__init__()
+        self._length = length
+        self._first_edges = first_edges
+        self._labels = labels
+        self._targets = targets
+        self._edge_ranks = edge_ranks
+        self._counts = counts
+        self._rank_to_index = rank_to_index
+        self._root = len(counts) - 1
+
+    @property
+    def nodes_num(self) -> int:
+        return len(self._counts)
+
+    @property
+    def words_num(self) -> int:
+        return self._counts[self._root]
+
+    @staticmethod
+    def build(length: int, encoded_words) -> 'Dawg':
+        """
+        :param length: length of the words
+        :param encoded_words: letter codes of the words, indexes of the words are their positions
+        :return: the minimized graph of the words
+        """
+        words = [tuple(codes) for codes in encoded_words]
+        order = sorted(range(len(words)), key=words.__getitem__)
+        rank_to_index = None
+        if any(rank != index for rank, index in enumerate(order)):
+            rank_to_index = array(NODES_TYPE_CODE, order)
+        words = [words[index] for index in order]
+        first_edges = array(NODES_TYPE_CODE)
+        labels = array(LABELS_TYPE_CODE)
+        targets = array(NODES_TYPE_CODE)
+        edge_ranks = array(NODES_TYPE_CODE)
+        counts = array(NODES_TYPE_CODE)
+        # nodes by their edges, equal subtrees are registered once
+        register: dict[tuple, int] = {}
+
+        def add_node(edges) -> int:
+            node = register.get(edges)
+            if node is None:
+                node = len(counts)
+                register[edges] = node
+                first_edges.append(len(labels))
+                count = 0
+                for label, target in edges:
+                    labels.append(label)
+                    targets.append(target)
+                    edge_ranks.append(count)
+                    count += counts[target]
+                counts.append(count or 1)
+            return node
+
+        def build_node(low, high, depth) -> int:
+            # the words [low, high) share the prefix of the depth
+            if depth == length:
+                return add_node(())
+            edges = []
+            while low < high:
+                label = words[low][depth]
+                next_low = low + 1
+                while next_low < high and words[next_low][depth] == label:
+                    next_low += 1
+                edges.append((label, build_node(low, next_low, depth + 1)))
+                low = next_low
+            return add_node(tuple(edges))
+
+        if words:
+            build_node(0, len(words), 0)
+        else:
+            # the root without edges and words
+            first_edges.append(0)
+            counts.append(0)
+        first_edges.append(len(labels))
+        return Dawg(length, first_edges, labels, targets, edge_ranks, counts, rank_to_index)
+
+    def _edge(self, node, code) -> int | None:
+        start, stop = self._first_edges[node], self._first_edges[node + 1]
+        edge = bisect_left(self._labels, code, start, stop)
+        if edge < stop and self._labels[edge] == code:
+            return edge
+        return None
+
+    def ranks(self, mapping: dict[int, int]):
+        """
+        :param mapping: position to letter code mapping
+        :return: ranks of the matching words in the increasing order
+        """
+        last_mapped = max(mapping, default=-1)
+        first_edges, targets, edge_ranks, counts = (self._first_edges, self._targets,
+                                                    self._edge_ranks, self._counts)
+        stack = [(self._root, 0, 0)]
+        while stack:
+            node, depth, rank = stack.pop()
+            if depth > last_mapped:
+                yield from range(rank, rank + counts[node])
+                continue
+            code = mapping.get(depth)
+            if code is not None:
+                edge = self._edge(node, code)
+                if edge is not None:
+                    stack.append((targets[edge], depth + 1, rank + edge_ranks[edge]))
+                continue
+            for edge in range(first_edges[node + 1] - 1, first_edges[node] - 1, -1):
+                stack.append((targets[edge], depth + 1, rank + edge_ranks[edge]))
+
+    def indexes(self, mapping: dict[int, int]):
+        """
+        :param mapping: position to letter code mapping
+        :return: indexes of the matching words in the increasing order
+        """
+        if self._rank_to_index is None:
+            return self.ranks(mapping)
+        rank_to_index = self._rank_to_index
+        return iter(sorted(rank_to_index[rank] for rank in self.ranks(mapping)))
+
+    def count(self, mapping: dict[int, int]) -> int:
+        """
+        The graph is walked level by level, the nodes of a level are kept with the number of the
+        paths reaching them, thus a node reached by many paths is expanded once.
+        """
+        last_mapped = max(mapping, default=-1)
+        first_edges, targets = self._first_edges, self._targets
+        level = {self._root: 1}
+        for depth in range(last_mapped + 1):
+            code = mapping.get(depth)
+            next_level: dict[int, int] = {}
+            for node, paths in level.items():
+                if code is not None:
+                    edge = self._edge(node, code)
+                    if edge is not None:
+                        target = targets[edge]
+                        next_level[target] = next_level.get(target, 0) + paths
+                    continue
+                for target in targets[first_edges[node]:first_edges[node + 1]]:
+                    next_level[target] = next_level.get(target, 0) + paths
+            if not next_level:
+                return 0
+            level = next_level
+        counts = self._counts
+        return sum(counts[node] * paths for node, paths in level.items())
+
+    def exists(self, mapping: dict[int, int]) -> bool:
+        last_mapped = max(mapping, default=-1)
+        first_edges, targets, counts = self._first_edges, self._targets, self._counts
+        dead_nodes = set()
+
+        def node_exists(node, depth) -> bool:
+            if depth > last_mapped:
+                return counts[node] != 0
+            if node in dead_nodes:
+                return False
+            code = mapping.get(depth)
+            if code is not None:
+                edge = self._edge(node, code)
+                exists = edge is not None and node_exists(targets[edge], depth + 1)
+            else:
+                exists = any(node_exists(targets[edge], depth + 1)
+                             for edge in range(first_edges[node], first_edges[node + 1]))
+            if not exists:
+                dead_nodes.add(node)
+            return exists
+
+        return node_exists(self._root, 0)
+
+
+class DawgWordsIndex(WordsIndex):
+    """
+    Words index which answers the lookups of the words having all letters of the mapping (i.e.,
+    the AND lookups) by the DAWG of the words of the length. A mapping is walked either by the
+    graph of the words or by the graph of the reversed words, whichever reaches all positions of
+    the mapping at a smaller depth. The graphs of a length are built from the words of the index on
+    the first lookup. Other operators and the expression lookups are answered by the bitmaps.
+
+    The word indexes are the indexes of the words of the index, thus the masks of the bitmap index
+    are accepted. The words excluded by a mask (e.g., the words already used by the solver) are
+    expected to be few, they are subtracted from the counts and skipped by the lookups.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (length, is reversed) to the graph
+        self._dawgs: dict[tuple[int, bool], Dawg] = {}
+        # length to the last mask and the words excluded by it
+        self._excluded: dict[int, tuple] = {}
+
+    def dawg(self, length, reverse=False) -> Dawg:
+        """
+        :param length: length of the words
+        :param reverse: whether the graph is of the reversed words
+        """
+        dawg = self._dawgs.get((length, reverse))
+        if dawg is None:
+            words_index_same_len = self.word_index_by_length(length)
+            words = (words_index_same_len.letters_at(word_index)
+                     for word_index in range(len(words_index_same_len.words)))
+            if reverse:
+                words = (tuple(reversed(letters)) for letters in words)
+            dawg = Dawg.build(length, words)
+            self._dawgs[(length, reverse)] = dawg
+        return dawg
+
+    def _walked(self, length, mapping) -> tuple[Dawg, dict[int, int]]:
+        """
+        :return: the graph walking the mapping and the mapping of the letter codes in the positions
+                 of the graph
+        """
+        codes = self.alphabet.encode_mapping(mapping)
+        if codes and max(codes) > length - 1 - min(codes):
+            return self.dawg(length, reverse=True), {length - 1 - pos: code
+                                                     for pos, code in codes.items()}
+        return self.dawg(length), codes
+
+    def _excluded_words(self, length, mask) -> set[int]:
+        """
+        :return: indexes of the words whose bits are turned off in the mask
+        """
+        cached = self._excluded.get(length)
+        if cached is not None and cached[0] is mask:
+            return cached[1]
+        words_num = len(self.word_index_by_length(length).words)
+        decoded = decompress(mask.compressed_sequence)
+        excluded = set(range(len(decoded) * 8, words_num))
+        for match in _NOT_FULL_BYTE.finditer(decoded):
+            byte_index = match.start()
+            byte = decoded[byte_index]
+            for bit in range(8):
+                word_index = byte_index * 8 + bit
+                if not byte & (0x80 >> bit) and word_index < words_num:
+                    excluded.add(word_index)
+        self._excluded[length] = (mask, excluded)
+        return excluded
+
+    def _excluded_matches(self, length, codes, mask) -> int:
+        words_index_same_len = self.word_index_by_length(length)
+        matches = 0
+        for word_index in self._excluded_words(length, mask):
+            letters = words_index_same_len.letters_at(word_index)
+            matches += all(letters[pos] == code for pos, code in codes.items())
+        return matches
+
+    def lookup_indexes(self, length, mapping, op=None, mask=None):
+        if op is not None and op is not operator.and_:
+            return super().lookup_indexes(length, mapping, op, mask)
+        dawg, codes = self._walked(length, mapping)
+        indexes = dawg.indexes(codes)
+        if mask is None:
+            return indexes
+        excluded = self._excluded_words(length, mask)
+        return (word_index for word_index in indexes if word_index not in excluded)
+
+    def count_occurrences(self, length, mapping, op=None, mask=None):
+        if op is not None and op is not operator.and_:
+            return super().count_occurrences(length, mapping, op, mask)
+        count = self._precomputed_count(length, mapping, mask=mask)
+        if count is not None:
+            return count
+        dawg, codes = self._walked(length, mapping)
+        count = dawg.count(codes)
+        if mask is not None and count:
+            count -= self._excluded_matches(length, self.alphabet.encode_mapping(mapping), mask)
+        return count
+
+    def does_intersection_exist(self, length, mapping, op=None, mask=None):
+        if op is not None and op is not operator.and_:
+            return super().does_intersection_exist(length, mapping, op, mask)
+        if mask is not None:
+            return self.count_occurrences(length, mapping, mask=mask) != 0
+        count = self._precomputed_count(length, mapping)
+        if count is not None:
+            return count != 0
+        dawg, codes = self._walked(length, mapping)
+        return dawg.exists(codes)
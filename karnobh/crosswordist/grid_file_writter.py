@@ -1,12 +1,25 @@
 from karnobh.crosswordist.grid_generator import CrossWordsIndex
-from karnobh.crosswordist.grid_emitter import draw_crossword
-from karnobh.crosswordist.graphics import SvgGraphicsEmitter
+from karnobh.crosswordist.svg_renderer import render_svg, render_svgs
+
+
+def emit_svg(cross_words_index: CrossWordsIndex, file, size_px):
+    """
+    :param cross_words_index: the crossword to draw
+    :param file: text file (or any object with write) the SVG document is written to
+    :param size_px: width and height of the picture in pixels
+    """
+    file.write(render_svg(cross_words_index, size_px))
 
 
 def write_svg(cross_words_index: CrossWordsIndex, file_name, size_px):
     with open(file_name, 'w') as f:
-        print(f'<svg width="{size_px}" height="{size_px}" xmlns="http://www.w3.org/2000/svg">',
-              file=f)
-        emitter = SvgGraphicsEmitter(f)
-        draw_crossword(cross_words_index, emitter, size_px)
-        print('</svg>', file=f)
+        emit_svg(cross_words_index, f, size_px)
+
+
+def write_svgs(cross_words_indexes: list[CrossWordsIndex], file_names: list[str], size_px):
+    """
+    Renders the crosswords in one pass and writes every one of them to its file
+    """
+    for file_name, svg in zip(file_names, render_svgs(cross_words_indexes, size_px)):
+        with open(file_name, 'w') as f:
+            f.write(svg)
@@ -29,6 +29,13 @@ class WordLayoutError(Exception):
     pass
 
 
+EMPTY_LETTER = ""
+
+# cells of the grid rows (see cross_words_index_from_rows), any other character is a letter
+GRID_BLACK_CELL = '#'
+GRID_EMPTY_CELL = '.'
+
+
 @dataclass(slots=True, init=False, repr=False)
 class WordLayout:
     """
@@ -43,10 +50,10 @@ class WordLayout:
     x_init: int
     y_init: int
     word_len: int
-    word_letters: list[str]
+    word_letters: list[str | int]
     word_intersects: list[tuple]
     _filled_letters: int
-    _mapping: dict[int, str] | None
+    _mapping: dict[int, str | int] | None
     __weakref__: Any
 
     def __init__(self, word_num, direction, x_init, y_init, word_len):
@@ -55,7 +62,7 @@ class WordLayout:
         self.x_init = x_init
         self.y_init = y_init
         self.word_len = word_len
-        self.word_letters = [""] * self.word_len
+        self.word_letters = [EMPTY_LETTER] * self.word_len
         self.word_intersects = [()] * self.word_len
         self._filled_letters = -1
         self._mapping = None
@@ -81,12 +88,13 @@ class WordLayout:
                 f"{'H' if self.direction == WordDirection.HORIZONTAL else 'V'}, {self.x_init}, "
                 f"{self.y_init}, {self.word_len}, {self.word_letters}, {word_intersects_repr})")
 
-    def _set_letter(self, letter: str, index: int, propagate=True):
+    def _set_letter(self, letter: str | int, index: int, propagate=True):
         """
         This method sets (or unsets) the letter in some position of a word. As well, it recursively
         propagates the set letter to the crossing words. The propagation should happen only once
         since the for some specific letter at some position there is only two adjacent words.
-        :param letter: The character of a letter to be set
+        :param letter: The character of a letter (or its code in the alphabet) to be set. An empty
+               string unsets the letter.
         :param index: The position of the letter
         :param propagate: whether to propagate the letter setting or not. External calls should not
                set this parameter. It is used for recursive calls.
@@ -94,7 +102,8 @@ class WordLayout:
         """
         self._filled_letters = -1
         self._mapping = None
-        if letter and self.word_letters[index] and letter != self.word_letters[index]:
+        current_letter = self.word_letters[index]
+        if letter != EMPTY_LETTER and current_letter != EMPTY_LETTER and letter != current_letter:
             raise WordLayoutError(f"There is already letter '{self.word_letters[index]}' "
                                   f"at index {index}. "
                                   f"Trying to set letter '{letter}'. {self}")
@@ -119,18 +128,29 @@ class WordLayout:
                  the word changed.
         """
         if self._filled_letters == -1:
-            self._filled_letters = sum(1 for letter in self.word_letters if letter != '')
+            self._filled_letters = sum(1 for letter in self.word_letters if letter != EMPTY_LETTER)
         return self._filled_letters
 
     @property
-    def mapping(self) -> dict[int, str]:
+    def mapping(self) -> dict[int, str | int]:
         """
         :return: Position to letter (i.e., "sparse array") mapping of the word
         """
         if self._mapping is None:
-            self._mapping = {i: l for i, l in enumerate(self.word_letters) if l}
+            self._mapping = {i: l for i, l in enumerate(self.word_letters) if l != EMPTY_LETTER}
         return self._mapping
 
+    def map_letters(self, func):
+        """
+        Replaces every set letter of the word by the result of the function (e.g., converting
+        letters to their codes). The crossing words are not touched.
+        :param func: function applied to every set letter
+        :return: None - mutates the current word
+        """
+        self.word_letters = [func(letter) if letter != EMPTY_LETTER else EMPTY_LETTER
+                             for letter in self.word_letters]
+        self._mapping = None
+
     @property
     def full(self) -> bool:
         """
@@ -360,3 +380,44 @@ class CrossWordsIndex:
     @property
     def all(self):
         return itertools.chain(self.horizontal_words, self.vertical_words)
+
+    def map_letters(self, func):
+        """
+        Replaces every set letter of all words by the result of the function.
+        :param func: function applied to every set letter (e.g., alphabet's letter to code)
+        :return: None - mutates all words
+        """
+        for word_layout in self.all:
+            word_layout.map_letters(func)
+
+
+def cross_words_index_from_rows(rows: list[str]) -> CrossWordsIndex:
+    """
+    :param rows: rows of the cells of the grid, '#' is a black cell, '.' is an empty cell and any
+                 other character is a letter
+    :return: crossword of the grid with the letters set
+    """
+    width = len(rows[0])
+    grid = FlatMatrix(width, len(rows), [int(cell == GRID_BLACK_CELL) for row in rows
+                                         for cell in row])
+    cross_words_index = CrossWordsIndex(grid=grid)
+    # every white cell is in a horizontal word, a letter is propagated to its vertical word
+    for word_layout in cross_words_index.horizontal_words:
+        x_init = word_layout.x_init
+        cells = rows[word_layout.y_init][x_init:x_init + word_layout.word_len]
+        word_layout.set_word([EMPTY_LETTER if cell == GRID_EMPTY_CELL else cell
+                              for cell in cells])
+    return cross_words_index
+
+
+def read_grid_rows(file) -> list[str]:
+    """
+    :param file: text file of the grid rows (see cross_words_index_from_rows), one row per line,
+                 the whitespaces and the empty lines are ignored
+    :return: rows of the grid
+    """
+    rows = ["".join(line.split()) for line in file]
+    rows = [row for row in rows if row]
+    if not rows or any(len(row) != len(rows[0]) for row in rows):
+        raise CrossWordsIndexError("Grid rows should be non-empty and of the same length")
+    return rows
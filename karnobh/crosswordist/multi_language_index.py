@@ -0,0 +1,118 @@
+"""
+This module contains the index of words of several languages. Every language has its own alphabet
+(i.e., its own letter codes) and its own words index. Queries are routed to the index of the
+requested language, thus puzzles in several languages may be served from one process.
+
+The index file of several languages is a JSON object with the "languages" key which maps the name
+of a language to the regular words index (see WordsIndex.dump).
+"""
+import json
+import logging
+from contextlib import contextmanager
+
+from karnobh.crosswordist.words_index import WordsIndex, WordIndexLoadError
+
+logger = logging.getLogger(__name__)
+
+
+class UnknownLanguageError(Exception):
+    pass
+
+
+class MultiLanguageWordsIndex:
+
+    LANGUAGES_KEY = "languages"
+
+    def __init__(self, alphabets: dict[str, str] | None = None,
+                 length_range: range | None = None,
+                 file=None,
+                 index_cls=WordsIndex,
+                 packed_words: bool = False):
+        """
+        :param alphabets: language name to the alphabet of the language (construction mode)
+        :param length_range: range of the word lengths for all languages (construction mode)
+        :param file: index file to load (load mode)
+        :param index_cls: class of the per language index (e.g., WordIndexNative)
+        :param packed_words: whether words of the loaded index are packed
+        """
+        super().__init__()
+        self._languages: dict[str, WordsIndex] = {}
+        self._rejected_words: dict[str, int] = {}
+        if file is None:
+            for language, alphabet in (alphabets or {}).items():
+                self._languages[language] = index_cls(alphabet=alphabet,
+                                                      length_range=length_range,
+                                                      packed_words=packed_words)
+                self._rejected_words[language] = 0
+        else:
+            try:
+                languages = json.load(file)[self.LANGUAGES_KEY]
+            except (Exception, ) as e:
+                raise WordIndexLoadError(f"Cannot load multi language index file: "
+                                         f"{file.name}") from e
+            for language, index_dict in languages.items():
+                self._languages[language] = index_cls(index_dict=index_dict,
+                                                      packed_words=packed_words)
+
+    @property
+    def languages(self) -> list[str]:
+        return list(self._languages)
+
+    @property
+    def rejected_words(self) -> dict[str, int]:
+        """
+        :return: number of words per language which were not added (e.g., not in the alphabet)
+        """
+        return dict(self._rejected_words)
+
+    def language(self, language: str) -> WordsIndex:
+        words_index = self._languages.get(language)
+        if words_index is None:
+            raise UnknownLanguageError(f"There is no index for language '{language}'. "
+                                       f"Available languages: {self.languages}")
+        return words_index
+
+    def __getitem__(self, item):
+        return self.language(item)
+
+    def add_word(self, language: str, word: str, score: float | None = None) -> bool:
+        added = self.language(language).add_word(word, score)
+        if not added:
+            self._rejected_words[language] = self._rejected_words.get(language, 0) + 1
+        return added
+
+    def make_index(self):
+        for language, words_index in self._languages.items():
+            words_index.make_index()
+            rejected = self._rejected_words.get(language)
+            if rejected:
+                logger.info("Language '%s': %s words were not added to the index",
+                            language, rejected)
+
+    def make_pattern_counts(self, *args, **kwargs):
+        """
+        Precomputes the pattern counts of every language (see WordsIndex.make_pattern_counts)
+        """
+        for words_index in self._languages.values():
+            words_index.make_pattern_counts(*args, **kwargs)
+
+    def dump(self, file):
+        languages = {language: words_index.as_dict()
+                     for language, words_index in self._languages.items()}
+        json.dump({self.LANGUAGES_KEY: languages}, file, indent=2)
+
+    def lookup(self, language, length, mapping, op=None):
+        return self.language(language).lookup(length, mapping, op)
+
+    def count_occurrences(self, language, length, mapping, op=None):
+        return self.language(language).count_occurrences(length, mapping, op)
+
+    def does_intersection_exist(self, language, length, mapping, op=None):
+        return self.language(language).does_intersection_exist(length, mapping, op)
+
+    @staticmethod
+    @contextmanager
+    def as_context(alphabets: dict[str, str], length_range: range | None = None):
+        words_index = MultiLanguageWordsIndex(alphabets=alphabets, length_range=length_range)
+        yield words_index
+        words_index.make_index()
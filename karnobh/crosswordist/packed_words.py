@@ -0,0 +1,95 @@
+"""
+This module contains a compact storage of words of the same length. Instead of keeping every word
+as a separate string object, all words are encoded into one contiguous buffer where each letter is
+represented by its position in the alphabet (a letter code). Since all words have the same length,
+the word with index N starts at the offset N * length of the buffer.
+
+Examples:
+    >>> pw = PackedWords(3, "ABC", ["ABC", "CAB"])
+    >>> pw.buffer
+    b'\\x00\\x01\\x02\\x02\\x00\\x01'
+    >>> pw.word_at(1)
+    'CAB'
+    >>> list(pw.letters_at(0))
+    [0, 1, 2]
+"""
+
+from karnobh.crosswordist.alphabet import Alphabet
+
+
+class PackedWordsError(Exception):
+    pass
+
+
+class PackedWords:
+    """
+    Sequence of the fixed-width encoded words. It behaves like a read-only list of strings: words
+    are decoded on demand. In addition, the encoded letters of a word are accessible as a
+    memoryview slice without building a string object.
+    """
+
+    MAX_ALPHABET_LEN = 256
+
+    def __init__(self, length: int, alphabet, words=None, buffer=None):
+        super().__init__()
+        alphabet = Alphabet.of(alphabet)
+        if len(alphabet) > self.MAX_ALPHABET_LEN:
+            raise PackedWordsError(f"Alphabet of {len(alphabet)} letters cannot be packed, "
+                                   f"maximum is {self.MAX_ALPHABET_LEN}")
+        self._length = length
+        self._abc = alphabet
+        if buffer is None:
+            buffer = b''.join(self.encode(word) for word in (words or ()))
+        if len(buffer) % length:
+            raise PackedWordsError(f"Buffer size {len(buffer)} is not aligned to "
+                                   f"the word length {length}")
+        self._buffer = bytes(buffer)
+        self._view = memoryview(self._buffer)
+
+    def encode(self, word: str) -> bytes:
+        if len(word) != self._length:
+            raise PackedWordsError(f"Word: {word} is not of required length {self._length}")
+        return self._abc.encode(word)
+
+    def decode(self, letter_codes) -> str:
+        return self._abc.decode(letter_codes)
+
+    @property
+    def buffer(self) -> bytes:
+        return self._buffer
+
+    @property
+    def alphabet(self) -> Alphabet:
+        return self._abc
+
+    def letters_at(self, word_index: int) -> memoryview:
+        """
+        :param word_index: index of the word
+        :return: memoryview on the letter codes of the word (no copy is made)
+        """
+        if not 0 <= word_index < len(self):
+            raise IndexError(f"Word index {word_index} is out of range")
+        start = word_index * self._length
+        return self._view[start:start + self._length]
+
+    def word_at(self, word_index: int) -> str:
+        return self.decode(self.letters_at(word_index))
+
+    def __len__(self):
+        return len(self._buffer) // self._length
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self.word_at(i) for i in range(*item.indices(len(self)))]
+        if item < 0:
+            item += len(self)
+        return self.word_at(item)
+
+    def __iter__(self):
+        for word_index in range(len(self)):
+            yield self.word_at(word_index)
+
+    def __eq__(self, other):
+        if isinstance(other, PackedWords):
+            return self._abc == other._abc and self._buffer == other._buffer
+        return list(self) == list(other)
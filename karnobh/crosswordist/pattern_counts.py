@@ -0,0 +1,140 @@
+"""
+This module contains the precomputed numbers of the words matching the patterns of a few fixed
+letters. Most lookups of the solution search count (or check existence of) short words with one or
+two fixed letters, the number of such patterns is small (e.g., words of 5 letters with 2 fixed
+letters have 10 * 26 ** 2 patterns), thus their counts are kept in one flat array and such lookups
+are answered without any bitmap operation.
+
+The array consists of blocks, one block per combination of the fixed positions (combinations of one
+position first, then of two positions and so on). A block of R positions has abc_len ** R counts
+indexed by the letter codes of the positions, i.e., the letter code of the first position is the
+most significant digit.
+
+Examples:
+    >>> pc = PatternCounts.build(3, 3, [b"\\x00\\x01\\x02", b"\\x00\\x02\\x02"], max_fixed=2)
+    >>> pc.count({0: 0})
+    2
+    >>> pc.count({1: 2, 2: 2})
+    1
+    >>> pc.count({1: 1, 0: 1})
+    0
+    >>> pc.count({0: 0, 1: 1, 2: 2}) is None
+    True
+    >>> PatternCounts.from_dict(3, 3, pc.as_dict()).count({2: 2})
+    2
+"""
+
+import base64
+import sys
+from array import array
+from itertools import combinations
+
+# type code of the array of the counts, i.e., 4 bytes unsigned integer
+COUNTS_TYPE_CODE = 'I'
+# counts are stored in the index file in this byte order
+COUNTS_BYTE_ORDER = 'little'
+DEFAULT_MAX_FIXED_LETTERS = 2
+# words of these lengths have the counts by default
+DEFAULT_LENGTHS = range(3, 7)
+
+
+class PatternCountsError(Exception):
+    pass
+
+
+def _blocks(length, abc_len, max_fixed) -> tuple[dict[int, int], int]:
+    """
+    :return: positions (a bit per position) to the offset of their block and the size of the array
+    """
+    offsets = {}
+    size = 0
+    for fixed_num in range(1, max_fixed + 1):
+        for positions in combinations(range(length), fixed_num):
+            offsets[sum(1 << pos for pos in positions)] = size
+            size += abc_len ** fixed_num
+    return offsets, size
+
+
+class PatternCounts:
+    """
+    Numbers of the words of the same length per pattern of up to max_fixed letters
+    """
+
+    def __init__(self, length: int, abc_len: int, max_fixed: int, counts: array | None = None):
+        super().__init__()
+        if not 0 < max_fixed <= length:
+            raise PatternCountsError(f"Number of the fixed letters {max_fixed} should be in "
+                                     f"the range [1, {length}]")
+        self._length = length
+        self._abc_len = abc_len
+        self._max_fixed = max_fixed
+        self._offsets, size = _blocks(length, abc_len, max_fixed)
+        if counts is None:
+            counts = array(COUNTS_TYPE_CODE, bytes(size * array(COUNTS_TYPE_CODE).itemsize))
+        if len(counts) != size:
+            raise PatternCountsError(f"Expected {size} counts for words of length {length}, "
+                                     f"got {len(counts)}")
+        self._counts = counts
+
+    @property
+    def max_fixed(self) -> int:
+        return self._max_fixed
+
+    @staticmethod
+    def build(length: int, abc_len: int, encoded_words, max_fixed=DEFAULT_MAX_FIXED_LETTERS):
+        """
+        :param length: length of the words
+        :param abc_len: number of the letters in the alphabet
+        :param encoded_words: letter codes of the words
+        :param max_fixed: maximal number of the fixed letters of a pattern
+        :return: counts of all patterns of the words
+        """
+        pattern_counts = PatternCounts(length, abc_len, max_fixed)
+        counts = pattern_counts._counts
+        blocks = [(pattern_counts._offsets[sum(1 << pos for pos in positions)], positions)
+                  for fixed_num in range(1, max_fixed + 1)
+                  for positions in combinations(range(length), fixed_num)]
+        for codes in encoded_words:
+            for offset, positions in blocks:
+                index = 0
+                for pos in positions:
+                    index = index * abc_len + codes[pos]
+                counts[offset + index] += 1
+        return pattern_counts
+
+    def count(self, mapping: dict[int, int]) -> int | None:
+        """
+        :param mapping: position to letter code mapping
+        :return: number of the words matching the mapping or None if the mapping has more fixed
+                 letters than the counts are precomputed for
+        """
+        if not 0 < len(mapping) <= self._max_fixed:
+            return None
+        positions = 0
+        index = 0
+        abc_len = self._abc_len
+        for pos in sorted(mapping):
+            code = mapping[pos]
+            if not 0 <= code < abc_len or not 0 <= pos < self._length:
+                raise KeyError(mapping)
+            positions |= 1 << pos
+            index = index * abc_len + code
+        return self._counts[self._offsets[positions] + index]
+
+    def as_dict(self) -> dict:
+        counts = self._counts
+        if sys.byteorder != COUNTS_BYTE_ORDER:
+            counts = array(COUNTS_TYPE_CODE, counts)
+            counts.byteswap()
+        return {
+            'max_fixed': self._max_fixed,
+            'counts': base64.b64encode(counts.tobytes()).decode('ASCII'),
+        }
+
+    @staticmethod
+    def from_dict(length: int, abc_len: int, pattern_counts_dict: dict) -> 'PatternCounts':
+        counts = array(COUNTS_TYPE_CODE)
+        counts.frombytes(base64.b64decode(pattern_counts_dict['counts']))
+        if sys.byteorder != COUNTS_BYTE_ORDER:
+            counts.byteswap()
+        return PatternCounts(length, abc_len, pattern_counts_dict['max_fixed'], counts)
@@ -0,0 +1,182 @@
+"""
+This module contains the pattern query front end of the words index. A pattern is a string of:
+
+- a letter: the letter on the position
+- "?": any letter on the position
+- "[AO]": any of the letters on the position
+- "[^AO]": any letter except the letters on the position
+- "*": any number of any letters (at most one in a pattern)
+
+A pattern is compiled into a plan: bitmap expressions (see bitmap_expr module) for every length of
+the words which the pattern may match. Plans are cached, thus repeated queries (e.g., paging
+through the results) are not compiled again.
+
+Examples:
+    >>> parse_pattern("C[AO]T*")
+    (Term(0, 'C'), Term(1, 'AO'), Term(2, 'T'), '*')
+    >>> parse_pattern("C?[^S]")
+    (Term(0, 'C'), None, ~Term(2, 'S'))
+    >>> parse_pattern("C**")
+    Traceback (most recent call last):
+    ...
+    karnobh.crosswordist.pattern_query.PatternQueryError: Pattern 'C**' has more than one '*'
+"""
+
+import functools
+import itertools
+from dataclasses import dataclass
+
+from karnobh.crosswordist.bitmap_expr import BitmapExpr, Term
+
+ANY_LETTER = "?"
+ANY_LETTERS = "*"
+DEFAULT_PAGE_SIZE = 50
+DEFAULT_PLAN_CACHE_SIZE = 1024
+
+
+class PatternQueryError(Exception):
+    pass
+
+
+@functools.lru_cache(maxsize=DEFAULT_PLAN_CACHE_SIZE)
+def parse_pattern(pattern: str) -> tuple[Term | str | None, ...]:
+    """
+    :param pattern: pattern string
+    :return: tuple of the positions of the pattern: a term restricting the position, None for any
+             letter and "*" for any number of letters. Positions of the terms are their offsets in
+             the pattern before "*".
+    """
+    tokens: list[Term | str | None] = []
+    pos = 0
+    while pos < len(pattern):
+        char = pattern[pos]
+        if char == ANY_LETTER:
+            tokens.append(None)
+        elif char == ANY_LETTERS:
+            if ANY_LETTERS in tokens:
+                raise PatternQueryError(f"Pattern '{pattern}' has more than one '{ANY_LETTERS}'")
+            tokens.append(ANY_LETTERS)
+        elif char == "[":
+            end = pattern.find("]", pos + 1)
+            if end < 0:
+                raise PatternQueryError(f"Pattern '{pattern}' has unclosed letter class")
+            letters = pattern[pos + 1:end]
+            negated = letters.startswith("^")
+            if negated:
+                letters = letters[1:]
+            if not letters:
+                raise PatternQueryError(f"Pattern '{pattern}' has empty letter class")
+            tokens.append(Term(len(tokens), letters, negated))
+            pos = end
+        elif char == "]":
+            raise PatternQueryError(f"Pattern '{pattern}' has unopened letter class")
+        else:
+            tokens.append(Term(len(tokens), char))
+        pos += 1
+    if not tokens:
+        raise PatternQueryError("Pattern is empty")
+    return tuple(tokens)
+
+
+@dataclass
+class PatternPage:
+    words: list[str]
+    total: int
+    page: int
+    page_size: int
+
+    @property
+    def pages(self) -> int:
+        return -(-self.total // self.page_size)
+
+    @property
+    def has_next(self) -> bool:
+        return (self.page + 1) * self.page_size < self.total
+
+
+class PatternQuery:
+    """
+    Pattern queries over a words index. Every query is answered by the bitmap operations of the
+    index (counts are not computed by the iteration over words).
+    """
+
+    def __init__(self, words_index, plan_cache_size=DEFAULT_PLAN_CACHE_SIZE):
+        super().__init__()
+        self._words_index = words_index
+        self.plan = functools.lru_cache(maxsize=plan_cache_size)(self._compile_plan)
+
+    def _normalize_term(self, term):
+        abc = self._words_index.alphabet
+        letters = []
+        for letter in term.letters:
+            if letter not in abc and letter.upper() in abc:
+                letter = letter.upper()
+            if letter not in abc:
+                if term.negated:
+                    continue
+                raise PatternQueryError(f"Letter '{letter}' is not in the alphabet '{abc}'")
+            letters.append(letter)
+        if not letters:
+            return None
+        return Term(term.position, letters, term.negated)
+
+    def _compile_plan(self, pattern: str) -> tuple[tuple[int, BitmapExpr], ...]:
+        """
+        :param pattern: pattern string
+        :return: tuple of (length, expression) pairs ordered by the length
+        """
+        tokens = parse_pattern(pattern)
+        if ANY_LETTERS in tokens:
+            star = tokens.index(ANY_LETTERS)
+            prefix, suffix = tokens[:star], tokens[star + 1:]
+        else:
+            prefix, suffix = tokens, None
+        fixed_len = len(prefix) + len(suffix or ())
+        plan = []
+        for length in self._words_index.lengths:
+            if length < fixed_len or (suffix is None and length != fixed_len):
+                continue
+            terms = [self._normalize_term(term) for term in prefix if isinstance(term, Term)]
+            suffix_start = length - len(suffix or ())
+            for offset, term in enumerate(suffix or ()):
+                if isinstance(term, Term):
+                    terms.append(self._normalize_term(Term(suffix_start + offset, term.letters,
+                                                           term.negated)))
+            plan.append((length, BitmapExpr(term for term in terms if term is not None)))
+        return tuple(plan)
+
+    def count(self, pattern: str) -> int:
+        return sum(self._words_index.count_expr(length, expr)
+                   for length, expr in self.plan(pattern))
+
+    def exists(self, pattern: str) -> bool:
+        return any(self._words_index.does_expr_exist(length, expr)
+                   for length, expr in self.plan(pattern))
+
+    def search(self, pattern: str, page: int = 0,
+               page_size: int = DEFAULT_PAGE_SIZE) -> PatternPage:
+        """
+        :param pattern: pattern string
+        :param page: number of the page (zero based)
+        :param page_size: number of the words in a page
+        :return: the page of the words matching the pattern ordered by length, and the total number
+                 of the matching words
+        """
+        if page < 0 or page_size < 1:
+            raise PatternQueryError(f"Wrong page: {page} of size: {page_size}")
+        plan = self.plan(pattern)
+        counts = [self._words_index.count_expr(length, expr) for length, expr in plan]
+        skip = page * page_size
+        words: list[str] = []
+        for (length, expr), count in zip(plan, counts):
+            if len(words) == page_size:
+                break
+            if skip >= count:
+                skip -= count
+                continue
+            words_index_same_len = self._words_index[length]
+            indexes = self._words_index.lookup_expr_indexes(length, expr)
+            for arr_index in itertools.islice(indexes, skip, skip + page_size - len(words)):
+                words.append(words_index_same_len.word_at(arr_index))
+            skip = 0
+        return PatternPage(words=words, total=sum(counts), page=page, page_size=page_size)
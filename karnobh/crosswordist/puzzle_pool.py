@@ -0,0 +1,187 @@
+"""
+This module contains the pool of the puzzles solved ahead of the requests. The puzzles are kept by
+the parameters of their random grids (PoolKey), every key has a target number of the puzzles. Once
+the number of the puzzles of a key falls to its low-water mark the key is refilled up to its target
+(see CrosswordService.replenish), thus a request of a pooled key is answered without a solution
+search.
+
+The pool is saved to a gzip compressed JSON file. Every key is kept with the seeds and the letters
+of its puzzles, the letters of a puzzle are its rows concatenated ('#' is a black cell).
+
+Examples:
+    >>> key = PoolKey.parse('3:NO:0.0')
+    >>> pool = PuzzlePool({key: 2}, low_water_ratio=0.5)
+    >>> pool.needed_key({})
+    PoolKey(size=3, symmetry='NO', black_ratio=0.0)
+    >>> pool.put(key, Puzzle(7, ['CAT', 'ARE', 'TEN']))
+    True
+    >>> pool.put(key, Puzzle(8, ['CAT', 'ARE', 'TEN']))
+    True
+    >>> pool.needed_key({}) is None
+    True
+    >>> pool.take(key).seed
+    7
+    >>> pool.needed_key({})
+    PoolKey(size=3, symmetry='NO', black_ratio=0.0)
+    >>> pool.needed_key({key: 1}) is None
+    True
+"""
+
+import gzip
+import json
+from collections import deque
+from dataclasses import dataclass
+
+from karnobh.crosswordist.grid_generator import CrossWordsIndex, cross_words_index_from_rows
+from karnobh.crosswordist.solution_finder import FinderResult
+
+DEFAULT_LOW_WATER_RATIO = 0.5
+POOL_FILE_VERSION = 1
+
+
+class PuzzlePoolError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class PoolKey:
+    size: int
+    symmetry: str
+    black_ratio: float
+
+    @staticmethod
+    def parse(key: str) -> 'PoolKey':
+        """
+        :param key: key in the format 'SIZE:SYMMETRY:BLACK_RATIO'
+        """
+        try:
+            size, symmetry, black_ratio = key.split(':')
+            return PoolKey(int(size), symmetry, float(black_ratio))
+        except ValueError as e:
+            raise PuzzlePoolError(f"Wrong pool key: '{key}'. "
+                                  f"Expected 'SIZE:SYMMETRY:BLACK_RATIO'") from e
+
+    def __str__(self):
+        return f"{self.size}:{self.symmetry}:{self.black_ratio}"
+
+
+@dataclass
+class Puzzle:
+    seed: int
+    # rows of the letters, '#' is a black cell
+    rows: list[str]
+
+    def as_dict(self) -> dict:
+        """
+        :return: the puzzle in the form of the puzzles of the service
+        """
+        return {'result': FinderResult.FOUND.name.lower(), 'seed': self.seed, 'grid': self.rows,
+                'pooled': True}
+
+    def cross_words_index(self) -> CrossWordsIndex:
+        return cross_words_index_from_rows(self.rows)
+
+
+class PuzzlePool:
+
+    def __init__(self, targets: dict[PoolKey, int], low_water_ratio=DEFAULT_LOW_WATER_RATIO):
+        """
+        :param targets: key to the number of the puzzles of the key kept in the pool
+        :param low_water_ratio: a key is refilled once the number of its puzzles falls to this
+                                part of its target
+        """
+        super().__init__()
+        if any(target < 1 for target in targets.values()):
+            raise PuzzlePoolError("Target numbers of the puzzles should be positive")
+        if not 0 <= low_water_ratio < 1:
+            raise PuzzlePoolError("Low-water ratio should be in range [0, 1)")
+        self._targets = dict(targets)
+        self._low_water_ratio = low_water_ratio
+        self._puzzles: dict[PoolKey, deque[Puzzle]] = {key: deque() for key in targets}
+        # keys fallen to their low-water marks and not refilled to their targets yet
+        self._refilling: set[PoolKey] = set()
+
+    def __contains__(self, key):
+        return key in self._targets
+
+    @property
+    def keys(self) -> list[PoolKey]:
+        return list(self._targets)
+
+    def size(self, key: PoolKey) -> int:
+        return len(self._puzzles[key])
+
+    def low_water_mark(self, key: PoolKey) -> int:
+        return int(self._targets[key] * self._low_water_ratio)
+
+    def take(self, key: PoolKey) -> Puzzle | None:
+        """
+        :return: the oldest puzzle of the key, None if there is no puzzle of the key
+        """
+        puzzles = self._puzzles.get(key)
+        return puzzles.popleft() if puzzles else None
+
+    def put(self, key: PoolKey, puzzle: Puzzle) -> bool:
+        """
+        :return: whether the puzzle is added, i.e., the key is of the pool and it is below its
+                 target
+        """
+        puzzles = self._puzzles.get(key)
+        if puzzles is None or len(puzzles) >= self._targets[key]:
+            return False
+        puzzles.append(puzzle)
+        return True
+
+    def needed_key(self, in_flight: dict[PoolKey, int]) -> PoolKey | None:
+        """
+        :param in_flight: key to the number of the puzzles of the key being solved
+        :return: key of the largest shortage among the keys being refilled, None if no puzzle is
+                 needed
+        """
+        needed, needed_shortage = None, 0
+        for key, target in self._targets.items():
+            size = len(self._puzzles[key])
+            if size <= self.low_water_mark(key):
+                self._refilling.add(key)
+            elif size >= target:
+                self._refilling.discard(key)
+            shortage = target - size - in_flight.get(key, 0)
+            if key in self._refilling and shortage > needed_shortage:
+                needed, needed_shortage = key, shortage
+        return needed
+
+    def dump(self, file):
+        """
+        :param file: binary file to write the pool to
+        """
+        pools = [{
+            'key': str(key),
+            'seeds': [puzzle.seed for puzzle in puzzles],
+            'letters': ["".join(puzzle.rows) for puzzle in puzzles],
+        } for key, puzzles in self._puzzles.items() if puzzles]
+        with gzip.GzipFile(fileobj=file, mode='wb') as gzip_file:
+            gzip_file.write(json.dumps({'version': POOL_FILE_VERSION, 'pools': pools}).encode())
+
+    def load(self, file) -> int:
+        """
+        Adds the puzzles of the file, the puzzles of the keys which are not of the pool and the
+        puzzles beyond the targets are dropped
+
+        :param file: binary file written by dump
+        :return: number of the added puzzles
+        """
+        try:
+            with gzip.GzipFile(fileobj=file, mode='rb') as gzip_file:
+                pool_dict = json.loads(gzip_file.read())
+        except (OSError, ValueError) as e:
+            raise PuzzlePoolError(f"Cannot read the pool file. {e}") from e
+        if pool_dict.get('version') != POOL_FILE_VERSION:
+            raise PuzzlePoolError(f"Unsupported version of the pool file: "
+                                  f"{pool_dict.get('version')}")
+        added = 0
+        for key_dict in pool_dict['pools']:
+            key = PoolKey.parse(key_dict['key'])
+            for seed, letters in zip(key_dict['seeds'], key_dict['letters']):
+                rows = [letters[pos:pos + key.size] for pos in range(0, len(letters), key.size)]
+                added += self.put(key, Puzzle(seed, rows))
+        return added
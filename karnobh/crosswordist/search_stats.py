@@ -0,0 +1,241 @@
+"""
+This module contains the instrumentation of the solution search: counters and timers which are
+optionally labeled (e.g., by the type of a lookup or by the depth of the search). The statistics
+are exported as JSON or in the Prometheus text exposition format.
+
+The disabled statistics (NULL_STATS) implement the same interface by empty methods, thus the solver
+and the index are instrumented unconditionally and pay nearly nothing if statistics are not
+collected.
+
+Examples:
+    >>> stats = SearchStats()
+    >>> stats.incr("nodes", depth=1)
+    >>> stats.incr("nodes", depth=1)
+    >>> stats.incr("lookups", 3, type="count")
+    >>> stats.observe("lookup_seconds", 0.5, type="count")
+    >>> stats.counter("nodes", depth=1)
+    2
+    >>> print(stats.to_prometheus(), end='')
+    # TYPE crosswordist_lookups_total counter
+    crosswordist_lookups_total{type="count"} 3
+    # TYPE crosswordist_nodes_total counter
+    crosswordist_nodes_total{depth="1"} 2
+    # TYPE crosswordist_lookup_seconds summary
+    crosswordist_lookup_seconds_count{type="count"} 1
+    crosswordist_lookup_seconds_sum{type="count"} 0.5
+"""
+
+import json
+import time
+from contextlib import contextmanager
+
+PROMETHEUS_PREFIX = "crosswordist_"
+
+LOOKUP_LIST = "list"
+LOOKUP_COUNT = "count"
+LOOKUP_EXISTS = "exists"
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _prometheus_labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{label}="{value}"' for label, value in labels) + "}"
+
+
+class SearchStats:
+    """
+    Collected counters and timers
+    """
+
+    enabled = True
+
+    def __init__(self):
+        super().__init__()
+        self._counters = {}
+        self._timers = {}
+
+    def incr(self, name: str, value=1, **labels):
+        key = _key(name, labels)
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = _key(name, labels)
+        count, total = self._timers.get(key, (0, 0.0))
+        self._timers[key] = (count + 1, total + seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter(self, name: str, **labels):
+        return self._counters.get(_key(name, labels), 0)
+
+    def timer_total(self, name: str, **labels) -> tuple[int, float]:
+        """
+        :return: number of the observations and their total seconds
+        """
+        return self._timers.get(_key(name, labels), (0, 0.0))
+
+    def merge(self, other: 'SearchStats'):
+        for key, value in other._counters.items():
+            self._counters[key] = self._counters.get(key, 0) + value
+        for key, (count, total) in other._timers.items():
+            own_count, own_total = self._timers.get(key, (0, 0.0))
+            self._timers[key] = (own_count + count, own_total + total)
+
+    def as_dict(self) -> dict:
+        return {
+            'counters': [{'name': name, 'labels': dict(labels), 'value': value}
+                         for (name, labels), value in sorted(self._counters.items())],
+            'timers': [{'name': name, 'labels': dict(labels), 'count': count, 'seconds': total}
+                       for (name, labels), (count, total) in sorted(self._timers.items())],
+        }
+
+    def dump_json(self, file):
+        json.dump(self.as_dict(), file, indent=2)
+
+    def to_prometheus(self) -> str:
+        lines = []
+        typed = set()
+        for (name, labels), value in sorted(self._counters.items()):
+            metric = f"{PROMETHEUS_PREFIX}{name}_total"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_prometheus_labels(labels)} {value}")
+        for (name, labels), (count, total) in sorted(self._timers.items()):
+            metric = f"{PROMETHEUS_PREFIX}{name}"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} summary")
+            lines.append(f"{metric}_count{_prometheus_labels(labels)} {count}")
+            lines.append(f"{metric}_sum{_prometheus_labels(labels)} {total}")
+        return "\n".join(lines) + "\n"
+
+
+class NullStats(SearchStats):
+    """
+    Disabled statistics, nothing is collected
+    """
+
+    enabled = False
+
+    def incr(self, name: str, value=1, **labels):
+        pass
+
+    def observe(self, name: str, seconds: float, **labels):
+        pass
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        yield
+
+    def merge(self, other: 'SearchStats'):
+        pass
+
+
+NULL_STATS = NullStats()
+
+
+class InstrumentedWordsIndex:
+    """
+    Proxy of a words index which counts and times the lookups by their type. It also counts the
+    bytes of the compressed bitmaps (i.e., the operands as they are read by the bitmap operations)
+    taking part in the lookups. All other attributes are of the proxied index.
+
+    The list lookups are returned as iterators, the found words are counted and the time is
+    measured while the lookup is consumed, thus a consumer which stops early pays only for the
+    consumed part.
+    """
+
+    def __init__(self, words_index, stats: SearchStats):
+        super().__init__()
+        self._words_index = words_index
+        self._stats = stats
+
+    def __getattr__(self, item):
+        return getattr(self._words_index, item)
+
+    def __getitem__(self, item):
+        return self._words_index[item]
+
+    def _count_bytes(self, patterns, masks=None):
+        masks = masks or {}
+        compressed = 0
+        for length, mapping in patterns:
+            words_index_same_len = self._words_index.word_index_by_length(length)
+            try:
+                bitmaps = words_index_same_len.bitmaps_for(mapping)
+            except KeyError:
+                continue
+            if masks.get(length) is not None:
+                bitmaps.append(masks[length])
+            compressed += sum(len(bitmap.compressed_sequence) for bitmap in bitmaps)
+        self._stats.incr("compressed_bytes", compressed)
+
+    def _lookup(self, lookup_type, patterns, masks, func, *args):
+        self._stats.incr("lookups", len(patterns), type=lookup_type)
+        self._count_bytes(patterns, masks)
+        with self._stats.timer("lookup_seconds", type=lookup_type):
+            return func(*args)
+
+    def _consume(self, iterator):
+        seconds = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    seconds += time.perf_counter() - start
+                self._stats.incr("listed_words")
+                yield item
+        finally:
+            self._stats.observe("lookup_seconds", seconds, type=LOOKUP_LIST)
+
+    def _lookup_iter(self, func, length, mapping, op, mask):
+        self._stats.incr("lookups", type=LOOKUP_LIST)
+        self._count_bytes([(length, mapping)], {length: mask})
+        return self._consume(iter(func(length, mapping, op, mask)))
+
+    def lookup_indexes(self, length, mapping, op=None, mask=None):
+        return self._lookup_iter(self._words_index.lookup_indexes, length, mapping, op, mask)
+
+    def lookup_codes(self, length, mapping, op=None, mask=None):
+        return self._lookup_iter(self._words_index.lookup_codes, length, mapping, op, mask)
+
+    def lookup(self, length, mapping, op=None, mask=None):
+        return self._lookup_iter(self._words_index.lookup, length, mapping, op, mask)
+
+    def count_occurrences(self, length, mapping, op=None, mask=None):
+        return self._lookup(LOOKUP_COUNT, [(length, mapping)], {length: mask},
+                            self._words_index.count_occurrences, length, mapping, op, mask)
+
+    def does_intersection_exist(self, length, mapping, op=None, mask=None):
+        return self._lookup(LOOKUP_EXISTS, [(length, mapping)], {length: mask},
+                            self._words_index.does_intersection_exist, length, mapping, op, mask)
+
+    def count_occurrences_batch(self, patterns, masks=None) -> list[int]:
+        patterns = list(patterns)
+        return self._lookup(LOOKUP_COUNT, patterns, masks,
+                            self._words_index.count_occurrences_batch, patterns, masks)
+
+    def does_intersection_exist_batch(self, patterns, masks=None) -> list[bool]:
+        patterns = list(patterns)
+        return self._lookup(LOOKUP_EXISTS, patterns, masks,
+                            self._words_index.does_intersection_exist_batch, patterns, masks)
+
+    def do_all_intersections_exist(self, patterns, masks=None) -> bool:
+        patterns = list(patterns)
+        return self._lookup(LOOKUP_EXISTS, patterns, masks,
+                            self._words_index.do_all_intersections_exist, patterns, masks)
@@ -0,0 +1,736 @@
+"""
+This module contains the crossword generation service. The service is a long-running asyncio HTTP
+server (on a TCP port or on a Unix socket) which fills the grids in a pool of worker processes,
+every worker loads the words index once. The endpoints:
+    - POST /fill - fills the grid of the request and responds with the puzzle in JSON (or in SVG),
+      several puzzles of the request (its "count") are streamed as JSON lines as soon as every one
+      of them is finished
+    - POST /jobs - queues the puzzles of the request, responds with the ids of their jobs
+    - GET /jobs/{id} - the status of the job and its puzzle once it is done, GET /jobs/{id}.svg is
+      the picture of the puzzle (of the jobs of the SVG output)
+    - DELETE /jobs/{id} - cancels the job
+    - GET /health - the number of the workers and of the pending jobs
+A request is a JSON object of the fields of FillRequest. The grid of a request may have letters
+set (e.g., the theme entries), only its remaining slots are solved. Such letters are checked before
+the search, the puzzle of the inconsistent letters has the 'inconsistent' result. A job has a
+deadline (the timeout of the request counted from the submission), a job which is still queued at
+its deadline is not solved and the solution search of a running job is timed out at it. The number
+of the pending jobs is bounded, the requests beyond it are rejected with 503 status. A job cancelled
+while it is running (or whose client has disconnected) keeps its worker till the deadline, its
+puzzle is dropped.
+
+The service may keep a pool of the puzzles solved ahead (see puzzle_pool), the requests of the
+random grids of the pooled parameters (without a seed) are answered by the pool first. The pool is
+refilled in the background by up to a job per worker.
+
+Examples:
+    >>> request = FillRequest.from_dict({'grid': ['C.#', '...', '#..'], 'timeout_seconds': 5})
+    >>> request.grid, request.timeout_seconds
+    (['C.#', '...', '#..'], 5)
+    >>> FillRequest.from_dict({'size': 1})
+    Traceback (most recent call last):
+    ...
+    karnobh.crosswordist.service.FillRequestError: Grid size should be in range [3, 35]
+"""
+
+import asyncio
+import contextlib
+import functools
+import json
+import multiprocessing
+import os
+import random
+import signal
+import time
+import uuid
+from collections import OrderedDict, Counter
+from concurrent.futures import ProcessPoolExecutor, Future
+from dataclasses import dataclass, fields, replace
+from enum import Enum
+from http import HTTPStatus
+from typing import Any
+from urllib.parse import urlsplit
+
+from karnobh.crosswordist.affine_2d import FlatMatrix
+from karnobh.crosswordist.grid_generator import (create_random_grid, CrossWordsIndex,
+                                                 GridGenerationError, GRID_BLACK_CELL,
+                                                 GRID_EMPTY_CELL, cross_words_index_from_rows)
+from karnobh.crosswordist.svg_renderer import render_svg
+from karnobh.crosswordist.solution_finder import (find_solution, FinderResult,
+                                                  check_prefilled_words, PrefilledWordsError)
+from karnobh.crosswordist.slot_letter_tables import SlotLetterTables
+from karnobh.crosswordist.puzzle_pool import PuzzlePool, PoolKey, Puzzle
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_WORKERS = os.cpu_count() or 1
+DEFAULT_MAX_PENDING_JOBS = 64
+# finished jobs of the job API are kept for their clients up to this number
+MAX_KEPT_JOBS = 1024
+
+MIN_GRID_SIZE = 3
+MAX_GRID_SIZE = 35
+MIN_WORD_SIZE = 3
+GRID_SYMMETRY_TYPES = ('X', 'D', 'NO')
+DEFAULT_GRID_SIZE = 11
+DEFAULT_GRID_SYMMETRY = 'D'
+DEFAULT_BLACK_RATIO = 0.166
+DEFAULT_JOB_TIMEOUT_SECONDS = 15
+MAX_JOB_TIMEOUT_SECONDS = 300
+MAX_PUZZLES_PER_REQUEST = 100
+MIN_PICTURE_PIXELS = 200
+DEFAULT_PICTURE_PIXELS = 800
+# seeds of the random state of the jobs are drawn from [0, MAX_SEED)
+MAX_SEED = 2 ** 63
+
+OUTPUT_JSON = 'json'
+OUTPUT_SVG = 'svg'
+
+# result of a job whose deadline passed before it was started by a worker
+RESULT_EXPIRED = 'expired'
+# result of a job whose random grid was not generated before the deadline
+RESULT_NO_GRID = 'no_grid'
+# result of a job whose grid has letters which cannot be in a solution
+RESULT_INCONSISTENT = 'inconsistent'
+
+# a key of the pool whose puzzle is not found is retried after this number of seconds
+POOL_RETRY_SECONDS = 1
+
+# a worker not finishing a job by this number of seconds after its deadline fails the job
+DEADLINE_GRACE_SECONDS = 5
+MAX_REQUEST_BYTES = 1 << 20
+
+JSON_CONTENT_TYPE = "application/json"
+JSON_LINES_CONTENT_TYPE = "application/x-ndjson"
+SVG_CONTENT_TYPE = "image/svg+xml"
+
+
+class ServiceError(Exception):
+    pass
+
+
+class ServiceBusy(ServiceError):
+    pass
+
+
+class FillRequestError(ServiceError):
+    pass
+
+
+class HttpError(ServiceError):
+
+    def __init__(self, status: HTTPStatus, message: str, headers=()):
+        super().__init__(message)
+        self.status = status
+        self.headers = list(headers)
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value) -> bool:
+    return _is_int(value) or isinstance(value, float)
+
+
+def parse_grid(rows) -> list[str]:
+    """
+    :param rows: rows of the grid, '#' is a black cell, '.' is an empty cell and any other
+                 character is a letter (which is checked against the words index by fill)
+    :return: the validated rows
+    """
+    if not isinstance(rows, list) or not all(isinstance(row, str) for row in rows):
+        raise FillRequestError("Grid should be a list of the rows (strings)")
+    width = len(rows[0]) if rows else 0
+    if not MIN_GRID_SIZE <= min(width, len(rows)) <= max(width, len(rows)) <= MAX_GRID_SIZE:
+        raise FillRequestError(f"Grid width and height should be in range "
+                               f"[{MIN_GRID_SIZE}, {MAX_GRID_SIZE}]")
+    for row in rows:
+        if len(row) != width:
+            raise FillRequestError("Rows of the grid should be of the same length")
+        if any(cell.isspace() for cell in row):
+            raise FillRequestError(f"Unexpected whitespace in the row '{row}' of the grid, "
+                                   f"expected '{GRID_BLACK_CELL}', '{GRID_EMPTY_CELL}' or a letter")
+    return rows
+
+
+def grid_rows(letters_matrix: FlatMatrix) -> list[str]:
+    """
+    :param letters_matrix: letters of the crossword, 0 is a black cell and "" is an empty cell
+    :return: rows of the letters, '#' is a black cell and '.' is an empty cell
+    """
+    width, height = letters_matrix.size
+    cells = {0: GRID_BLACK_CELL, "": GRID_EMPTY_CELL}
+    return ["".join(cells.get(letters_matrix.get(x, y), letters_matrix.get(x, y))
+                    for x in range(width)) for y in range(height)]
+
+
+@dataclass
+class FillRequest:
+    # size of the random grid, the random grid parameters are ignored if the grid is given
+    size: int = DEFAULT_GRID_SIZE
+    symmetry: str = DEFAULT_GRID_SYMMETRY
+    black_ratio: float = DEFAULT_BLACK_RATIO
+    min_word_size: int = MIN_WORD_SIZE
+    # rows of the grid (see parse_grid)
+    grid: list[str] | None = None
+    timeout_seconds: float = DEFAULT_JOB_TIMEOUT_SECONDS
+    # seed of the random state of the first puzzle, the following puzzles take the next seeds
+    seed: int | None = None
+    count: int = 1
+    output: str = OUTPUT_JSON
+    picture_pixels: int = DEFAULT_PICTURE_PIXELS
+
+    @staticmethod
+    def from_dict(request_dict: dict) -> 'FillRequest':
+        """
+        :param request_dict: fields of the request, the grid is given by its rows (see parse_grid)
+        :return: the validated request
+        """
+        if not isinstance(request_dict, dict):
+            raise FillRequestError("Request should be a JSON object")
+        unknown_fields = set(request_dict) - {field.name for field in fields(FillRequest)}
+        if unknown_fields:
+            raise FillRequestError(f"Unknown fields of the request: {sorted(unknown_fields)}")
+        request = FillRequest(**request_dict)
+        if request.grid is not None:
+            request.grid = parse_grid(request.grid)
+        request.validate()
+        return request
+
+    def validate(self):
+        if not _is_int(self.size) or not MIN_GRID_SIZE <= self.size <= MAX_GRID_SIZE:
+            raise FillRequestError(f"Grid size should be in range "
+                                   f"[{MIN_GRID_SIZE}, {MAX_GRID_SIZE}]")
+        if self.symmetry not in GRID_SYMMETRY_TYPES:
+            raise FillRequestError(f"Grid symmetry type: {self.symmetry} is not supported. "
+                                   f"Supported types: {list(GRID_SYMMETRY_TYPES)}")
+        if not _is_number(self.black_ratio) or not 0 <= self.black_ratio < 1:
+            raise FillRequestError("Black ratio should be in range [0, 1)")
+        if not _is_int(self.min_word_size) or self.min_word_size < MIN_WORD_SIZE:
+            raise FillRequestError(f"Minimal word size should be at least {MIN_WORD_SIZE}")
+        if not _is_number(self.timeout_seconds) \
+                or not 0 < self.timeout_seconds <= MAX_JOB_TIMEOUT_SECONDS:
+            raise FillRequestError(f"Timeout seconds should be in range "
+                                   f"(0, {MAX_JOB_TIMEOUT_SECONDS}]")
+        if self.seed is not None and (not _is_int(self.seed) or not 0 <= self.seed < MAX_SEED):
+            raise FillRequestError(f"Seed should be an integer in range [0, {MAX_SEED})")
+        if not _is_int(self.count) or not 0 < self.count <= MAX_PUZZLES_PER_REQUEST:
+            raise FillRequestError(f"Count should be in range [1, {MAX_PUZZLES_PER_REQUEST}]")
+        if self.output not in (OUTPUT_JSON, OUTPUT_SVG):
+            raise FillRequestError(f"Output should be '{OUTPUT_JSON}' or '{OUTPUT_SVG}'")
+        if not _is_int(self.picture_pixels) or self.picture_pixels < MIN_PICTURE_PIXELS:
+            raise FillRequestError(f"Picture pixels should be at least {MIN_PICTURE_PIXELS}")
+
+
+def fill(words_index, request: FillRequest, seed: int, deadline: float,
+         letter_tables: SlotLetterTables | None = None) -> dict:
+    """
+    :param words_index: words index of the puzzle words
+    :param request: request of the puzzle
+    :param seed: seed of the random state the random grid and the solution search are done by
+    :param deadline: time (time.time()) the puzzle should be filled by
+    :param letter_tables: letter tables of the words index shared by the puzzles (see FillSession)
+    :return: the puzzle: the result of the solution search, the seed, the seconds of the search and
+             the rows of the letters (see grid_rows), and the SVG picture if requested
+    """
+    remaining_seconds = deadline - time.time()
+    if remaining_seconds <= 0:
+        return {'result': RESULT_EXPIRED, 'seed': seed}
+    random.seed(seed)
+    if request.grid is not None:
+        cross_words_index = cross_words_index_from_rows(request.grid)
+    else:
+        try:
+            grid = create_random_grid(size=request.size, black_ratio=request.black_ratio,
+                                      symmetry=request.symmetry,
+                                      min_word_size=request.min_word_size,
+                                      timeout_seconds=remaining_seconds)
+        except GridGenerationError as e:
+            return {'result': RESULT_NO_GRID, 'seed': seed, 'error': str(e)}
+        cross_words_index = CrossWordsIndex(grid=grid)
+    try:
+        check_prefilled_words(words_index, cross_words_index)
+    except PrefilledWordsError as e:
+        return {'result': RESULT_INCONSISTENT, 'seed': seed, 'error': str(e)}
+    start = time.time()
+    result = find_solution(word_index=words_index, cross_words_index=cross_words_index,
+                           timeout_after_seconds=max(0.0, deadline - start),
+                           letter_tables=letter_tables)
+    puzzle = {
+        'result': result.name.lower(),
+        'seed': seed,
+        'seconds': time.time() - start,
+        'grid': grid_rows(cross_words_index.letters_matrix),
+    }
+    if request.output == OUTPUT_SVG:
+        puzzle['svg'] = render_svg(cross_words_index, request.picture_pixels)
+    return puzzle
+
+
+# words index of the worker process, loaded by its initializer
+_worker_words_index = None
+# letter tables of the index kept by the worker process between the puzzles
+_worker_letter_tables = None
+
+
+def _init_worker(load_index):
+    global _worker_words_index, _worker_letter_tables
+    # the interruption of the service is handled by the main process, it shuts the workers down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_words_index = load_index()
+    _worker_letter_tables = SlotLetterTables(_worker_words_index)
+
+
+def _fill_in_worker(request: FillRequest, seed: int, deadline: float) -> dict:
+    return fill(_worker_words_index, request, seed, deadline, _worker_letter_tables)
+
+
+def _ping():
+    return os.getpid()
+
+
+class JobStatus(Enum):
+    PENDING = 'pending'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+
+class Job:
+    """
+    Puzzle of a request filled by a worker
+    """
+
+    def __init__(self, request: FillRequest, seed: int, deadline: float, pool_future: Future):
+        super().__init__()
+        self.id = uuid.uuid4().hex
+        self.request = request
+        self.seed = seed
+        self.deadline = deadline
+        self.status = JobStatus.PENDING
+        self.puzzle: dict | None = None
+        self.error: str | None = None
+        self._pool_future = pool_future
+        # the asyncio future of the result, it is cancelled once the job is cancelled while queued
+        self.future = asyncio.wrap_future(pool_future)
+
+    def cancel(self):
+        """
+        Cancels the job if it is not finished yet. A queued job is removed from the pool queue, the
+        puzzle of a running job is dropped once it is done.
+        """
+        if self.status is JobStatus.PENDING:
+            self.status = JobStatus.CANCELLED
+            self._pool_future.cancel()
+
+    async def wait(self) -> 'Job':
+        """
+        Waits for the job till its deadline (with a grace period), the job is failed if the worker
+        does not finish it by then
+        """
+        timeout = max(0.0, self.deadline - time.time()) + DEADLINE_GRACE_SECONDS
+        await asyncio.wait({self.future}, timeout=timeout)
+        if not self.future.done() and self.status is JobStatus.PENDING:
+            self.status = JobStatus.FAILED
+            self.error = "The worker has not finished the job by its deadline"
+        return self
+
+    def finish(self):
+        if self.status is not JobStatus.PENDING:
+            return
+        if self.future.cancelled():
+            self.status = JobStatus.CANCELLED
+        elif self.future.exception() is not None:
+            self.status = JobStatus.FAILED
+            self.error = str(self.future.exception())
+        else:
+            self.status = JobStatus.DONE
+            self.puzzle = self.future.result()
+
+    def as_dict(self) -> dict:
+        job_dict: dict[str, Any] = {'id': self.id, 'status': self.status.value, 'seed': self.seed}
+        if self.puzzle is not None:
+            job_dict['puzzle'] = self.puzzle
+        if self.error is not None:
+            job_dict['error'] = self.error
+        return job_dict
+
+
+class CrosswordService:
+
+    def __init__(self, load_index, workers: int = DEFAULT_WORKERS,
+                 max_pending_jobs: int = DEFAULT_MAX_PENDING_JOBS, pool: PuzzlePool | None = None,
+                 pool_timeout_seconds: float = DEFAULT_JOB_TIMEOUT_SECONDS):
+        """
+        :param load_index: callable without arguments returning the words index, it is called once
+                           by every worker process (thus, it should be picklable)
+        :param workers: number of the worker processes
+        :param max_pending_jobs: maximal number of the queued and the running jobs of the requests
+        :param pool: pool of the puzzles solved ahead, it is refilled by replenish
+        :param pool_timeout_seconds: timeout of the solution search of a puzzle of the pool
+        """
+        super().__init__()
+        if workers < 1:
+            raise ServiceError("Number of the workers should be positive")
+        if max_pending_jobs < 1:
+            raise ServiceError("Maximal number of the pending jobs should be positive")
+        self._workers = workers
+        self._max_pending_jobs = max_pending_jobs
+        self._pending_jobs = 0
+        # jobs of the job API by their ids, the oldest first
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._pool = pool
+        self._pool_timeout_seconds = pool_timeout_seconds
+        # key of the pool to the number of its puzzles being solved
+        self._refilling: Counter[PoolKey] = Counter()
+        self._pool_taken = asyncio.Event()
+        # forked workers would inherit the sockets of the open connections and keep them open
+        self._executor = ProcessPoolExecutor(max_workers=workers,
+                                             mp_context=multiprocessing.get_context('spawn'),
+                                             initializer=_init_worker, initargs=(load_index,))
+
+    @property
+    def pending_jobs(self) -> int:
+        return self._pending_jobs
+
+    async def warm_up(self):
+        """
+        Starts the workers, thus the words index is loaded before the first request
+        """
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _ping)
+                               for _ in range(self._workers)))
+
+    def submit(self, request: FillRequest, keep=False) -> list[Job]:
+        """
+        :param request: request of the puzzles
+        :param keep: whether the jobs are kept for the job API
+        :return: jobs of the puzzles of the request
+        """
+        if self._pending_jobs + request.count > self._max_pending_jobs:
+            raise ServiceBusy(f"Too many pending jobs ({self._pending_jobs}), retry later")
+        seed = request.seed if request.seed is not None else random.randrange(MAX_SEED)
+        deadline = time.time() + request.timeout_seconds
+        jobs = []
+        for num in range(request.count):
+            job_seed = (seed + num) % MAX_SEED
+            job = Job(request, job_seed, deadline,
+                      self._executor.submit(_fill_in_worker, request, job_seed, deadline))
+            self._pending_jobs += 1
+            job.future.add_done_callback(functools.partial(self._job_finished, job))
+            if keep:
+                self._keep(job)
+            jobs.append(job)
+        return jobs
+
+    def _pool_key(self, request: FillRequest) -> PoolKey | None:
+        if self._pool is None or request.grid is not None or request.seed is not None \
+                or request.min_word_size != MIN_WORD_SIZE:
+            return None
+        key = PoolKey(request.size, request.symmetry, request.black_ratio)
+        return key if key in self._pool else None
+
+    def take_pooled(self, request: FillRequest) -> list[Puzzle]:
+        """
+        :return: puzzles of the request taken from the pool, up to the count of the request
+        """
+        key, pool = self._pool_key(request), self._pool
+        puzzles: list[Puzzle] = []
+        # no key without the pool
+        if key is None or pool is None:
+            return puzzles
+        while len(puzzles) < request.count and (puzzle := pool.take(key)) is not None:
+            puzzles.append(puzzle)
+        if puzzles:
+            self._pool_taken.set()
+        return puzzles
+
+    def _return_pooled(self, request: FillRequest, puzzles: list[Puzzle]):
+        key, pool = self._pool_key(request), self._pool
+        if key is None or pool is None:
+            return
+        for puzzle in puzzles:
+            pool.put(key, puzzle)
+
+    async def replenish(self):
+        """
+        Refills the keys of the pool fallen to their low-water marks by up to a job per worker.
+        Runs till it is cancelled.
+        """
+        if self._pool is not None:
+            await asyncio.gather(*(self._refill() for _ in range(self._workers)))
+
+    async def _refill(self):
+        while True:
+            key = self._pool.needed_key(self._refilling)
+            if key is None:
+                self._pool_taken.clear()
+                await self._pool_taken.wait()
+                continue
+            self._refilling[key] += 1
+            try:
+                puzzle = await self._solve_pooled(key)
+            finally:
+                self._refilling[key] -= 1
+            if puzzle is None:
+                await asyncio.sleep(POOL_RETRY_SECONDS)
+            else:
+                self._pool.put(key, puzzle)
+
+    async def _solve_pooled(self, key: PoolKey) -> Puzzle | None:
+        request = FillRequest(size=key.size, symmetry=key.symmetry, black_ratio=key.black_ratio,
+                              timeout_seconds=self._pool_timeout_seconds)
+        seed = random.randrange(MAX_SEED)
+        deadline = time.time() + request.timeout_seconds
+        try:
+            puzzle = await asyncio.wrap_future(
+                self._executor.submit(_fill_in_worker, request, seed, deadline))
+        except (Exception,):
+            return None
+        if puzzle['result'] != FinderResult.FOUND.name.lower():
+            return None
+        return Puzzle(seed, puzzle['grid'])
+
+    def _job_finished(self, job: Job, _future: asyncio.Future):
+        self._pending_jobs -= 1
+        job.finish()
+
+    def _keep(self, job: Job):
+        self._jobs[job.id] = job
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= MAX_KEPT_JOBS:
+                break
+            if self._jobs[job_id].status is not JobStatus.PENDING:
+                del self._jobs[job_id]
+
+    def job(self, job_id) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter):
+        """
+        Serves one request of the connection, the connection is closed after the response
+        """
+        try:
+            try:
+                method, path, body = await _read_request(reader)
+                await self._route(method, path, body, reader, writer)
+            except HttpError as e:
+                await _write_json(writer, e.status, {'error': str(e)}, e.headers)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _route(self, method, path, body, reader, writer):
+        if path == '/health':
+            _check_method(method, 'GET')
+            health = {'status': 'ok', 'workers': self._workers,
+                      'pending_jobs': self._pending_jobs}
+            if self._pool is not None:
+                health['pool'] = {str(key): self._pool.size(key) for key in self._pool.keys}
+            await _write_json(writer, HTTPStatus.OK, health)
+        elif path == '/fill':
+            _check_method(method, 'POST')
+            await self._fill(_parse_request(body), reader, writer)
+        elif path == '/jobs':
+            _check_method(method, 'POST')
+            jobs = self._submit(_parse_request(body), keep=True)
+            await _write_json(writer, HTTPStatus.ACCEPTED, {'ids': [job.id for job in jobs]})
+        elif path.startswith('/jobs/'):
+            await self._job_resource(method, path[len('/jobs/'):], writer)
+        else:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"Unknown path: {path}")
+
+    def _submit(self, request: FillRequest, keep=False) -> list[Job]:
+        try:
+            return self.submit(request, keep)
+        except ServiceBusy as e:
+            raise HttpError(HTTPStatus.SERVICE_UNAVAILABLE, str(e), ["Retry-After: 1"]) from e
+
+    async def _fill(self, request: FillRequest, reader, writer):
+        if request.output == OUTPUT_SVG and request.count > 1:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "SVG output is of a single puzzle")
+        pooled = self.take_pooled(request)
+        jobs = []
+        if len(pooled) < request.count:
+            try:
+                jobs = self._submit(replace(request, count=request.count - len(pooled)))
+            except HttpError:
+                self._return_pooled(request, pooled)
+                raise
+        try:
+            if request.count == 1 and pooled:
+                await _write_pooled(writer, pooled[0], request)
+                return
+            async with contextlib.aclosing(_finished_jobs(jobs, reader)) as finished_jobs:
+                if request.count == 1:
+                    async for job in finished_jobs:
+                        await _write_job(writer, job, request.output == OUTPUT_SVG)
+                    return
+                writer.write(_head(HTTPStatus.OK, JSON_LINES_CONTENT_TYPE,
+                                   ["Transfer-Encoding: chunked"]))
+                for puzzle in pooled:
+                    await _write_chunk(writer, json.dumps(_pooled_dict(puzzle)).encode() + b'\n')
+                async for job in finished_jobs:
+                    await _write_chunk(writer, json.dumps(job.as_dict()).encode() + b'\n')
+                await _write_chunk(writer, b'')
+        finally:
+            # the client has disconnected or the response has failed
+            for job in jobs:
+                job.cancel()
+
+    async def _job_resource(self, method, resource, writer):
+        job_id, svg_suffix, _ = resource.partition('.svg')
+        job = self.job(job_id)
+        if job is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"Unknown job: {job_id}")
+        if method == 'DELETE':
+            job.cancel()
+            await _write_json(writer, HTTPStatus.OK, job.as_dict())
+            return
+        _check_method(method, 'GET')
+        if not svg_suffix:
+            await _write_json(writer, HTTPStatus.OK, job.as_dict())
+        elif job.status is not JobStatus.DONE:
+            raise HttpError(HTTPStatus.CONFLICT, f"Job {job_id} is {job.status.value}")
+        else:
+            await _write_job(writer, job, svg=True)
+
+
+async def _finished_jobs(jobs: list[Job], reader: asyncio.StreamReader):
+    """
+    :return: asynchronous iterator of the jobs in the order they are finished, it is stopped once
+             the client disconnects (the client is not expected to send anything else)
+    """
+    waiting: set[asyncio.Future] = {asyncio.ensure_future(job.wait()) for job in jobs}
+    disconnected = asyncio.ensure_future(reader.read(1))
+    try:
+        while waiting:
+            done, _ = await asyncio.wait(waiting | {disconnected},
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if disconnected in done:
+                return
+            for task in done:
+                waiting.discard(task)
+                yield task.result()
+    finally:
+        disconnected.cancel()
+        for task in waiting:
+            task.cancel()
+
+
+def _check_method(method, allowed):
+    if method != allowed:
+        raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f"Method {method} is not allowed",
+                        [f"Allow: {allowed}"])
+
+
+def _parse_request(body: bytes) -> FillRequest:
+    try:
+        return FillRequest.from_dict(json.loads(body or b'{}'))
+    except (ValueError, FillRequestError) as e:
+        raise HttpError(HTTPStatus.BAD_REQUEST, str(e)) from e
+
+
+async def _read_request(reader: asyncio.StreamReader) -> tuple[str, str, bytes]:
+    """
+    :return: the method, the path and the body of the request
+    """
+    request_line = await reader.readline()
+    if not request_line:
+        raise ConnectionResetError("The client has closed the connection")
+    try:
+        method, target, _ = request_line.decode('latin-1').split()
+    except ValueError as e:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Malformed request line") from e
+    content_length = 0
+    while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            try:
+                content_length = int(value)
+            except ValueError as e:
+                raise HttpError(HTTPStatus.BAD_REQUEST, "Malformed content length") from e
+    if not 0 <= content_length <= MAX_REQUEST_BYTES:
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                        f"Request should not exceed {MAX_REQUEST_BYTES} bytes")
+    body = await reader.readexactly(content_length)
+    return method.upper(), urlsplit(target).path, body
+
+
+def _head(status: HTTPStatus, content_type, headers=()) -> bytes:
+    lines = [f"HTTP/1.1 {status.value} {status.phrase}", f"Content-Type: {content_type}",
+             "Connection: close", *headers]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1')
+
+
+async def _write_response(writer, status: HTTPStatus, content_type, body: bytes, headers=()):
+    writer.write(_head(status, content_type, [f"Content-Length: {len(body)}", *headers]) + body)
+    await writer.drain()
+
+
+async def _write_json(writer, status: HTTPStatus, obj, headers=()):
+    await _write_response(writer, status, JSON_CONTENT_TYPE, json.dumps(obj).encode(), headers)
+
+
+async def _write_chunk(writer, data: bytes):
+    writer.write(b'%x\r\n%s\r\n' % (len(data), data))
+    await writer.drain()
+
+
+async def _write_job(writer, job: Job, svg=False):
+    puzzle = job.puzzle
+    if svg and puzzle is not None and 'svg' in puzzle:
+        await _write_response(writer, HTTPStatus.OK, SVG_CONTENT_TYPE, puzzle['svg'].encode(),
+                              [f"X-Crossword-Result: {puzzle['result']}"])
+    elif svg and job.status is JobStatus.DONE and puzzle is not None:
+        raise HttpError(HTTPStatus.NOT_FOUND, f"Job {job.id} has no picture of the puzzle "
+                                              f"(result: {puzzle['result']})")
+    else:
+        await _write_json(writer, HTTPStatus.OK, job.as_dict())
+
+
+def _pooled_dict(puzzle: Puzzle) -> dict:
+    return {'status': JobStatus.DONE.value, 'seed': puzzle.seed, 'puzzle': puzzle.as_dict()}
+
+
+async def _write_pooled(writer, puzzle: Puzzle, request: FillRequest):
+    if request.output != OUTPUT_SVG:
+        await _write_json(writer, HTTPStatus.OK, _pooled_dict(puzzle))
+        return
+    svg = render_svg(puzzle.cross_words_index(), request.picture_pixels)
+    await _write_response(writer, HTTPStatus.OK, SVG_CONTENT_TYPE, svg.encode(),
+                          [f"X-Crossword-Result: {puzzle.as_dict()['result']}"])
+
+
+async def serve(service: CrosswordService, host=DEFAULT_HOST, port=DEFAULT_PORT,
+                unix_socket: str | None = None):
+    """
+    Serves the requests (and refills the pool of the service) till the task is cancelled
+
+    :param unix_socket: path of the Unix socket to listen on instead of the TCP port
+    """
+    await service.warm_up()
+    if unix_socket is not None:
+        server = await asyncio.start_unix_server(service.handle_connection, path=unix_socket)
+    else:
+        server = await asyncio.start_server(service.handle_connection, host, port)
+    replenish = asyncio.create_task(service.replenish())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        replenish.cancel()
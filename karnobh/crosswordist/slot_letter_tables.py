@@ -0,0 +1,94 @@
+"""
+This module contains the tables of the letters which can still appear on the positions of a slot
+(a word layout) given its current letters. A table is a list of bitmasks, one per position, where
+bit N is set if the letter of code N appears on the position in at least one possible word.
+
+The tables are cached by the length and the mapping of the slot. When the solver sets a letter of
+a slot, the slot's domain shrinks and its table is computed once for the new mapping, all further
+checks against that slot are table lookups instead of bitmap intersections. The domain (the letter
+codes of the possible words) is cached along with the table, thus the domain of a mapping which
+extends a cached mapping by one letter is filtered from the cached domain instead of a lookup.
+
+Examples:
+    >>> from karnobh.crosswordist.words_index import WordsIndex
+    >>> with WordsIndex.as_context(alphabet="ABCT") as wi:
+    ...     for word in ["CAT", "BAT", "TAB", "ACT"]:
+    ...         _ = wi.add_word(word)
+    >>> tables = SlotLetterTables(wi)
+    >>> [bin(mask) for mask in tables.table(3, {1: 0})]
+    ['0b1110', '0b1', '0b1010']
+    >>> tables.letter_fits(3, {1: 0}, 2, wi.alphabet.code('B'))
+    True
+    >>> tables.letter_fits(3, {1: 0}, 2, wi.alphabet.code('C'))
+    False
+"""
+
+from karnobh.crosswordist.words_index import WordsIndex
+
+# the number of cached tables after which the cache is cleared
+MAX_CACHED_TABLES = 100_000
+
+
+class SlotLetterTables:
+    """
+    Cache of the per position letter tables of the slots
+    """
+
+    def __init__(self, word_index: WordsIndex, max_cached_tables: int = MAX_CACHED_TABLES):
+        super().__init__()
+        self._word_index = word_index
+        self._max_cached_tables = max_cached_tables
+        # (length, mapping items) to (table, domain)
+        self._tables: dict[tuple[int, tuple], tuple[list[int], list]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._tables)
+
+    def _domain(self, length, mapping) -> list:
+        """
+        :return: letter codes of the possible words of the slot, filtered from the domain of a
+                 cached mapping with one letter less if there is such
+        """
+        items = tuple(mapping.items())
+        for num, (pos, letter) in enumerate(items):
+            parent = self._tables.get((length, items[:num] + items[num + 1:]))
+            if parent is not None:
+                code = self._word_index.alphabet.to_code(letter)
+                return [word for word in parent[1] if word[pos] == code]
+        if mapping:
+            return list(self._word_index.lookup_codes(length, mapping))
+        words_index_same_len = self._word_index.word_index_by_length(length)
+        return [words_index_same_len.letters_at(i) for i in range(len(words_index_same_len.words))]
+
+    def _compute_table(self, domain, length) -> list[int]:
+        table = []
+        for column in zip(*domain):
+            mask = 0
+            for code in set(column):
+                mask |= 1 << code
+            table.append(mask)
+        return table or [0] * length
+
+    def table(self, length: int, mapping: dict) -> list[int]:
+        """
+        :param length: length of the slot
+        :param mapping: position to letter code mapping of the slot
+        :return: bitmasks of the letter codes which may appear on every position of the slot
+        """
+        key = (length, tuple(mapping.items()))
+        cached = self._tables.get(key)
+        if cached is None:
+            self.misses += 1
+            domain = self._domain(length, mapping)
+            if len(self._tables) >= self._max_cached_tables:
+                self._tables.clear()
+            cached = (self._compute_table(domain, length), domain)
+            self._tables[key] = cached
+        else:
+            self.hits += 1
+        return cached[0]
+
+    def letter_fits(self, length: int, mapping: dict, position: int, code: int) -> bool:
+        return bool((self.table(length, mapping)[position] >> code) & 1)
@@ -2,13 +2,26 @@
 This module is responsible for finding solution in provided Word Index and Cross Words Index.
 Word Index is the index of all available words.
 Cross Words Index is graph of vertical and horizontal words with their crossings.
+
+While the solution is searched, the letters in the Cross Words Index are the letter codes of the
+Word Index's alphabet. They are converted back to the letters when the search is over.
+
+The letters set before the search (e.g., the theme entries of a partially filled grid) are kept,
+only the remaining slots are solved. Such letters are checked up front by check_prefilled_words.
 """
 import random
 import time
 from enum import Enum
+from typing import cast
 
+from karnobh.crosswordist.bitmap import CompressedBitmap2
 from karnobh.crosswordist.words_index import WordsIndex
-from karnobh.crosswordist.grid_generator import CrossWordsIndex, WordLayout
+from karnobh.crosswordist.grid_generator import CrossWordsIndex, WordLayout, EMPTY_LETTER
+from karnobh.crosswordist.slot_letter_tables import SlotLetterTables, MAX_CACHED_TABLES
+from karnobh.crosswordist.search_stats import SearchStats, InstrumentedWordsIndex, NULL_STATS
+
+# maximal number of the candidates scored by the least constraining value ordering
+MAX_SCORED_CANDIDATES = 1024
 
 
 class FinderResult(Enum):
@@ -20,44 +33,228 @@ class FinderResult(Enum):
     TIMED_OUT = 2
 
 
-def _get_words_from_index(word_layout: WordLayout, word_index: WordsIndex):
-    if word_layout.filled_letters:
-        return list(word_index.lookup(
-            length=word_layout.word_len,
-            mapping=word_layout.mapping
-        ))
-    return list(word_index.word_index_by_length(word_layout.word_len))
+class CandidateOrder(Enum):
+    """
+    Order in which the candidate words of a word layout are tried
+    """
+    RANDOM = 0
+    # the order of the index, i.e., the highest scores first if the words of the index are scored
+    BEST_FIRST = 1
+    # the words leaving the most possibilities to the crossing words first
+    LEAST_CONSTRAINING = 2
+
+
+class PrefilledWordsError(Exception):
+    pass
+
+
+class UsedWords:
+    """
+    Indexes of the words which are already in the crossword, by the length of the words. The words
+    are excluded from the candidates and the counts of the other word layouts by the bitmap of the
+    still available words of the length, which is AND-ed inside the lookups (see the mask argument
+    of the words index). The bitmap of a length is rebuilt lazily once its used words change.
+    """
+
+    def __init__(self, word_index: WordsIndex):
+        super().__init__()
+        self._word_index = word_index
+        self._used: dict[int, set[int]] = {}
+        self._masks: dict[int, CompressedBitmap2] = {}
+
+    def used(self, length: int) -> set[int]:
+        return self._used.setdefault(length, set())
+
+    def _available_bitmap(self, length: int) -> CompressedBitmap2:
+        words_num = len(self._word_index.word_index_by_length(length).words)
+        # the same number of bytes as the bitmaps of the index (see bool_to_byte_bits_seq)
+        available = bytearray(b'\xff' * (words_num // 8 + 1))
+        available[-1] = (0xFF << (8 - words_num % 8)) & 0xFF
+        for word_index in self._used[length]:
+            available[word_index >> 3] &= ~(0x80 >> (word_index & 7))
+        return CompressedBitmap2(available)
 
+    @property
+    def masks(self) -> dict[int, CompressedBitmap2]:
+        """
+        :return: length to bitmap of the available words mapping, only the lengths which have used
+                 words are in the mapping
+        """
+        for length, used in self._used.items():
+            if used and length not in self._masks:
+                self._masks[length] = self._available_bitmap(length)
+        return self._masks
 
-def _check_possibilities(word_layout: WordLayout, word_index: WordsIndex):
-    if word_layout.filled_letters:
-        return word_index.count_occurrences(
-            length=word_layout.word_len,
-            mapping=word_layout.mapping
-        )
-    return len(word_index.word_index_by_length(word_layout.word_len).words)
+    def index_of(self, word_layout: WordLayout) -> int | None:
+        """
+        :param word_layout: fully filled word layout
+        :return: index of the word of the layout or None if there is no such word
+        """
+        indexes = self._word_index.lookup_indexes(word_layout.word_len, word_layout.mapping)
+        return next(iter(indexes), None)
 
+    def add(self, words: list[tuple[int, int]]) -> list[tuple[int, int]] | None:
+        """
+        :param words: (length, index) pairs of the words which are not in the used words yet
+        :return: the added pairs or None if some word is already used (in such case nothing is
+                 added)
+        """
+        added: list[tuple[int, int]] = []
+        for length, word_index in words:
+            used = self.used(length)
+            if word_index in used:
+                self.remove(added)
+                return None
+            used.add(word_index)
+            self._masks.pop(length, None)
+            added.append((length, word_index))
+        return added
+
+    def remove(self, added: list[tuple[int, int]]):
+        for length, word_index in added:
+            self._used[length].discard(word_index)
+            self._masks.pop(length, None)
+
+
+def _get_words_from_index(word_layout: WordLayout, word_index: WordsIndex,
+                          used_words: UsedWords | None = None) -> tuple[list, list]:
+    """
+    :return: indexes of the candidate words of the layout and their letter codes
+    """
+    words_index_same_len = word_index.word_index_by_length(word_layout.word_len)
+    mask = used_words.masks.get(word_layout.word_len) if used_words is not None else None
+    indexes = list(word_index.lookup_indexes(length=word_layout.word_len,
+                                             mapping=word_layout.mapping, mask=mask))
+    return indexes, [words_index_same_len.letters_at(i) for i in indexes]
+
+
+def _have_possibilities(word_layouts: list[WordLayout], word_index: WordsIndex,
+                        masks=None) -> bool:
+    """
+    Checks all word layouts by one batched lookup
+    """
+    patterns = [(w.word_len, w.mapping) for w in word_layouts]
+    return word_index.do_all_intersections_exist(patterns, masks)
+
+
+def _crossing_masks(word_layout: WordLayout,
+                    letter_tables: SlotLetterTables) -> list[tuple[int, int]]:
+    """
+    :return: (position, bitmask of the letter codes) pairs of the empty positions of the layout.
+             The bitmask contains the letters which the crossing word of the position still
+             accepts.
+    """
+    masks: list[tuple[int, int]] = []
+    for pos, letter in enumerate(word_layout.word_letters):
+        if letter != EMPTY_LETTER:
+            continue
+        crossing_layout, crossing_pos = word_layout.word_intersects[pos]
+        table = letter_tables.table(crossing_layout.word_len, crossing_layout.mapping)
+        masks.append((pos, table[crossing_pos]))
+    return masks
 
-def _has_possibility(word_layout: WordLayout, word_index: WordsIndex):
-    if word_layout.filled_letters:
-        return word_index.does_intersection_exist(
-            length=word_layout.word_len,
-            mapping=word_layout.mapping
-        )
-    return len(word_index.word_index_by_length(word_layout.word_len).words) != 0
 
+def _fits_crossings(word, crossing_masks) -> bool:
+    return all((mask >> word[pos]) & 1 for pos, mask in crossing_masks)
 
-def _min_possible_word_layout_non_full(word_layouts, word_index: WordsIndex):
-    layouts_with_possibilities = [(w, _check_possibilities(w, word_index))
-                                  for w in word_layouts if not w.full]
-    if not layouts_with_possibilities:
+
+def _least_constraining_first(word_layout: WordLayout, words_to_check: list, word_index: WordsIndex,
+                              max_scored: int, masks=None) -> tuple[list, int]:
+    """
+    Orders the candidate (index, letter codes) pairs of the layout by the number of possibilities
+    they leave to the crossing words (the product of the possibilities of all crossings of the empty
+    positions). A crossing word shares only one letter with the layout, thus the possibilities are
+    counted once per position and letter.
+
+    :return: ordered candidates and the number of leading candidates which are already known to
+             leave possibilities to all crossing words. Candidates which leave no possibilities are
+             dropped. Only the first max_scored candidates are scored, others follow them in the
+             original order.
+    """
+    scored, rest = words_to_check[:max_scored], words_to_check[max_scored:]
+    empty_positions = [pos for pos, letter in enumerate(word_layout.word_letters)
+                       if letter == EMPTY_LETTER]
+    keys, patterns = [], []
+    for pos in empty_positions:
+        crossing_layout, crossing_pos = word_layout.word_intersects[pos]
+        mapping = crossing_layout.mapping
+        for code in {letters[pos] for _, letters in scored}:
+            keys.append((pos, code))
+            patterns.append((crossing_layout.word_len, {**mapping, crossing_pos: code}))
+    counts = dict(zip(keys, word_index.count_occurrences_batch(patterns, masks)))
+    scores = []
+    for _, letters in scored:
+        score = 1
+        for pos in empty_positions:
+            score *= counts[(pos, letters[pos])]
+        scores.append(score)
+    ordered = [word for score, word in sorted(zip(scores, scored), key=lambda sw: -sw[0])
+               if score > 0]
+    return ordered + rest, len(ordered)
+
+
+def _min_possible_word_layout_non_full(word_layouts, word_index: WordsIndex, masks=None):
+    non_full_layouts = [w for w in word_layouts if not w.full]
+    if not non_full_layouts:
         return None
+    possibilities = word_index.count_occurrences_batch([(w.word_len, w.mapping)
+                                                        for w in non_full_layouts], masks)
+    layouts_with_possibilities = zip(non_full_layouts, possibilities)
     return min(layouts_with_possibilities, key=lambda _wp: _wp[1])[0]
 
 
+def _describe_layout(word_layout: WordLayout) -> str:
+    return (f"{word_layout.direction.name.lower()} word at row {word_layout.y_init + 1}, "
+            f"column {word_layout.x_init + 1}")
+
+
+def check_prefilled_words(word_index: WordsIndex, cross_words_index: CrossWordsIndex,
+                          unique_words: bool = True):
+    """
+    Checks the letters set in the crossword before the search: the letters should be of the
+    alphabet of the index, every full word should be in the index (once if the words are unique)
+    and every other word should have at least one possible word.
+
+    :param word_index: The index of all words.
+    :param cross_words_index: The crossword with the letters (not the letter codes) set
+    :param unique_words: Whether every word may appear in the crossword only once
+    :raise PrefilledWordsError: describing all inconsistent words
+    """
+    alphabet = word_index.alphabet
+    lengths = set(word_index.lengths)
+    problems = []
+    full_words = set()
+    for word_layout in cross_words_index.all:
+        word = "".join(letter or '.' for letter in word_layout.word_letters)
+        description = f"{_describe_layout(word_layout)} '{word}'"
+        if word_layout.word_len not in lengths:
+            problems.append(f"{description}: no words of length {word_layout.word_len}")
+            continue
+        unknown_letters = [letter for letter in word_layout.mapping.values()
+                           if letter not in alphabet]
+        if unknown_letters:
+            problems.append(f"{description}: letters not in the alphabet: "
+                            f"{''.join(unknown_letters)}")
+        elif not word_index.does_intersection_exist(word_layout.word_len, word_layout.mapping):
+            problems.append(f"{description}: not in the words index" if word_layout.full else
+                            f"{description}: no possible words")
+        elif word_layout.full and unique_words:
+            if word in full_words:
+                problems.append(f"{description}: repeated")
+            full_words.add(word)
+    if problems:
+        raise PrefilledWordsError("Inconsistent words of the grid. " + "; ".join(problems))
+
+
 def find_solution(word_index: WordsIndex,
                   cross_words_index: CrossWordsIndex,
-                  timeout_after_seconds: float) -> FinderResult:
+                  timeout_after_seconds: float,
+                  candidate_order: CandidateOrder = CandidateOrder.RANDOM,
+                  max_scored_candidates: int = MAX_SCORED_CANDIDATES,
+                  use_letter_tables: bool = True,
+                  unique_words: bool = True,
+                  stats: SearchStats | None = None,
+                  letter_tables: SlotLetterTables | None = None) -> FinderResult:
     """
     This is the main function which is responsible for finding words in the provided index and
     words' graph of a crossword's grid.
@@ -86,41 +283,173 @@ def find_solution(word_index: WordsIndex,
     :param word_index: The index of all words.
     :param cross_words_index: The index (or graph) of all crossing words in a graph
     :param timeout_after_seconds: The time in seconds that the algorthm drops its execution
+    :param candidate_order: The order of trying the possible words. Random by default, with the
+                            best first order the words of the highest scores are tried first.
+                            With the least constraining order the words which leave the most
+                            possibilities to the crossing words are tried first.
+    :param max_scored_candidates: The maximal number of candidates scored by the least constraining
+                                  order
+    :param use_letter_tables: Whether candidates are checked against the cached letter tables of the
+                              crossing words instead of the bitmap intersections. A crossing word
+                              shares one letter with the candidate, thus both checks are equal.
+    :param unique_words: Whether every word may appear in the crossword only once. The check covers
+                         the words completed by the crossing words and the words set before the
+                         search as well.
+    :param stats: Statistics of the search (see search_stats module): the nodes, backtracks and
+                  the time spent by the depth of the search, the lookups by their type and the
+                  letter table cache hits. Nothing is collected by default.
+    :param letter_tables: The letter tables shared by the searches in the same index (see
+                          FillSession), new tables are created by default if they are used.
     :return: One of the possible results: Solution found, No solution, Timed out
     """
-    def _find_solution(current_word: WordLayout) -> FinderResult:
-        words_to_check = _get_words_from_index(word_layout=current_word,
-                                               word_index=word_index)
-        random.shuffle(words_to_check)
-        for word_to_check in words_to_check:
-            if word_to_check in in_crossword_words:
-                continue
+    search_stats: SearchStats = NULL_STATS if stats is None else stats
+
+    def _find_solution(current_word: WordLayout, depth: int) -> FinderResult:
+        if not search_stats.enabled:
+            return _find_solution_at(current_word, depth)
+        search_stats.incr("nodes", depth=depth)
+        with search_stats.timer("depth_seconds", depth=depth):
+            return _find_solution_at(current_word, depth)
+
+    def _masks():
+        return used_words.masks if used_words is not None else None
+
+    def _find_solution_at(current_word: WordLayout, depth: int) -> FinderResult:
+        indexes, words = _get_words_from_index(word_layout=current_word,
+                                               word_index=searched_index,
+                                               used_words=used_words)
+        # (index, letter codes) pairs, the index of a set word is carried to the used words
+        words_to_check = list(zip(indexes, words))
+        search_stats.incr("candidates", len(words_to_check))
+        if candidate_order is not CandidateOrder.BEST_FIRST:
+            random.shuffle(words_to_check)
+        verified_num = 0
+        if candidate_order is CandidateOrder.LEAST_CONSTRAINING:
+            words_to_check, verified_num = _least_constraining_first(current_word, words_to_check,
+                                                                     searched_index,
+                                                                     max_scored_candidates,
+                                                                     _masks())
+        crossing_layouts = [layout for layout, _ in current_word.word_intersects]
+        # computed on the first candidate which is not verified yet
+        crossing_masks = None
+        for word_num, (index_to_check, word_to_check) in enumerate(words_to_check):
+            if letter_tables is not None and word_num >= verified_num:
+                if crossing_masks is None:
+                    crossing_masks = _crossing_masks(current_word, letter_tables)
+                if not _fits_crossings(word_to_check, crossing_masks):
+                    continue
+                # the table check is equal to the check of the crossings, however, the tables do
+                # not exclude the used words, these are caught while adding the used words
+                verified = True
+            else:
+                verified = word_num < verified_num
             # get a copy of the letters
             prev_state = list(current_word.word_letters)
             current_word.set_word(word_to_check)
-            words_intersect_not_good = False
-            for current_word_intersect in current_word.word_intersects:
-                current_word_intersect_layout, _ = current_word_intersect
-                if not _has_possibility(current_word_intersect_layout, word_index):
+            # the crossings which were full already are in the used words, thus only the crossings
+            # of the empty positions are checked
+            open_crossings = [layout for pos, layout in enumerate(crossing_layouts)
+                              if prev_state[pos] == EMPTY_LETTER]
+            added_words: list[tuple[int, int]] = []
+            if used_words is not None:
+                # the word itself and the crossing words completed by it
+                completed = [(current_word.word_len, index_to_check)]
+                for layout in open_crossings:
+                    if layout.full:
+                        completed.append((layout.word_len, used_words.index_of(layout)))
+                if any(index is None for _, index in completed):
+                    current_word.set_word(prev_state)
+                    continue
+                added = used_words.add(completed)
+                if added is None:
                     current_word.set_word(prev_state)
-                    words_intersect_not_good = True
-                    break
-            if words_intersect_not_good:
+                    continue
+                added_words = added
+            if not verified and not _have_possibilities([w for w in open_crossings if not w.full],
+                                                        searched_index, _masks()):
+                if used_words is not None:
+                    used_words.remove(added_words)
+                current_word.set_word(prev_state)
                 continue
             next_word_layout_inner = _min_possible_word_layout_non_full(cross_words_index.all,
-                                                                        word_index)
+                                                                        searched_index, _masks())
             if next_word_layout_inner is None:
                 return FinderResult.FOUND
-            res = _find_solution(next_word_layout_inner)
+            res = _find_solution(next_word_layout_inner, depth + 1)
             if res in (FinderResult.FOUND, FinderResult.TIMED_OUT):
                 return res
+            search_stats.incr("backtracks", depth=depth)
+            if used_words is not None:
+                used_words.remove(added_words)
             current_word.set_word(prev_state)
         if time.time() - start_time > timeout_after_seconds:
             return FinderResult.TIMED_OUT
         return FinderResult.NO_SOLUTION
 
-    next_word_layout = _min_possible_word_layout_non_full(cross_words_index.all,
-                                                          word_index)
-    in_crossword_words: set[str] = set()
-    start_time = time.time()
-    return _find_solution(next_word_layout)
+    # the instrumented index forwards everything but the lookups to the index, thus it is searched
+    # as the index itself
+    searched_index = (cast(WordsIndex, InstrumentedWordsIndex(word_index, search_stats))
+                      if search_stats.enabled else word_index)
+    alphabet = searched_index.alphabet
+    if not use_letter_tables:
+        letter_tables = None
+    elif letter_tables is None:
+        letter_tables = SlotLetterTables(searched_index)
+    # shared tables count the lookups of the previous searches as well
+    tables_hits, tables_misses = ((letter_tables.hits, letter_tables.misses)
+                                  if letter_tables is not None else (0, 0))
+    cross_words_index.map_letters(alphabet.to_code)
+    try:
+        used_words = UsedWords(searched_index) if unique_words else None
+        if used_words is not None:
+            # the words set before the search are not repeated
+            indexes = [(w.word_len, used_words.index_of(w)) for w in cross_words_index.all
+                       if w.full]
+            prefilled: list[tuple[int, int]] = [(word_len, index) for word_len, index in indexes
+                                                if index is not None]
+            if used_words.add(prefilled) is None:
+                return FinderResult.NO_SOLUTION
+        next_word_layout = _min_possible_word_layout_non_full(cross_words_index.all,
+                                                              searched_index, _masks())
+        if next_word_layout is None:
+            return FinderResult.FOUND
+        start_time = time.time()
+        with search_stats.timer("search_seconds"):
+            return _find_solution(next_word_layout, 0)
+    finally:
+        cross_words_index.map_letters(alphabet.letter)
+        if letter_tables is not None:
+            search_stats.incr("letter_table_hits", letter_tables.hits - tables_hits)
+            search_stats.incr("letter_table_misses", letter_tables.misses - tables_misses)
+
+
+class FillSession:
+    """
+    Fills the crosswords of the same words index one after another, e.g., the re-fills of a grid
+    after its pre-filled words are edited. The letter tables and the domains of the slots are kept
+    between the fills, thus a re-fill looks up only the patterns which were not met before.
+    """
+
+    def __init__(self, word_index: WordsIndex,
+                 candidate_order: CandidateOrder = CandidateOrder.RANDOM,
+                 unique_words: bool = True,
+                 max_cached_tables: int = MAX_CACHED_TABLES):
+        super().__init__()
+        self._word_index = word_index
+        self._candidate_order = candidate_order
+        self._unique_words = unique_words
+        self.letter_tables = SlotLetterTables(word_index, max_cached_tables)
+
+    def fill(self, cross_words_index: CrossWordsIndex, timeout_after_seconds: float,
+             stats: SearchStats | None = None) -> FinderResult:
+        """
+        Checks the letters set in the crossword and solves its remaining slots
+
+        :raise PrefilledWordsError: if the set letters are inconsistent
+        :return: the result of the search, the crossword is filled if the solution is found
+        """
+        check_prefilled_words(self._word_index, cross_words_index, self._unique_words)
+        return find_solution(self._word_index, cross_words_index, timeout_after_seconds,
+                             candidate_order=self._candidate_order,
+                             unique_words=self._unique_words, stats=stats,
+                             letter_tables=self.letter_tables)
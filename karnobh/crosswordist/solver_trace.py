@@ -0,0 +1,286 @@
+"""
+This module contains the recording and the replay of the solver traces. A trace keeps the runs of
+the solver: the seed of the random state the grid was generated from, the grid itself and the
+sequence of the index queries of the solution search. A trace is replayed against any words index
+implementation, thus the query throughput of the implementations is compared in isolation from the
+search and from the randomness of the grids and of the shuffled candidates.
+
+The trace is a binary file: the magic bytes and the version are followed by records, every record
+starts with a byte of its kind (all numbers are little-endian):
+    - run: seed (uint64), width and height (uint16), the grid cells (a byte per cell)
+    - mask: id (uint32), length of the words (uint16), size (uint32) and the compressed bitmap
+    - query: number of the patterns (uint32), every pattern is the length of the words (uint16),
+      the id of the mask (uint32, 0 is no mask), the number of the letters (uint8) and the
+      position (uint8) and the letter code (uint16) of every letter
+A mask (e.g., the available words of the solver) is written once, before the first query using it.
+A query refers only to the last written mask of the length of its pattern.
+
+Examples:
+    >>> import io
+    >>> from karnobh.crosswordist.affine_2d import FlatMatrix
+    >>> trace = io.BytesIO()
+    >>> writer = TraceWriter(trace)
+    >>> writer.start_run(7, FlatMatrix(3, 3))
+    >>> writer.query(QueryKind.COUNT_BATCH, [(3, {0: 2}), (3, {})])
+    >>> _ = trace.seek(0)
+    >>> run, query = read_trace(trace)
+    >>> run.seed, run.grid.size
+    (7, (3, 3))
+    >>> query.kind, query.patterns, query.masks
+    (<QueryKind.COUNT_BATCH: 20>, [(3, {0: 2}), (3, {})], {})
+"""
+
+import struct
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+
+from karnobh.crosswordist.affine_2d import FlatMatrix
+from karnobh.crosswordist.bitmap import CompressedBitmap2
+from karnobh.crosswordist.search_stats import SearchStats
+
+MAGIC = b'CWTRACE'
+VERSION = 1
+
+_RECORD_RUN = 1
+_RECORD_MASK = 2
+
+_KIND = struct.Struct('<B')
+_RUN = struct.Struct('<QHH')
+_MASK = struct.Struct('<IHI')
+_PATTERNS_NUM = struct.Struct('<I')
+_PATTERN = struct.Struct('<HIB')
+_LETTER = struct.Struct('<BH')
+
+
+class TraceError(Exception):
+    pass
+
+
+class QueryKind(Enum):
+    """
+    Kinds of the index queries, the values are the record kinds of the trace
+    """
+    LIST = 16
+    COUNT = 17
+    EXISTS = 18
+    COUNT_BATCH = 20
+    EXISTS_BATCH = 21
+    ALL_EXIST = 22
+
+
+@dataclass
+class TraceRun:
+    seed: int
+    grid: FlatMatrix
+
+
+@dataclass
+class TraceQuery:
+    kind: QueryKind
+    # (length, mapping of the positions to the letter codes) pairs
+    patterns: list[tuple[int, dict[int, int]]]
+    # length to the mask of the patterns of the length
+    masks: dict[int, CompressedBitmap2] = field(default_factory=dict)
+
+
+class TraceWriter:
+
+    def __init__(self, file):
+        """
+        :param file: binary file to write the trace to
+        """
+        super().__init__()
+        self._file = file
+        # length to the last written mask and its id in the trace
+        self._masks: dict[int, tuple[CompressedBitmap2, int]] = {}
+        self._masks_num = 0
+        file.write(MAGIC + bytes((VERSION,)))
+
+    def start_run(self, seed: int, grid: FlatMatrix):
+        """
+        :param seed: seed of the random state the grid was generated from
+        :param grid: grid of the run, the following queries are of its solution search
+        """
+        width, height = grid.size
+        self._file.write(_KIND.pack(_RECORD_RUN) + _RUN.pack(seed, width, height)
+                         + bytes(grid.data))
+
+    def _mask_id(self, length, mask) -> int:
+        if mask is None:
+            return 0
+        written = self._masks.get(length)
+        if written is not None and written[0] is mask:
+            return written[1]
+        self._masks_num += 1
+        mask_id = self._masks_num
+        self._masks[length] = (mask, mask_id)
+        compressed = bytes(mask.compressed_sequence)
+        self._file.write(_KIND.pack(_RECORD_MASK) + _MASK.pack(mask_id, length, len(compressed))
+                         + compressed)
+        return mask_id
+
+    def query(self, kind: QueryKind, patterns, masks=None):
+        """
+        :param kind: kind of the query
+        :param patterns: (length, mapping) pairs, letters of the mappings are letter codes
+        :param masks: length to the mask of the patterns of the length
+        """
+        masks = masks or {}
+        mask_ids = {length: self._mask_id(length, masks.get(length)) for length, _ in patterns}
+        chunks = [_KIND.pack(kind.value), _PATTERNS_NUM.pack(len(patterns))]
+        for length, mapping in patterns:
+            chunks.append(_PATTERN.pack(length, mask_ids[length], len(mapping)))
+            chunks += [_LETTER.pack(pos, code) for pos, code in mapping.items()]
+        self._file.write(b''.join(chunks))
+
+
+def _read(file, size) -> bytes:
+    data = file.read(size)
+    if len(data) != size:
+        raise TraceError("Unexpected end of the trace")
+    return data
+
+
+def read_trace(file):
+    """
+    :param file: binary file of the trace
+    :return: iterator of the runs (TraceRun) and the queries (TraceQuery) in the order of the trace
+    """
+    header = file.read(len(MAGIC) + 1)
+    if header[:len(MAGIC)] != MAGIC:
+        raise TraceError("Not a solver trace")
+    if header[len(MAGIC):] != bytes((VERSION,)):
+        raise TraceError(f"Unsupported version of the trace: {header[len(MAGIC):]!r}")
+    masks = {}
+    while kind_byte := file.read(_KIND.size):
+        kind, = _KIND.unpack(kind_byte)
+        if kind == _RECORD_RUN:
+            seed, width, height = _RUN.unpack(_read(file, _RUN.size))
+            yield TraceRun(seed, FlatMatrix(width, height, list(_read(file, width * height))))
+        elif kind == _RECORD_MASK:
+            mask_id, length, size = _MASK.unpack(_read(file, _MASK.size))
+            masks[length] = (mask_id, CompressedBitmap2(None,
+                                                        compressed_sequence=_read(file, size)))
+        else:
+            try:
+                query_kind = QueryKind(kind)
+            except ValueError as e:
+                raise TraceError(f"Unknown record of the trace: {kind}") from e
+            patterns_num, = _PATTERNS_NUM.unpack(_read(file, _PATTERNS_NUM.size))
+            query = TraceQuery(query_kind, [])
+            for _ in range(patterns_num):
+                length, mask_id, letters_num = _PATTERN.unpack(_read(file, _PATTERN.size))
+                letters = _read(file, _LETTER.size * letters_num)
+                query.patterns.append((length, dict(_LETTER.iter_unpack(letters))))
+                if mask_id:
+                    written_id, mask = masks.get(length, (None, None))
+                    if written_id != mask_id:
+                        raise TraceError(f"Mask {mask_id} of the words of length {length} "
+                                         f"is not written")
+                    query.masks[length] = mask
+            yield query
+
+
+class TracingWordsIndex:
+    """
+    Proxy of a words index which writes the queries to the trace. All other attributes are of the
+    proxied index.
+    """
+
+    def __init__(self, words_index, writer: TraceWriter):
+        super().__init__()
+        self._words_index = words_index
+        self._writer = writer
+
+    def __getattr__(self, item):
+        return getattr(self._words_index, item)
+
+    def __getitem__(self, item):
+        return self._words_index[item]
+
+    def _query(self, kind, patterns, masks=None):
+        encode_mapping = self._words_index.alphabet.encode_mapping
+        self._writer.query(kind,
+                           [(length, encode_mapping(mapping)) for length, mapping in patterns],
+                           masks)
+
+    def lookup_indexes(self, length, mapping, op=None, mask=None):
+        self._query(QueryKind.LIST, [(length, mapping)], {length: mask})
+        return self._words_index.lookup_indexes(length, mapping, op, mask)
+
+    def lookup_codes(self, length, mapping, op=None, mask=None):
+        self._query(QueryKind.LIST, [(length, mapping)], {length: mask})
+        return self._words_index.lookup_codes(length, mapping, op, mask)
+
+    def lookup(self, length, mapping, op=None, mask=None):
+        self._query(QueryKind.LIST, [(length, mapping)], {length: mask})
+        return self._words_index.lookup(length, mapping, op, mask)
+
+    def count_occurrences(self, length, mapping, op=None, mask=None):
+        self._query(QueryKind.COUNT, [(length, mapping)], {length: mask})
+        return self._words_index.count_occurrences(length, mapping, op, mask)
+
+    def does_intersection_exist(self, length, mapping, op=None, mask=None):
+        self._query(QueryKind.EXISTS, [(length, mapping)], {length: mask})
+        return self._words_index.does_intersection_exist(length, mapping, op, mask)
+
+    def count_occurrences_batch(self, patterns, masks=None) -> list[int]:
+        patterns = list(patterns)
+        self._query(QueryKind.COUNT_BATCH, patterns, masks)
+        return self._words_index.count_occurrences_batch(patterns, masks)
+
+    def does_intersection_exist_batch(self, patterns, masks=None) -> list[bool]:
+        patterns = list(patterns)
+        self._query(QueryKind.EXISTS_BATCH, patterns, masks)
+        return self._words_index.does_intersection_exist_batch(patterns, masks)
+
+    def do_all_intersections_exist(self, patterns, masks=None) -> bool:
+        patterns = list(patterns)
+        self._query(QueryKind.ALL_EXIST, patterns, masks)
+        return self._words_index.do_all_intersections_exist(patterns, masks)
+
+
+def _run_query(words_index, query: TraceQuery):
+    masks = query.masks
+    match query.kind:
+        case QueryKind.LIST:
+            (length, mapping), = query.patterns
+            return list(words_index.lookup_indexes(length, mapping, mask=masks.get(length)))
+        case QueryKind.COUNT:
+            (length, mapping), = query.patterns
+            return words_index.count_occurrences(length, mapping, mask=masks.get(length))
+        case QueryKind.EXISTS:
+            (length, mapping), = query.patterns
+            return words_index.does_intersection_exist(length, mapping, mask=masks.get(length))
+        case QueryKind.COUNT_BATCH:
+            return words_index.count_occurrences_batch(query.patterns, masks)
+        case QueryKind.EXISTS_BATCH:
+            return words_index.does_intersection_exist_batch(query.patterns, masks)
+        case QueryKind.ALL_EXIST:
+            return words_index.do_all_intersections_exist(query.patterns, masks)
+
+
+def replay_trace(file, words_index, stats: SearchStats | None = None) -> SearchStats:
+    """
+    Feeds the queries of the trace to the words index. The list lookups are fully consumed.
+
+    :param file: binary file of the trace
+    :param words_index: words index answering the queries, it should be of the same words as the
+                        index the trace was recorded with
+    :param stats: statistics to collect to, new statistics by default
+    :return: the statistics: the runs, the queries and the patterns by the kind of the queries and
+             the seconds of the queries by their kind
+    """
+    stats = stats if stats is not None else SearchStats()
+    for record in read_trace(file):
+        if isinstance(record, TraceRun):
+            stats.incr("runs")
+            continue
+        kind = record.kind.name.lower()
+        stats.incr("queries", type=kind)
+        stats.incr("patterns", len(record.patterns), type=kind)
+        start = time.perf_counter()
+        _run_query(words_index, record)
+        stats.observe("query_seconds", time.perf_counter() - start, type=kind)
+    return stats
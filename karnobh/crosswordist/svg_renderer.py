@@ -0,0 +1,121 @@
+"""
+This module renders the crosswords to SVG documents by string building. The picture of a grid size
+is precompiled once into a template (see grid_template): the header with the reusable definitions
+(the styles of the cells, the numbers and the letters), the outline of every cell and the opening
+tags of the number and the letter of every cell. A crossword is rendered by joining the pieces of
+its cells, the cells are grouped into one path per color. The document is returned as one string,
+thus it is written to a file by a single write.
+
+The picture is the same as the one drawn by the graphics emitters (see grid_emitter module).
+
+Examples:
+    >>> from karnobh.crosswordist.grid_generator import cross_words_index_from_rows
+    >>> svg = render_svg(cross_words_index_from_rows(["AT", "#O"]), size_px=100)
+    >>> print(svg, end="")  # doctest: +ELLIPSIS
+    <svg width="100" height="100" xmlns="http://www.w3.org/2000/svg">
+    <defs><style>.c{stroke:black;stroke-width:2}.n{font-size:8px;...}</style></defs>
+    <path class='c' fill='white' d='M0 0h50v50h-50zM50 0h50v50h-50zM50 50h50v50h-50z'/>
+    <path class='c' fill='black' d='M0 50h50v50h-50z'/>
+    <text x='4' y='8' class='n'>1</text>
+    <text x='54' y='58' class='n'>3</text>
+    <text x='54' y='8' class='n'>2</text>
+    <text x='25' y='45' class='l'>A</text>
+    <text x='75' y='45' class='l'>T</text>
+    <text x='75' y='95' class='l'>O</text>
+    </svg>
+"""
+
+import functools
+from xml.sax.saxutils import escape
+
+from karnobh.crosswordist.grid_generator import CrossWordsIndex, EMPTY_LETTER
+
+DEFAULT_TEMPLATE_CACHE_SIZE = 64
+
+
+class SvgGridTemplate:
+    """
+    Precompiled pieces of the SVG document of a grid size
+    """
+
+    def __init__(self, width: int, height: int, size_px: int):
+        """
+        :param width: width of the grid in cells
+        :param height: height of the grid in cells
+        :param size_px: width and height of the picture in pixels
+        """
+        super().__init__()
+        self.width = width
+        cell = size_px // width
+        # the sizes of the graphics emitters (see emit_graphics_objects)
+        number_size = round(cell // 10 * 1.5)
+        letter_size = round(cell * 0.85)
+        self.head = (f'<svg width="{size_px}" height="{size_px}" '
+                     f'xmlns="http://www.w3.org/2000/svg">\n'
+                     f'<defs><style>.c{{stroke:black;stroke-width:2}}'
+                     f'.n{{font-size:{number_size}px;text-anchor:start}}'
+                     f'.l{{font-size:{letter_size}px;text-anchor:middle}}</style></defs>\n')
+        self.tail = '</svg>\n'
+        # the pieces of the cells in the order of the grid (row-major)
+        cells = [(x * cell, y * cell) for y in range(height) for x in range(width)]
+        self.outlines = [f"M{x} {y}h{cell}v{cell}h-{cell}z" for x, y in cells]
+        self.numbers = [f"<text x='{x + number_size // 2}' y='{y + number_size}' class='n'>"
+                        for x, y in cells]
+        letter_offset = cell - round(cell * 0.10)
+        self.letters = [f"<text x='{x + cell // 2}' y='{y + letter_offset}' class='l'>"
+                        for x, y in cells]
+
+    def render(self, cross_words_index: CrossWordsIndex) -> str:
+        """
+        :return: SVG document of the crossword of the grid size of the template
+        """
+        width = self.width
+        black_cells = cross_words_index.grid.data
+        parts = [self.head]
+        for color, black in (("white", 0), ("black", 1)):
+            outlines = [outline for outline, cell in zip(self.outlines, black_cells)
+                        if cell == black]
+            if outlines:
+                parts += (f"<path class='c' fill='{color}' d='", *outlines, "'/>\n")
+        numbered = set()
+        for word_layout in cross_words_index.all:
+            cell = word_layout.y_init * width + word_layout.x_init
+            if cell not in numbered:
+                numbered.add(cell)
+                parts += (self.numbers[cell], str(word_layout.word_num + 1), "</text>\n")
+        # every white cell is in a horizontal word
+        for word_layout in cross_words_index.horizontal_words:
+            cell = word_layout.y_init * width + word_layout.x_init
+            for pos, letter in enumerate(word_layout.word_letters):
+                if letter != EMPTY_LETTER:
+                    parts += (self.letters[cell + pos], escape(str(letter)), "</text>\n")
+        parts.append(self.tail)
+        return "".join(parts)
+
+
+@functools.lru_cache(maxsize=DEFAULT_TEMPLATE_CACHE_SIZE)
+def grid_template(width: int, height: int, size_px: int) -> SvgGridTemplate:
+    """
+    :return: the template of the grid size, compiled once per size
+    """
+    return SvgGridTemplate(width, height, size_px)
+
+
+def render_svg(cross_words_index: CrossWordsIndex, size_px: int) -> str:
+    """
+    :param cross_words_index: the crossword to draw
+    :param size_px: width and height of the picture in pixels
+    :return: SVG document of the crossword
+    """
+    return grid_template(*cross_words_index.grid.size, size_px).render(cross_words_index)
+
+
+def render_svgs(cross_words_indexes, size_px: int) -> list[str]:
+    """
+    Renders many crosswords in one pass, the crosswords of the same grid size share the template
+
+    :param cross_words_indexes: iterable of the crosswords to draw
+    :param size_px: width and height of every picture in pixels
+    :return: SVG documents of the crosswords
+    """
+    return [render_svg(cross_words_index, size_px) for cross_words_index in cross_words_indexes]
@@ -1,36 +1,154 @@
-from crosswordist_native_index.compressed_seq import bit_index_native, bit_and_op_index_native
+from crosswordist_native_index.compressed_seq import (bit_index_native, bit_and_op_index_native,
+                                                      bit_and_op_index_batch_native,
+                                                      bit_expr_index_native, BitIndexIterator)
 from karnobh.crosswordist.words_index import WordsIndex
 
 _GET_LIST = 0
 _GET_COUNT = 1
 _DOES_EXIST = 2
 
+# number of word indexes decoded by the native iterator at once
+LOOKUP_CHUNK_SIZE = 256
+
+_EMPTY_RESULTS = {
+    _GET_LIST: (),
+    _GET_COUNT: 0,
+    _DOES_EXIST: False,
+}
+
 
 class WordIndexNative(WordsIndex):
 
-    def _perform_lookup(self, length, mapping, op=None, lookup_type=None):
-        words_index_same_len = self.word_index_by_length(length)
+    def _perform_lookup(self, length, mapping, op=None, lookup_type=None, mask=None):
+        words_index_same_len, bitmaps = self._bitmaps_for(length, mapping, mask)
         max_alloc = len(words_index_same_len.words)
-        byte_sequences = [words_index_same_len.bitmap_on_position(pos, letter).compressed_sequence
-                          for pos, letter in mapping.items()]
+        empty_bitmap = words_index_same_len.empty_bitmap
+        if empty_bitmap in bitmaps:
+            return _EMPTY_RESULTS[lookup_type], words_index_same_len
+        if not bitmaps:
+            return {_GET_LIST: list(range(max_alloc)), _GET_COUNT: max_alloc,
+                    _DOES_EXIST: max_alloc != 0}[lookup_type], words_index_same_len
+        byte_sequences = [bitmap.compressed_sequence for bitmap in bitmaps]
         arr_index_stream = bit_and_op_index_native(byte_sequences, max_alloc, lookup_type) \
             if len(byte_sequences) != 1 else bit_index_native(byte_sequences[0], max_alloc,
                                                               lookup_type)
         return arr_index_stream, words_index_same_len
 
-    def lookup(self, length, mapping, op=None):
-        arr_index_stream, words_index_same_len = self._perform_lookup(
-            length,
-            mapping,
-            lookup_type=_GET_LIST
-        )
-        for arr_index in arr_index_stream:
-            yield words_index_same_len._words[arr_index]
-
-    def count_occurrences(self, length, mapping, op=None):
-        occurrences, _ = self._perform_lookup(length, mapping, lookup_type=_GET_COUNT)
+    def lookup_indexes(self, length, mapping, op=None, mask=None):
+        """
+        Word indexes are decoded lazily in chunks, thus a consumer which takes only the first
+        matches does not pay for decoding of the whole intersection.
+        """
+        words_index_same_len, bitmaps = self._bitmaps_for(length, mapping, mask)
+        if words_index_same_len.empty_bitmap in bitmaps:
+            return iter(())
+        if not bitmaps:
+            return iter(range(len(words_index_same_len.words)))
+        return BitIndexIterator([bitmap.compressed_sequence for bitmap in bitmaps],
+                                LOOKUP_CHUNK_SIZE)
+
+    def count_occurrences(self, length, mapping, op=None, mask=None):
+        count = self._precomputed_count(length, mapping, mask=mask)
+        if count is not None:
+            return count
+        occurrences, _ = self._perform_lookup(length, mapping, lookup_type=_GET_COUNT, mask=mask)
         return occurrences
 
-    def does_intersection_exist(self, length, mapping, op=None):
-        exists, _ = self._perform_lookup(length, mapping, lookup_type=_DOES_EXIST)
+    def does_intersection_exist(self, length, mapping, op=None, mask=None):
+        count = self._precomputed_count(length, mapping, mask=mask)
+        if count is not None:
+            return count != 0
+        exists, _ = self._perform_lookup(length, mapping, lookup_type=_DOES_EXIST, mask=mask)
         return exists
+
+    def _perform_expr_lookup(self, length, expr, lookup_type):
+        clauses, words_num = self._expr_clauses(length, expr)
+        if clauses is None:
+            return _EMPTY_RESULTS[lookup_type]
+        if not clauses:
+            return {_GET_LIST: range(words_num), _GET_COUNT: words_num,
+                    _DOES_EXIST: words_num != 0}[lookup_type]
+        return bit_expr_index_native(clauses, words_num, lookup_type)
+
+    def lookup_expr_indexes(self, length, expr):
+        return iter(self._perform_expr_lookup(length, expr, _GET_LIST))
+
+    def count_expr(self, length, expr) -> int:
+        return self._perform_expr_lookup(length, expr, _GET_COUNT)
+
+    def does_expr_exist(self, length, expr) -> bool:
+        return self._perform_expr_lookup(length, expr, _DOES_EXIST)
+
+    def _native_pattern(self, length, mapping, masks):
+        """
+        :return: the compressed sequences of the pattern, None if the pattern has no bitmaps (it
+                 matches all words), the empty bitmap if the pattern has no words or the count of
+                 the precomputed pattern counts
+        """
+        count = self._precomputed_count(length, mapping, mask=masks.get(length))
+        if count is not None:
+            return count
+        words_index_same_len, bitmaps = self._bitmaps_for(length, mapping, masks.get(length))
+        if not bitmaps:
+            return None
+        empty_bitmap = words_index_same_len.empty_bitmap
+        if empty_bitmap in bitmaps:
+            return empty_bitmap
+        return [bitmap.compressed_sequence for bitmap in bitmaps]
+
+    def _perform_lookup_batch(self, patterns, lookup_type, masks=None):
+        """
+        All patterns which need bitmap operations are processed by one native call, the bitmaps
+        of every pattern are merged run by run without decoding.
+        """
+        masks = masks or {}
+        results = [None] * len(patterns)
+        native_patterns = []
+        native_positions = []
+        for pattern_num, (length, mapping) in enumerate(patterns):
+            native_pattern = self._native_pattern(length, mapping, masks)
+            if native_pattern is None:
+                words_num = len(self.word_index_by_length(length).words)
+                results[pattern_num] = words_num if lookup_type == _GET_COUNT else words_num != 0
+            elif native_pattern is self.word_index_by_length(length).empty_bitmap:
+                results[pattern_num] = _EMPTY_RESULTS[lookup_type]
+            elif isinstance(native_pattern, int):
+                results[pattern_num] = native_pattern if lookup_type == _GET_COUNT \
+                    else native_pattern != 0
+            else:
+                native_patterns.append(native_pattern)
+                native_positions.append(pattern_num)
+        if native_patterns:
+            native_results = bit_and_op_index_batch_native(native_patterns, lookup_type)
+            for pattern_num, result in zip(native_positions, native_results):
+                results[pattern_num] = result
+        return results
+
+    def count_occurrences_batch(self, patterns, masks=None) -> list[int]:
+        return self._perform_lookup_batch(list(patterns), _GET_COUNT, masks)
+
+    def does_intersection_exist_batch(self, patterns, masks=None) -> list[bool]:
+        return self._perform_lookup_batch(list(patterns), _DOES_EXIST, masks)
+
+    def do_all_intersections_exist(self, patterns, masks=None) -> bool:
+        """
+        Patterns which trivially have no words stop the check before any bitmap operation, the
+        native call stops on the first pattern without words.
+        """
+        masks = masks or {}
+        native_patterns = []
+        for length, mapping in patterns:
+            native_pattern = self._native_pattern(length, mapping, masks)
+            if native_pattern is None:
+                if not self.word_index_by_length(length).words:
+                    return False
+            elif native_pattern is self.word_index_by_length(length).empty_bitmap:
+                return False
+            elif isinstance(native_pattern, int):
+                if native_pattern == 0:
+                    return False
+            else:
+                native_patterns.append(native_pattern)
+        if not native_patterns:
+            return True
+        return all(bit_and_op_index_batch_native(native_patterns, _DOES_EXIST, True))
@@ -1,15 +1,28 @@
+from array import array
 from contextlib import contextmanager
 import operator
 import json
 import base64
 import logging
+import unicodedata
 
 
 from karnobh.crosswordist.bitmap import (CompressedBitmap2, bool_to_byte_bits_seq, bit_index2,
-                                         bit_op_index2)
+                                         bit_op_index2, is_zero_fill, bit_expr_index,
+                                         bit_expr_count, bit_and_count)
+from karnobh.crosswordist.packed_words import PackedWords
+from karnobh.crosswordist.bitmap_expr import AnyOf
+from karnobh.crosswordist.pattern_counts import (PatternCounts, DEFAULT_MAX_FIXED_LETTERS,
+                                                 DEFAULT_LENGTHS)
+from karnobh.crosswordist.alphabet import Alphabet, LATIN_ALPHABET
 
 logger = logging.getLogger(__name__)
 
+# separator of the word and its score in the scored corpus format, i.e., "WORD;SCORE"
+SCORE_SEPARATOR = ";"
+# type code of the array of the scores
+SCORES_TYPE_CODE = 'f'
+
 class WordIndexLoadError(Exception):
     pass
 
@@ -25,9 +38,49 @@ class IndexAlreadyConstructed(Exception):
     pass
 
 
+class IndexNotConstructed(Exception):
+    pass
+
+
+def parse_scored_word(line: str) -> tuple[str, float | None]:
+    """
+    :param line: line of the corpus, either "WORD" or "WORD;SCORE"
+    :return: the word and its score (None if the line has no score)
+
+    Examples:
+        >>> parse_scored_word("CAT;12.5\\n")
+        ('CAT', 12.5)
+        >>> parse_scored_word(" DOG ")
+        ('DOG', None)
+    """
+    word, separator, score = line.strip().partition(SCORE_SEPARATOR)
+    if not separator:
+        return word.strip(), None
+    try:
+        return word.strip(), float(score)
+    except ValueError as e:
+        raise WordIndexLoadError(f"Wrong score of the word in the line: '{line.strip()}'") from e
+
+
 class WordsIndexSameLen:
+    """
+    Compressed bitmap index of the words of the same length. For each position in a word and for
+    each letter of the alphabet there is a bitmap where turned on bits are the indexes of the words
+    having the letter on the position. The bitmaps are stored in a flat list which is indexed by
+    "position * alphabet length + letter code".
+
+    Letters which never appear on some position (e.g., rare letters of large alphabets) share one
+    empty bitmap instance, lookups with such letters are answered without decoding.
+
+    If words have scores, the words are ordered by the score (the highest first), thus lookups
+    yield the best words first. The scores are kept in a compact array parallel to the words.
 
-    def __init__(self, length, alphabet=None, words=None, bitmap_index=None):
+    Optionally, the numbers of the words matching the patterns of a few fixed letters are
+    precomputed (see pattern_counts module).
+    """
+
+    def __init__(self, length, alphabet=None, words=None, bitmap_index=None, packed=False,
+                 scores=None, pattern_counts=None):
         super().__init__()
         if not isinstance(length, int) or length < 2:
             raise WordsIndexWrongLen(
@@ -35,12 +88,23 @@ class WordsIndexSameLen:
             )
         if alphabet is None:
             logger.debug("The alphabet is not provided. Latin alphabet will be used.")
-            alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-        self._abc = alphabet
+            alphabet = LATIN_ALPHABET
+        self._abc = Alphabet.of(alphabet)
 
         self._length = length
         self._bitmap_index = bitmap_index
+        self._packed = packed
         self._words = words or set()
+        self._word_scores = {}
+        self._scores = array(SCORES_TYPE_CODE, scores) if scores is not None else None
+        self._empty_bitmap = None
+        self._pattern_counts = pattern_counts
+        # letter codes of the words, encoded once on the first request
+        self._encoded_words = None
+        if bitmap_index is not None:
+            self._bitmap_index = [self._share_empty(bitmap) for bitmap in bitmap_index]
+        if bitmap_index is not None and packed:
+            self._words = PackedWords(length=length, alphabet=self._abc, words=self._words)
 
     def __len__(self):
         return self._length
@@ -49,7 +113,38 @@ class WordsIndexSameLen:
     def words(self):
         return self._words  # list(self._words) ???
 
-    def add_word(self, word) -> bool:
+    @property
+    def alphabet(self) -> Alphabet:
+        return self._abc
+
+    @property
+    def scores(self) -> array | None:
+        """
+        :return: scores of the words (in the order of the words) or None if words are not scored
+        """
+        return self._scores
+
+    def score_at(self, word_index) -> float | None:
+        return self._scores[word_index] if self._scores is not None else None
+
+    @property
+    def pattern_counts(self) -> PatternCounts | None:
+        return self._pattern_counts
+
+    def make_pattern_counts(self, max_fixed=DEFAULT_MAX_FIXED_LETTERS):
+        """
+        Precomputes the numbers of the words matching every pattern of up to max_fixed letters.
+        The index should be constructed.
+        """
+        if self._bitmap_index is None:
+            raise IndexNotConstructed("Index is not constructed yet")
+        self._pattern_counts = PatternCounts.build(
+            self._length, len(self._abc),
+            (self.letters_at(word_index) for word_index in range(len(self._words))),
+            min(max_fixed, self._length)
+        )
+
+    def add_word(self, word, score=None) -> bool:
         if len(word) != self._length:
             raise WordsIndexWrongLen(f"Word: {word} is not of required length {self._length}")
         if self._bitmap_index is not None:
@@ -59,46 +154,175 @@ class WordsIndexSameLen:
             logger.debug("Word %s is not in the abc '%s'", word, self._abc)
             return False
         self._words.add(word)
+        if score is not None:
+            self._word_scores[word] = max(score, self._word_scores.get(word, score))
         return True
 
     def make_index(self):
         if self._bitmap_index is not None:
             raise IndexAlreadyConstructed("Index is already constructed")
-        self._words = sorted(self._words)
+        self._encoded_words = None
+        if self._word_scores:
+            word_scores = self._word_scores
+            self._words = sorted(self._words, key=lambda w: (-word_scores.get(w, 0.0), w))
+            self._scores = array(SCORES_TYPE_CODE, (word_scores.get(w, 0.0) for w in self._words))
+            self._word_scores = {}
+        else:
+            self._words = sorted(self._words)
         self._bitmap_index = []
         for i in range(self._length):
-            letter_index = {}
             for abc_letter in self._abc:
                 # the list is faster than iterator, i.e.
                 # letter_seq = (w[i] == abc_letter for w in self._words)
                 letter_seq = [w[i] == abc_letter for w in self._words]
+                if not any(letter_seq) and self._empty_bitmap is not None:
+                    self._bitmap_index.append(self._empty_bitmap)
+                    continue
                 abc_letter_bitmap = CompressedBitmap2(
                     byte_sequence=bool_to_byte_bits_seq(
                         letter_seq
                     )
                 )
-                letter_index[abc_letter] = abc_letter_bitmap
-            self._bitmap_index.append(letter_index)
+                self._bitmap_index.append(self._share_empty(abc_letter_bitmap))
+        if self._packed:
+            self._words = PackedWords(length=self._length, alphabet=self._abc, words=self._words)
+
+    def _share_empty(self, bitmap):
+        if bitmap is None or not is_zero_fill(bitmap.compressed_sequence):
+            return bitmap
+        if self._empty_bitmap is None:
+            self._empty_bitmap = bitmap
+        return self._empty_bitmap
+
+    @property
+    def empty_bitmap(self):
+        """
+        :return: The bitmap shared by all letters which do not appear on their position
+        """
+        return self._empty_bitmap
 
     def bitmap_on_position(self, letter_index, letter):
-        return self._bitmap_index[letter_index][letter]
+        """
+        :param letter_index: position of the letter in a word
+        :param letter: either a letter or its code in the alphabet
+        :return: compressed bitmap of the words having the letter on the position
+        """
+        bitmap = self._bitmap_index[letter_index * len(self._abc) + self._abc.to_code(letter)]
+        if bitmap is None:
+            raise KeyError(letter)
+        return bitmap
+
+    def bitmaps_for(self, mapping) -> list:
+        """
+        :param mapping: position to letter (or letter code) mapping
+        :return: bitmaps of all positions of the mapping
+        """
+        abc_len = len(self._abc)
+        to_code = self._abc.to_code
+        bitmap_index = self._bitmap_index
+        bitmaps = [bitmap_index[pos * abc_len + to_code(letter)] for pos, letter in mapping.items()]
+        if None in bitmaps:
+            raise KeyError(mapping)
+        return bitmaps
+
+    def _term_bitmaps(self, term, letters) -> list:
+        """
+        :return: bitmaps of the letters on the position of the term, letters absent on the position
+                 are ignored
+        """
+        if not 0 <= term.position < self._length:
+            raise KeyError(term.position)
+        abc = self._abc
+        abc_len = len(abc)
+        bitmaps = []
+        for letter in letters:
+            code = letter if isinstance(letter, int) else abc.code(letter) \
+                if letter in abc else None
+            if code is None or not 0 <= code < abc_len:
+                continue
+            bitmap = self._bitmap_index[term.position * abc_len + code]
+            if bitmap is not None and bitmap is not self._empty_bitmap:
+                bitmaps.append(bitmap)
+        return bitmaps
+
+    def _any_of_bitmaps(self, any_of) -> list | None:
+        """
+        :return: bitmaps of the OR of the terms or None if the clause matches all words. A negated
+                 term is replaced by the letters which it does not exclude.
+        """
+        abc = self._abc
+        bitmaps = []
+        for term in any_of:
+            letters = term.letters
+            if term.negated:
+                excluded = {letter if isinstance(letter, int) else abc.code(letter)
+                            for letter in letters if isinstance(letter, int) or letter in abc}
+                if not excluded.intersection(range(len(abc))):
+                    return None
+                letters = [code for code in range(len(abc)) if code not in excluded]
+            bitmaps.extend(self._term_bitmaps(term, letters))
+        return bitmaps
+
+    def expr_clauses(self, expr):
+        """
+        :param expr: bitmap expression (see bitmap_expr module)
+        :return: list of (bitmaps, is negated) pairs, bitmaps of a clause are OR-ed. None is
+                 returned if the expression cannot match any word. Letters absent on a position
+                 are ignored.
+        """
+        clauses = []
+        for term in expr:
+            if isinstance(term, AnyOf):
+                bitmaps = self._any_of_bitmaps(term)
+                if bitmaps is None:
+                    continue
+                negated = False
+            else:
+                bitmaps = self._term_bitmaps(term, term.letters)
+                negated = term.negated
+            if bitmaps:
+                clauses.append((bitmaps, negated))
+            elif not negated:
+                return None
+        return clauses
 
     def word_at(self, word_index):
         return self._words[word_index]
 
+    def letters_at(self, word_index):
+        """
+        :param word_index: index of the word
+        :return: letter codes of the word. For packed words it is a memoryview on the packed
+                 buffer, otherwise the codes encoded once for all words.
+        """
+        if isinstance(self._words, PackedWords):
+            return self._words.letters_at(word_index)
+        if self._encoded_words is None:
+            self._encoded_words = [self._abc.encode(word) for word in self._words]
+        return self._encoded_words[word_index]
+
     def as_human_readable_dict(self):
         encoded_bm_index = []
-        for pos in self._bitmap_index:
+        abc_len = len(self._abc)
+        for pos in range(self._length):
             letter_index = {}
-            for letter, index in pos.items():
+            for code, letter in enumerate(self._abc):
+                index = self._bitmap_index[pos * abc_len + code]
+                if index is None:
+                    continue
                 encoded = base64.b64encode(index.compressed_sequence)
                 letter_index[letter] = encoded.decode('ASCII')
             encoded_bm_index.append(letter_index)
-        return {
-            'words': self._words,
+        human_readable = {
+            'words': list(self._words),
             'index': encoded_bm_index,
-            'abc': self._abc,
+            'abc': self._abc.letters,
         }
+        if self._scores is not None:
+            human_readable['scores'] = self._scores.tolist()
+        if self._pattern_counts is not None:
+            human_readable['pattern_counts'] = self._pattern_counts.as_dict()
+        return human_readable
 
     def __getitem__(self, item):
         match item:
@@ -121,10 +345,14 @@ class WordsIndex:
 
     def __init__(self, alphabet: list[str] | None = None,
                  length_range: range | None = None,
-                 file=None):
+                 file=None,
+                 packed_words: bool = False,
+                 index_dict: dict | None = None):
         super().__init__()
         self._words_index = {}
-        if file is None:
+        self._packed_words = packed_words
+        self._abc_coder: Alphabet | None = None
+        if file is None and index_dict is None:
             self._alphabet = alphabet
             if not length_range:
                 length_range = range(3, 37)
@@ -133,10 +361,13 @@ class WordsIndex:
             self._length_range: range = length_range
             self._index_constructed = False
         else:
-            try:
-                words_index = json.load(file)
-            except (Exception, ) as e:
-                raise WordIndexLoadError(f"Cannot load index file: {file.name}") from e
+            self._alphabet = None
+            if index_dict is None:
+                try:
+                    index_dict = json.load(file)
+                except (Exception, ) as e:
+                    raise WordIndexLoadError(f"Cannot load index file: {file.name}") from e
+            words_index = dict(index_dict)
             range_start, range_stop = words_index['range']
             self._length_range = range(range_start, range_stop)
             del words_index['range']
@@ -145,39 +376,59 @@ class WordsIndex:
                 words = index_by_word_length['words']
                 encoded_index = index_by_word_length['index']
                 abc = index_by_word_length['abc']
-                bitmap_index = []
+                if self._alphabet is None:
+                    self._alphabet = abc
+                elif self._alphabet != abc:
+                    raise WordIndexLoadError(f"Words of length {len_int} use alphabet '{abc}' "
+                                             f"while other words use '{self._alphabet}'")
+                pattern_counts = index_by_word_length.get('pattern_counts')
+                if pattern_counts is not None:
+                    pattern_counts = PatternCounts.from_dict(len_int, len(abc), pattern_counts)
+                bitmap_index: list[CompressedBitmap2 | None] = []
                 for letter_pos in encoded_index:
-                    bitmap_index_on_pos = {}
-                    for letter, encoded_letter_index in letter_pos.items():
-                        bitmap_index_on_pos[letter] = CompressedBitmap2(
+                    for letter in abc:
+                        encoded_letter_index = letter_pos.get(letter)
+                        if encoded_letter_index is None:
+                            bitmap_index.append(None)
+                            continue
+                        bitmap_index.append(CompressedBitmap2(
                             byte_sequence=None,
                             compressed_sequence=base64.b64decode(encoded_letter_index)
-                        )
-                    bitmap_index.append(bitmap_index_on_pos)
+                        ))
                 self._words_index[len_int] = WordsIndexSameLen(
                     length=len_int,
                     alphabet=abc,
                     words=words,
-                    bitmap_index=bitmap_index
+                    bitmap_index=bitmap_index,
+                    packed=packed_words,
+                    scores=index_by_word_length.get('scores'),
+                    pattern_counts=pattern_counts
                 )
             self._index_constructed = True
 
-    def add_word(self, word):
+    def add_word(self, word, score=None) -> bool:
+        """
+        :param word: word to add. The word is normalized to the Unicode NFC form.
+        :param score: optional score of the word, words with higher scores are yielded first
+        :return: whether the word is added
+        """
         if self._index_constructed:
             raise IndexAlreadyConstructed("Index is already constructed. Cannot add more words.")
+        word = unicodedata.normalize('NFC', word)
         word_len = len(word)
         if word_len not in self._length_range:
             logger.debug("Word's '%s' length='%s' is not in allowed(%s, %s)",
                          word, word_len, self._length_range.start, self._length_range.stop)
-            return
+            return False
         index_by_length = self._words_index.get(word_len)
         if index_by_length is None:
             index_by_length = WordsIndexSameLen(
                 length=word_len,
-                alphabet=self._alphabet
+                alphabet=self._alphabet,
+                packed=self._packed_words
             )
             self._words_index[word_len] = index_by_length
-        index_by_length.add_word(word)
+        return index_by_length.add_word(word, score)
 
     def make_index(self):
         if self._index_constructed:
@@ -198,6 +449,34 @@ class WordsIndex:
         for index in self._words_index.values():
             index.make_index()
 
+    def make_pattern_counts(self, lengths=DEFAULT_LENGTHS, max_fixed=DEFAULT_MAX_FIXED_LETTERS):
+        """
+        Precomputes the counts of the patterns of the words of the lengths (see pattern_counts
+        module). They are kept in the dumped index, count_occurrences and does_intersection_exist
+        of up to max_fixed letters are answered by them.
+        """
+        for length in lengths:
+            index = self._words_index.get(length)
+            if index is not None:
+                index.make_pattern_counts(max_fixed)
+
+    @property
+    def alphabet(self) -> Alphabet:
+        """
+        :return: The alphabet (letter codes) shared by the words of all lengths
+        """
+        abc_coder = self._abc_coder
+        if abc_coder is None:
+            abc_coder = self._abc_coder = Alphabet.of(self._alphabet or LATIN_ALPHABET)
+        return abc_coder
+
+    @property
+    def lengths(self) -> list[int]:
+        """
+        :return: sorted lengths of the words which have an index
+        """
+        return sorted(self._words_index)
+
     def word_index_by_length(self, length):
         word_index = self._words_index.get(length)
         if word_index is None:
@@ -207,39 +486,179 @@ class WordsIndex:
     def __getitem__(self, item):
         return self.word_index_by_length(item)
 
-    def dump(self, file):
-        word_index = {}
+    def as_dict(self) -> dict:
+        word_index: dict[int | str, dict | list[int]] = {}
         for length, index in self._words_index.items():
             word_index[length] = index.as_human_readable_dict()
         word_index['range'] = [self._length_range.start, self._length_range.stop]
-        json.dump(word_index, file, indent=2)
+        return word_index
+
+    def dump(self, file):
+        json.dump(self.as_dict(), file, indent=2)
 
-    def _perform_lookup(self, length, mapping, op=None):
+    def _bitmaps_for(self, length, mapping, mask=None):
+        """
+        :return: words index of the length and the bitmaps of the mapping, followed by the mask if
+                 it is provided
+        """
+        words_index_same_len = self.word_index_by_length(length)
+        bitmaps = words_index_same_len.bitmaps_for(mapping)
+        if mask is not None:
+            bitmaps.append(mask)
+        return words_index_same_len, bitmaps
+
+    def _precomputed_count(self, length, mapping, op=None, mask=None) -> int | None:
+        """
+        :return: the count of the precomputed pattern counts or None if the lookup cannot be
+                 answered by them. The counts do not know about the mask, however, a pattern
+                 without words has no words under any mask.
+        """
+        if op is not None and op is not operator.and_:
+            return None
+        words_index_same_len = self.word_index_by_length(length)
+        pattern_counts = words_index_same_len.pattern_counts
+        if pattern_counts is None or not mapping:
+            return None
+        count = pattern_counts.count(words_index_same_len.alphabet.encode_mapping(mapping))
+        if count is None or (mask is not None and count != 0):
+            return None
+        return count
+
+    def _perform_lookup(self, length, mapping, op=None, mask=None):
         if op is None:
             op = operator.and_
-        words_index_same_len = self.word_index_by_length(length)
-        byte_sequences = [words_index_same_len.bitmap_on_position(pos, letter)
-                          for pos, letter in mapping.items()]
+        words_index_same_len, byte_sequences = self._bitmaps_for(length, mapping, mask)
+        empty_bitmap = words_index_same_len.empty_bitmap
+        if op is operator.and_ and any(bs is empty_bitmap for bs in byte_sequences):
+            return iter(()), words_index_same_len
+        if not byte_sequences:
+            return iter(range(len(words_index_same_len.words))), words_index_same_len
         arr_index_stream = bit_op_index2(*byte_sequences, op=op)\
             if len(byte_sequences) != 1 else bit_index2(byte_sequences[0])
         return arr_index_stream, words_index_same_len
 
-    def lookup(self, length, mapping, op=None):
-        arr_index_stream, words_index_same_len = self._perform_lookup(length, mapping, op)
-        for arr_index in arr_index_stream:
-            yield words_index_same_len._words[arr_index]
-
-    def count_occurrences(self, length, mapping, op=None):
-        arr_index_stream, _ = self._perform_lookup(length, mapping, op)
-        return sum(1 for _ in arr_index_stream)
+    def lookup_indexes(self, length, mapping, op=None, mask=None):
+        """
+        :param length: length of the words
+        :param mapping: position to letter mapping. Letters may be given by their codes.
+        :param op: operator combining the bitmaps of the mapping
+        :param mask: optional bitmap AND-ed with the bitmaps of the mapping (e.g., the words which
+                     are still available)
+        :return: indexes of the found words in the words of the same length
+        """
+        arr_index_stream, _ = self._perform_lookup(length, mapping, op, mask)
+        return arr_index_stream
+
+    def lookup(self, length, mapping, op=None, mask=None):
+        words_index_same_len = self.word_index_by_length(length)
+        for arr_index in self.lookup_indexes(length, mapping, op, mask):
+            yield words_index_same_len.word_at(arr_index)
 
-    def does_intersection_exist(self, length, mapping, op=None):
-        arr_index_stream, _ = self._perform_lookup(length, mapping, op)
+    def lookup_codes(self, length, mapping, op=None, mask=None):
+        """
+        The same as lookup, however, found words are returned as their letter codes
+        """
+        words_index_same_len = self.word_index_by_length(length)
+        for arr_index in self.lookup_indexes(length, mapping, op, mask):
+            yield words_index_same_len.letters_at(arr_index)
+
+    def count_occurrences(self, length, mapping, op=None, mask=None):
+        """
+        Patterns of the precomputed pattern counts are answered by them. Otherwise, the AND of the
+        bitmaps is counted run by run (see bit_and_count), other operators count the found indexes.
+        """
+        count = self._precomputed_count(length, mapping, op, mask)
+        if count is not None:
+            return count
+        if op is not None and op is not operator.and_:
+            arr_index_stream, _ = self._perform_lookup(length, mapping, op, mask)
+            return sum(1 for _ in arr_index_stream)
+        words_index_same_len, bitmaps = self._bitmaps_for(length, mapping, mask)
+        if not bitmaps:
+            return len(words_index_same_len.words)
+        if any(bitmap is words_index_same_len.empty_bitmap for bitmap in bitmaps):
+            return 0
+        return bit_and_count(*(bitmap.compressed_sequence for bitmap in bitmaps))
+
+    def does_intersection_exist(self, length, mapping, op=None, mask=None):
+        count = self._precomputed_count(length, mapping, op, mask)
+        if count is not None:
+            return count != 0
+        arr_index_stream, _ = self._perform_lookup(length, mapping, op, mask)
         return any(True for _ in arr_index_stream)
 
+    def _expr_clauses(self, length, expr):
+        words_index_same_len = self.word_index_by_length(length)
+        clauses = words_index_same_len.expr_clauses(expr)
+        if clauses is not None:
+            clauses = [([bitmap.compressed_sequence for bitmap in bitmaps], negated)
+                       for bitmaps, negated in clauses]
+        return clauses, len(words_index_same_len.words)
+
+    def lookup_expr_indexes(self, length, expr):
+        """
+        :param length: length of the words
+        :param expr: bitmap expression (see bitmap_expr module), e.g., letter_in(2, "AEIOU")
+        :return: indexes of the words matching the expression
+        """
+        clauses, words_num = self._expr_clauses(length, expr)
+        if clauses is None:
+            return iter(())
+        return bit_expr_index(clauses, words_num)
+
+    def lookup_expr(self, length, expr):
+        words_index_same_len = self.word_index_by_length(length)
+        for arr_index in self.lookup_expr_indexes(length, expr):
+            yield words_index_same_len.word_at(arr_index)
+
+    def count_expr(self, length, expr) -> int:
+        clauses, words_num = self._expr_clauses(length, expr)
+        if clauses is None:
+            return 0
+        return bit_expr_count(clauses, words_num)
+
+    def does_expr_exist(self, length, expr) -> bool:
+        return self.count_expr(length, expr) != 0
+
+    def count_occurrences_batch(self, patterns, masks=None) -> list[int]:
+        """
+        Counts occurrences of many patterns at once. A pattern with an empty mapping matches all
+        words of its length.
+        :param patterns: sequence of (length, mapping) pairs
+        :param masks: optional length to bitmap mapping, the bitmap of the length is AND-ed with
+                      the bitmaps of every pattern of the length
+        :return: list of the numbers of occurrences in the same order as the patterns
+        """
+        masks = masks or {}
+        return [self.count_occurrences(length, mapping, mask=masks.get(length))
+                if mapping or length in masks else len(self.word_index_by_length(length).words)
+                for length, mapping in patterns]
+
+    def does_intersection_exist_batch(self, patterns, masks=None) -> list[bool]:
+        """
+        The same as count_occurrences_batch, however, only existence of the words is checked
+        """
+        masks = masks or {}
+        return [self.does_intersection_exist(length, mapping, mask=masks.get(length))
+                if mapping or length in masks else len(self.word_index_by_length(length).words) != 0
+                for length, mapping in patterns]
+
+    def do_all_intersections_exist(self, patterns, masks=None) -> bool:
+        """
+        :param patterns: sequence of (length, mapping) pairs
+        :param masks: optional length to bitmap mapping (see count_occurrences_batch)
+        :return: whether there are words for every pattern. Stops on the first pattern without
+                 words.
+        """
+        masks = masks or {}
+        return all(self.does_intersection_exist(length, mapping, mask=masks.get(length))
+                   if mapping or length in masks
+                   else len(self.word_index_by_length(length).words) != 0
+                   for length, mapping in patterns)
+
     @staticmethod
     @contextmanager
-    def as_context():
-        words_index = WordsIndex()
+    def as_context(alphabet=None):
+        words_index = WordsIndex(alphabet=alphabet)
         yield words_index
         words_index.make_index()
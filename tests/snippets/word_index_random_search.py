@@ -1,17 +1,27 @@
 import logging
+import os
 import random
 import time
 
 logger = logging.getLogger(__name__)
 
 from karnobh.crosswordist.words_index import WordsIndex
+from karnobh.crosswordist.word_index_native import WordIndexNative
 from karnobh.crosswordist.naive_lookup import  naive_lookup
 
+# the index of the concrete lookup, the test assets index by default
+CONCRETE_INDEX_FILE = os.environ.get(
+    'CROSSWORDIST_INDEX',
+    os.path.join(os.path.dirname(__file__), '..', 'assets', 'random_filtered_words_idx.json')
+)
+
 
 def test_word_index():
 
     with open('/tmp/words_tests/index.json') as f:
         words_index = WordsIndex(file=f)
+    with open('/tmp/words_tests/index.json') as f:
+        native_words_index = WordIndexNative(file=f)
     abc = 'ABCDEFGHIGKLMNOPQRSTUVWXYZ'
     total_index_time = 0
     total_non_index_time = 0
@@ -32,7 +42,7 @@ def test_word_index():
             filter_set = {k: random.choice(abc) for k in actual_letter_indexes}
             # print(filter_set)
             t0 = time.time()
-            index_words = list(words_index.lookup_native(word_length, mapping=filter_set))
+            index_words = list(native_words_index.lookup(word_length, mapping=filter_set))
             # non_index_words = list(words_index.lookup(word_length, mapping=filter_set))
             t1 = time.time()
             # non_index_words = naive_lookup(words_index[word_length].words, mapping=filter_set)
@@ -70,14 +80,15 @@ def test_concrete():
     length = 4
     # mapping = {0: 'B', 1: 'A'}
     # length = 19
-    with open('/home/serj/programming/research/python/crosswordist/tests/assets/random_filtered_words_idx.json') as f:
+    with open(CONCRETE_INDEX_FILE) as f:
         words_index = WordsIndex(file=f)
     print(words_index[length].words, len(words_index[length].words))
-    # index_words = list(words_index.lookup_native(length, mapping=mapping))
     index_words = list(words_index.lookup(length, mapping=mapping))
     print(index_words)
     print("==== NATIVE ====")
-    index_words = list(words_index.lookup_native(length, mapping=mapping))
+    with open(CONCRETE_INDEX_FILE) as f:
+        native_words_index = WordIndexNative(file=f)
+    index_words = list(native_words_index.lookup(length, mapping=mapping))
     print(index_words)
 
 
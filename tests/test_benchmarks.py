@@ -0,0 +1,45 @@
+import unittest
+
+from benchmarks.corpus import generate_corpus, build_index
+from benchmarks.runner import (BenchmarkConfig, run_benchmarks, GROUP_BITMAP, GROUP_FILL,
+                               GROUP_DAWG)
+from benchmarks.timing import compare_results
+
+
+class BenchmarksTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.config = BenchmarkConfig(words_num=2000, repeat=1, lookups=10, grids=2, grid_size=5)
+
+    def test_corpus_is_deterministic(self):
+        words = generate_corpus(words_num=500, seed=1)
+        self.assertEqual(words, generate_corpus(words_num=500, seed=1))
+        self.assertNotEqual(words, generate_corpus(words_num=500, seed=2))
+        self.assertEqual(len(words), len(set(words)))
+        words_index = build_index(words)
+        self.assertEqual(sum(len(words_index[length].words) for length in words_index.lengths),
+                         len(words))
+
+    def test_run(self):
+        results = run_benchmarks(self.config, groups=[GROUP_BITMAP, GROUP_FILL])
+        for name in ('bitmap.compress', 'bitmap.iterate', 'bitmap.and.python'):
+            self.assertIn(name, results)
+            self.assertEqual(1, results[name]['repeat'])
+        fill = [result for name, result in results.items() if name.startswith('fill.')]
+        self.assertEqual(1, len(fill))
+        self.assertEqual(2, fill[0]['grids'])
+        self.assertLessEqual(fill[0]['p50'], fill[0]['p99'])
+
+    def test_run_dawg(self):
+        results = run_benchmarks(self.config, groups=[GROUP_DAWG])
+        for name in ('dawg.build', 'dawg.trace.bitmap', 'dawg.trace.dawg',
+                     'dawg.prefix.dawg.count'):
+            self.assertIn(name, results)
+
+    def test_compare(self):
+        old = {'results': {'a': {'median': 2.0}, 'b': {'median': 1.0}}}
+        new = {'results': {'a': {'median': 1.0}, 'b': {'median': 1.2}}}
+        self.assertEqual([('a', 2.0, 1.0, 0.5, False), ('b', 1.0, 1.2, 1.2, True)],
+                         compare_results(old, new, threshold=0.1))
+        self.assertFalse(compare_results(old, new, threshold=0.5)[1][4])
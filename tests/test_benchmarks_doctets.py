@@ -0,0 +1,10 @@
+import unittest
+import doctest
+import benchmarks.corpus
+import benchmarks.timing
+
+
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(benchmarks.corpus))
+    tests.addTests(doctest.DocTestSuite(benchmarks.timing))
+    return tests
@@ -1,6 +1,8 @@
 import unittest
-from karnobh.crosswordist.bitmap import (compress, CompressedBitmap, CompressedBitmap2, bit_index,
-                                         bit_index2, bool_to_byte_bits_seq)
+import random
+
+from karnobh.crosswordist.bitmap import (compress, decompress, CompressedBitmap, CompressedBitmap2,
+                                         bit_index, bit_index2, bool_to_byte_bits_seq)
 
 
 class CompressedBitmapTestCase(unittest.TestCase):
@@ -12,6 +14,27 @@ class CompressedBitmapTestCase(unittest.TestCase):
         expected = ['0x3f', '0xff', '0x3f', '0xff', '0x3f', '0xfe']
         self.assertEqual(expected, [hex(b) for b in res])
 
+    def test_compress_long_sequences(self):
+        original = b'\x11' * 16385 + b'\xff' * 8193 + b'\x00' * 32 + b'\x12' * 64
+        expected = (b'\xff\xff' + b'\x11' * 16383 + b'\x82' + b'\x11' * 2 + b'\x7f\xff' + b'\x42' +
+                    b'\x20\x20' + b'\xc0\x40' + b'\x12' * 64)
+        self.assertEqual(expected, bytes(compress(original)))
+        self.assertEqual(expected, bytes(compress(iter(original))))
+
+    def test_compress_round_trip(self):
+        rnd = random.Random(3)
+        for _ in range(200):
+            original = b''.join(bytes([rnd.choice([0x00, 0xFF, rnd.randint(0, 255)])]) *
+                                rnd.choice([1, 2, 31, 32, 63, 64, rnd.randint(1, 9000)])
+                                for _ in range(rnd.randint(0, 8)))
+            self.assertEqual(original, decompress(compress(original)))
+            self.assertEqual(original, bytes(CompressedBitmap2(original)))
+
+    def test_empty_compressed_bitmap(self):
+        self.assertEqual(b'', bytes(compress(b'')))
+        self.assertEqual([], list(CompressedBitmap2(b'')))
+        self.assertEqual([], list(bit_index2(CompressedBitmap2(b''))))
+
     def test_bytes_in_iter(self):
         t = '00' * (8191 * 2 + 10)
         # res = compress(bytearray.fromhex(t))
@@ -0,0 +1,63 @@
+import unittest
+import importlib.resources as pkg_res
+
+from karnobh.crosswordist.bitmap_expr import letter_in, letter_not_in, BitmapExpr
+from karnobh.crosswordist.words_index import WordsIndex
+from karnobh.crosswordist.word_index_native import WordIndexNative
+
+
+class BitmapExprTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assets_package = 'tests.assets'
+        self.index_file = 'random_filtered_words_idx.json'
+        self.indexes = []
+        for index_cls in (WordsIndex, WordIndexNative):
+            with pkg_res.open_text(self.assets_package, self.index_file) as f:
+                self.indexes.append(index_cls(file=f))
+
+    def assert_expr(self, length, expr, predicate):
+        expected = [word for word in self.indexes[0][length].words if predicate(word)]
+        for words_index in self.indexes:
+            with self.subTest(index=type(words_index).__name__, expr=expr):
+                self.assertEqual(expected, list(words_index.lookup_expr(length, expr)))
+                self.assertEqual(len(expected), words_index.count_expr(length, expr))
+                self.assertEqual(bool(expected), words_index.does_expr_exist(length, expr))
+
+    def test_expressions(self):
+        self.assert_expr(5, letter_in(2, "AEIOU"), lambda w: w[2] in "AEIOU")
+        self.assert_expr(5, letter_not_in(0, "S"), lambda w: w[0] != "S")
+        self.assert_expr(4, letter_in(1, "A") | letter_in(1, "E"), lambda w: w[1] in "AE")
+        self.assert_expr(6, letter_in(0, "S") & letter_in(2, "AEIOU") - letter_in(5, "S"),
+                         lambda w: w[0] == "S" and w[2] in "AEIOU" and w[5] != "S")
+        self.assert_expr(7, ~letter_in(0, "AEIOU") & ~letter_in(6, "SDY"),
+                         lambda w: w[0] not in "AEIOU" and w[6] not in "SDY")
+        self.assert_expr(3, letter_in(0, "Q") & letter_in(1, "X"),
+                         lambda w: w[0] == "Q" and w[1] == "X")
+        self.assert_expr(3, BitmapExpr(), lambda w: True)
+
+    def test_or_of_positions(self):
+        self.assert_expr(5, letter_in(0, "S") | letter_in(4, "S"),
+                         lambda w: w[0] == "S" or w[4] == "S")
+        self.assert_expr(5, letter_in(0, "T") | letter_not_in(4, "AEIOUS"),
+                         lambda w: w[0] == "T" or w[4] not in "AEIOUS")
+        self.assert_expr(6, (letter_in(0, "S") & letter_in(1, "T")) | letter_in(2, "AE")
+                         | letter_in(5, "Y"),
+                         lambda w: w[0] == "S" and w[1] == "T" or w[2] in "AE" or w[5] == "Y")
+        self.assert_expr(5, ~(letter_in(0, "S") | letter_in(1, "AEIOU")) & letter_in(4, "S"),
+                         lambda w: w[0] != "S" and w[1] not in "AEIOU" and w[4] == "S")
+        self.assert_expr(5, ~(letter_in(0, "S") & letter_in(4, "S")),
+                         lambda w: not (w[0] == "S" and w[4] == "S"))
+        self.assert_expr(4, letter_in(0, "Q") | letter_not_in(1, "Q"), lambda w: True)
+        self.assert_expr(4, letter_in(0, "Q") | letter_in(3, "Q"),
+                         lambda w: w[0] == "Q" or w[3] == "Q")
+
+    def test_letter_codes(self):
+        abc = self.indexes[0].alphabet
+        self.assert_expr(5, letter_in(4, [abc.code("S"), abc.code("Y")]) & letter_in(0, "T"),
+                         lambda w: w[4] in "SY" and w[0] == "T")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,8 @@
+import unittest
+import doctest
+import karnobh.crosswordist.bitmap_expr
+
+
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(karnobh.crosswordist.bitmap_expr))
+    return tests
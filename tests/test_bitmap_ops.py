@@ -1,9 +1,25 @@
+import random
 import unittest
 import operator
 
 from karnobh.crosswordist.bitmap import (and_all, or_all, CompressedBitmap, make_op_all, MakeOpError,
                                          NotEnoughSequencesError, bit_op_index2, CompressedBitmap2,
-                                         UnsupportedOperator)
+                                         UnsupportedOperator, build_checkpoints, compress,
+                                         bit_and_count)
+
+
+def sparse_bytes(rnd, bytes_num):
+    # long zero and one fills mixed with short noise, as the bitmaps of the long words are
+    seq = bytearray()
+    while len(seq) < bytes_num:
+        kind = rnd.random()
+        if kind < 0.6:
+            seq += bytes(rnd.randint(1, 3000))
+        elif kind < 0.7:
+            seq += b'\xff' * rnd.randint(1, 300)
+        else:
+            seq += bytes(rnd.randint(0, 255) for _ in range(rnd.randint(1, 20)))
+    return bytes(seq[:bytes_num])
 
 
 class BitmapOpsTestCase(unittest.TestCase):
@@ -66,3 +82,56 @@ class CompressedBitmapOpsTestCase(unittest.TestCase):
                                                             op=operator.and_)])
         self.assertRaises(UnsupportedOperator, lambda: [x for x in bit_op_index2(*compressed_seqs,
                                                                                  op=operator.xor)])
+
+
+class CheckpointsTestCase(unittest.TestCase):
+
+    def test_seek_to(self):
+        rnd = random.Random(7)
+        seq = sparse_bytes(rnd, 100_000)
+        bitmap = CompressedBitmap2(seq, checkpoint_interval=512)
+        decoded_offsets, _ = bitmap.checkpoints
+        self.assertGreater(len(decoded_offsets), 10)
+        self.assertEqual(bitmap.checkpoints, build_checkpoints(compress(seq), 512))
+        for _ in range(200):
+            iterator = iter(bitmap)
+            positions = sorted(rnd.sample(range(len(seq)), 3))
+            for position in positions:
+                iterator.seek_to(position)
+                self.assertEqual(position, iterator.position)
+                self.assertEqual(seq[position], next(iterator))
+        iterator = iter(bitmap)
+        iterator.seek_to(len(seq) + 10)
+        self.assertTrue(iterator.exhausted)
+        self.assertEqual(bytes(CompressedBitmap2(seq, checkpoint_interval=64)), seq)
+
+    def test_galloping_and(self):
+        rnd = random.Random(8)
+        for operands_num in (2, 3, 5):
+            seqs = [sparse_bytes(rnd, 20_000) for _ in range(operands_num)]
+            # every operand has the same bits in the end to have some result
+            seqs = [seq + bytes.fromhex("0F0F") for seq in seqs]
+            expected = [index for index in range(len(seqs[0]) * 8)
+                        if all((seq[index >> 3] >> (7 - (index & 7))) & 1 for seq in seqs)]
+            for interval in (64, 1024, 100_000):
+                bitmaps = [CompressedBitmap2(seq, checkpoint_interval=interval) for seq in seqs]
+                self.assertEqual(expected, list(bit_op_index2(*bitmaps, op=operator.and_)))
+
+
+class BitAndCountTestCase(unittest.TestCase):
+
+    def test_count(self):
+        rnd = random.Random(9)
+        for operands_num in (1, 2, 3, 6):
+            seqs = [sparse_bytes(rnd, 30_000) for _ in range(operands_num)]
+            # fills of ones shared by all operands are counted arithmetically
+            seqs = [b"\xff" * 500 + seq for seq in seqs]
+            value = -1
+            for seq in seqs:
+                value &= int.from_bytes(seq, 'big')
+            compressed = [compress(seq) for seq in seqs]
+            self.assertEqual(value.bit_count(), bit_and_count(*compressed))
+            self.assertEqual(len(list(bit_op_index2(*map(CompressedBitmap2, seqs),
+                                                    op=operator.and_))) if operands_num > 1
+                             else value.bit_count(), bit_and_count(*compressed))
+        self.assertEqual(0, bit_and_count(compress(b"\xff" * 10), compress(b"")))
@@ -0,0 +1,62 @@
+import unittest
+import operator
+import importlib.resources as pkg_res
+
+from karnobh.crosswordist.words_index import WordsIndex
+from karnobh.crosswordist.dawg_index import Dawg, DawgWordsIndex
+from karnobh.crosswordist.solution_finder import UsedWords
+from tests.test_word_index_native import random_patterns
+
+
+class DawgTestCase(unittest.TestCase):
+
+    def test_shared_suffixes(self):
+        words = [b"\x00\x01", b"\x01\x01", b"\x02\x01", b"\x02\x00"]
+        dawg = Dawg.build(2, words)
+        # the root, the nodes of the suffixes "1" and "0|1" and the final node
+        self.assertEqual(4, dawg.nodes_num)
+        self.assertEqual(4, dawg.words_num)
+        self.assertEqual([0, 1, 2], list(dawg.indexes({1: 1})))
+        self.assertEqual(0, Dawg.build(3, []).count({0: 1}))
+
+    def test_not_sorted_words(self):
+        # e.g., the words of a scored index are ordered by their scores
+        words = [b"\x02\x01", b"\x00\x01", b"\x01\x00"]
+        dawg = Dawg.build(2, words)
+        self.assertEqual([0, 1], list(dawg.indexes({1: 1})))
+        self.assertEqual([2], list(dawg.indexes({0: 1})))
+        self.assertEqual(2, dawg.count({1: 1}))
+
+
+class DawgWordsIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assets_package = 'tests.assets'
+        self.index_file = 'random_filtered_words_idx.json'
+        with pkg_res.open_text(self.assets_package, self.index_file) as f:
+            self.words_index = WordsIndex(file=f)
+        with pkg_res.open_text(self.assets_package, self.index_file) as f:
+            self.dawg_index = DawgWordsIndex(file=f)
+
+    def test_same_lookups(self):
+        patterns = random_patterns(self.words_index, 300, seed=7)
+        used_words = UsedWords(self.words_index)
+        used_words.add([(5, i) for i in list(self.words_index.lookup_indexes(5, {0: 'S'}))[:5]])
+        for masks in ({}, used_words.masks):
+            for length, mapping in patterns:
+                mask = masks.get(length)
+                self.assertEqual(list(self.words_index.lookup_indexes(length, mapping, mask=mask)),
+                                 list(self.dawg_index.lookup_indexes(length, mapping, mask=mask)))
+            self.assertEqual(self.words_index.count_occurrences_batch(patterns, masks),
+                             self.dawg_index.count_occurrences_batch(patterns, masks))
+            self.assertEqual(self.words_index.does_intersection_exist_batch(patterns, masks),
+                             self.dawg_index.does_intersection_exist_batch(patterns, masks))
+        self.assertEqual(list(self.words_index.lookup(5, {0: 'S', 4: 'S'}, operator.or_)),
+                         list(self.dawg_index.lookup(5, {0: 'S', 4: 'S'}, operator.or_)))
+
+    def test_compact(self):
+        length = 5
+        dawg = self.dawg_index.dawg(length)
+        self.assertEqual(len(self.words_index[length].words), dawg.words_num)
+        self.assertLess(dawg.nodes_num, length * dawg.words_num)
@@ -0,0 +1,8 @@
+import unittest
+import doctest
+import karnobh.crosswordist.dawg_index
+
+
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(karnobh.crosswordist.dawg_index))
+    return tests
@@ -5,10 +5,29 @@ import importlib.resources as pkg_res
 
 from karnobh.crosswordist.affine_2d import FlatMatrix
 from karnobh.crosswordist.grid_generator import (create_random_grid, get_all_checked_words_layout,
-                                                 create_cross_words_index, CrossWordsIndex)
+                                                 create_cross_words_index, CrossWordsIndex,
+                                                 cross_words_index_from_rows)
 from karnobh.crosswordist.words_index import WordsIndex
 from karnobh.crosswordist.word_index_native import WordIndexNative
-from karnobh.crosswordist.solution_finder import find_solution, FinderResult
+from karnobh.crosswordist.solution_finder import (find_solution, FinderResult, CandidateOrder,
+                                                   _least_constraining_first, FillSession,
+                                                   PrefilledWordsError, check_prefilled_words)
+from karnobh.crosswordist.search_stats import SearchStats
+
+# the grid of the seeded solution tests, 1 is a black cell
+GRID_7X7 = [0, 0, 0, 1, 0, 0, 0,
+            0, 0, 0, 1, 0, 0, 0,
+            0, 0, 0, 1, 0, 0, 0,
+            1, 0, 0, 0, 0, 0, 0,
+            0, 0, 0, 0, 0, 0, 0,
+            0, 0, 0, 0, 0, 0, 1,
+            0, 0, 0, 1, 1, 1, 1]
+
+
+def _letters_rows(cross_words_index: CrossWordsIndex) -> list[str]:
+    letters_matrix = cross_words_index.letters_matrix
+    width, height = letters_matrix.size
+    return ["".join(letters_matrix.get(x, y) or "#" for x in range(width)) for y in range(height)]
 
 
 class TestFiningSolution(unittest.TestCase):
@@ -20,15 +39,8 @@ class TestFiningSolution(unittest.TestCase):
         self.index_file = 'random_filtered_words_idx.json'
 
     def test_cross_word_index_creation2(self):
-        grid_data = [0, 0, 0, 1, 0, 0, 0,
-                     0, 0, 0, 1, 0, 0, 0,
-                     0, 0, 0, 1, 0, 0, 0,
-                     1, 0, 0, 0, 0, 0, 0,
-                     0, 0, 0, 0, 0, 0, 0,
-                     0, 0, 0, 0, 0, 0, 1,
-                     0, 0, 0, 1, 1, 1, 1]
         size = 7
-        grid = FlatMatrix(size, size, new_state=grid_data)
+        grid = FlatMatrix(size, size, new_state=list(GRID_7X7))
         with pkg_res.open_text(self.assets_package, self.index_file) as f:
             wi_loaded = WordsIndex(file=f)
         cross_words_index = CrossWordsIndex(grid=grid)
@@ -51,15 +63,8 @@ class TestFiningSolution(unittest.TestCase):
         self.assertEqual(expected_grid, actual_gird)
 
     def test_cross_word_index_equality(self):
-        grid_data = [0, 0, 0, 1, 0, 0, 0,
-                     0, 0, 0, 1, 0, 0, 0,
-                     0, 0, 0, 1, 0, 0, 0,
-                     1, 0, 0, 0, 0, 0, 0,
-                     0, 0, 0, 0, 0, 0, 0,
-                     0, 0, 0, 0, 0, 0, 1,
-                     0, 0, 0, 1, 1, 1, 1]
         size = 7
-        grid = FlatMatrix(size, size, new_state=grid_data)
+        grid = FlatMatrix(size, size, new_state=list(GRID_7X7))
         with pkg_res.open_text(self.assets_package, self.index_file) as f:
             wi_loaded = WordsIndex(file=f)
         with pkg_res.open_text(self.assets_package, self.index_file) as f:
@@ -111,3 +116,203 @@ class TestFiningSolution(unittest.TestCase):
             print(f"Solution: {sol_results[sol]} ==> time: {time.time() - t0} seconds ==>"
                   f"found ratio: {found_times / (num + 1)}")
             print(cross_words_index.letters_matrix.pretty_log({0: "■", "": "□"}))
+
+
+class TestBestFirstSolution(unittest.TestCase):
+
+    def test_best_first_order(self):
+        with pkg_res.open_text('tests.assets', 'random_filtered_words.txt') as f:
+            words = [line.strip() for line in f]
+        # the words with more vowels are "better" ones
+        with WordsIndex.as_context() as wi:
+            for word in words:
+                wi.add_word(word, sum(word.count(v) for v in "AEIOU"))
+        grids = []
+        for seed in (1, 2):
+            random.seed(seed)
+            cross_words_index = CrossWordsIndex(grid=FlatMatrix(7, 7, new_state=list(GRID_7X7)))
+            sol = find_solution(word_index=wi,
+                                cross_words_index=cross_words_index,
+                                timeout_after_seconds=30,
+                                candidate_order=CandidateOrder.BEST_FIRST)
+            self.assertEqual(FinderResult.FOUND, sol)
+            grids.append(cross_words_index.letters_matrix.pretty_log({0: "#", "": " "}))
+        # the order does not depend on the random state
+        self.assertEqual(grids[0], grids[1])
+
+
+class TestLeastConstrainingSolution(unittest.TestCase):
+
+    def test_least_constraining_order(self):
+        for index_cls in (WordsIndex, WordIndexNative):
+            with pkg_res.open_text('tests.assets', 'random_filtered_words_idx.json') as f:
+                wi_loaded = index_cls(file=f)
+            for max_scored in (5, 1024):
+                random.seed(1)
+                cross_words_index = CrossWordsIndex(grid=FlatMatrix(7, 7, new_state=list(GRID_7X7)))
+                sol = find_solution(word_index=wi_loaded,
+                                    cross_words_index=cross_words_index,
+                                    timeout_after_seconds=30,
+                                    candidate_order=CandidateOrder.LEAST_CONSTRAINING,
+                                    max_scored_candidates=max_scored)
+                self.assertEqual(FinderResult.FOUND, sol)
+                for layout in cross_words_index.all:
+                    self.assertIn("".join(layout.word_letters),
+                                  wi_loaded[layout.word_len].words)
+
+
+class TestLeastConstrainingOrder(unittest.TestCase):
+
+    def test_candidates_order(self):
+        with WordsIndex.as_context(alphabet="ABCOTU") as wi:
+            for word in ["CAT", "COT", "CUT", "TAB", "ACT"]:
+                wi.add_word(word)
+        cross_words_index = CrossWordsIndex(grid=FlatMatrix(3, 3, new_state=[0] * 9))
+        first_across = cross_words_index.horizontal_words[0]
+        # in the reversed order of the index: TAB, CUT, COT, CAT, ACT
+        candidates = [(i, wi[3].letters_at(i)) for i in reversed(range(len(wi[3].words)))]
+        # every letter of the first across word starts a down word: "C" starts 3 words, "A" and
+        # "T" start one word, other letters none
+        ordered, verified_num = _least_constraining_first(first_across, candidates, wi, 10)
+        self.assertEqual(["CAT", "ACT"], [wi[3].word_at(i) for i, _ in ordered])
+        self.assertEqual(2, verified_num)
+        # only the first candidates are scored, others follow them in the original order
+        tab, cut, cot, cat, act = candidates
+        ordered, verified_num = _least_constraining_first(first_across, [cut, act, cot, cat], wi, 2)
+        self.assertEqual(["ACT", "COT", "CAT"], [wi[3].word_at(i) for i, _ in ordered])
+        self.assertEqual(1, verified_num)
+
+
+class TestLetterTablesSolution(unittest.TestCase):
+
+    def test_same_solution_with_letter_tables(self):
+        with pkg_res.open_text('tests.assets', 'random_filtered_words_idx.json') as f:
+            wi_loaded = WordIndexNative(file=f)
+        grids = []
+        for use_letter_tables in (False, True):
+            random.seed(3)
+            cross_words_index = CrossWordsIndex(grid=FlatMatrix(7, 7, new_state=list(GRID_7X7)))
+            sol = find_solution(word_index=wi_loaded,
+                                cross_words_index=cross_words_index,
+                                timeout_after_seconds=30,
+                                use_letter_tables=use_letter_tables)
+            self.assertEqual(FinderResult.FOUND, sol)
+            grids.append(cross_words_index.letters_matrix.pretty_log({0: "#", "": " "}))
+        self.assertEqual(grids[0], grids[1])
+
+
+class TestUniqueWordsSolution(unittest.TestCase):
+
+    def test_symmetric_square(self):
+        # the only fill of the square repeats every word vertically
+        with WordsIndex.as_context() as wi:
+            for word in ["BAT", "ARE", "TEN"]:
+                wi.add_word(word)
+        for unique_words, expected in ((False, FinderResult.FOUND),
+                                       (True, FinderResult.NO_SOLUTION)):
+            random.seed(1)
+            cross_words_index = CrossWordsIndex(grid=FlatMatrix(3, 3, new_state=[0] * 9))
+            sol = find_solution(word_index=wi,
+                                cross_words_index=cross_words_index,
+                                timeout_after_seconds=10,
+                                unique_words=unique_words)
+            self.assertEqual(expected, sol)
+
+    def test_words_are_unique(self):
+        with pkg_res.open_text('tests.assets', 'random_filtered_words_idx.json') as f:
+            wi_loaded = WordIndexNative(file=f)
+        for seed in range(5):
+            random.seed(seed)
+            cross_words_index = CrossWordsIndex(grid=FlatMatrix(7, 7, new_state=list(GRID_7X7)))
+            sol = find_solution(word_index=wi_loaded,
+                                cross_words_index=cross_words_index,
+                                timeout_after_seconds=30)
+            self.assertEqual(FinderResult.FOUND, sol)
+            words = ["".join(layout.word_letters) for layout in cross_words_index.all]
+            self.assertEqual(len(words), len(set(words)))
+
+
+class TestPrefilledSolution(unittest.TestCase):
+
+    GRID_ROWS = ["...#...",
+                 "...#...",
+                 "...#...",
+                 "#......",
+                 ".......",
+                 "......#",
+                 "...####"]
+
+    def setUp(self):
+        super().setUp()
+        with pkg_res.open_text('tests.assets', 'random_filtered_words_idx.json') as f:
+            self.wi_loaded = WordIndexNative(file=f)
+        random.seed(3)
+        solved = CrossWordsIndex(grid=FlatMatrix(7, 7, new_state=list(GRID_7X7)))
+        self.assertEqual(FinderResult.FOUND, find_solution(self.wi_loaded, solved, 30))
+        self.solved_rows = _letters_rows(solved)
+
+    def _rows_with(self, *words):
+        """
+        :param words: (row, column, text) of the letters set in the empty grid
+        """
+        rows = [list(row) for row in self.GRID_ROWS]
+        for y, x, text in words:
+            rows[y][x:x + len(text)] = text
+        return ["".join(row) for row in rows]
+
+    def test_prefilled_words_are_kept(self):
+        seed_word = self.solved_rows[4]
+        rows = self._rows_with((4, 0, seed_word), (0, 0, self.solved_rows[0][:2]))
+        session = FillSession(self.wi_loaded)
+        for seed in range(3):
+            random.seed(seed)
+            cross_words_index = cross_words_index_from_rows(rows)
+            self.assertEqual(FinderResult.FOUND, session.fill(cross_words_index, 30))
+            filled = _letters_rows(cross_words_index)
+            self.assertEqual(seed_word, filled[4])
+            self.assertEqual(self.solved_rows[0][:2], filled[0][:2])
+            words = ["".join(layout.word_letters) for layout in cross_words_index.all]
+            self.assertEqual(len(words), len(set(words)))
+
+    def test_full_grid(self):
+        cross_words_index = cross_words_index_from_rows(self.solved_rows)
+        self.assertEqual(FinderResult.FOUND, FillSession(self.wi_loaded).fill(cross_words_index, 1))
+        self.assertEqual(self.solved_rows, _letters_rows(cross_words_index))
+
+    def test_inconsistent_words(self):
+        word = self.solved_rows[4]
+        for rows, problem in ((self._rows_with((0, 0, "a")), "letters not in the alphabet: a"),
+                              (self._rows_with((4, 0, word[::-1])), "not in the words index"),
+                              (self._rows_with((0, 0, "QXZ")), "horizontal word at row 1"),
+                              (self._rows_with((4, 0, word)), None)):
+            cross_words_index = cross_words_index_from_rows(rows)
+            if problem is None:
+                check_prefilled_words(self.wi_loaded, cross_words_index)
+                continue
+            with self.assertRaises(PrefilledWordsError, msg=rows) as cm:
+                check_prefilled_words(self.wi_loaded, cross_words_index)
+            self.assertIn(problem, str(cm.exception))
+
+    def test_repeated_words(self):
+        rows = ["BAT", "ARE", "TEN"]
+        with WordsIndex.as_context() as wi:
+            for word in rows:
+                wi.add_word(word)
+        with self.assertRaisesRegex(PrefilledWordsError, "repeated"):
+            check_prefilled_words(wi, cross_words_index_from_rows(rows))
+        check_prefilled_words(wi, cross_words_index_from_rows(rows), unique_words=False)
+        self.assertEqual(FinderResult.NO_SOLUTION,
+                         find_solution(wi, cross_words_index_from_rows(rows), 1))
+
+    def test_refill_reuses_letter_tables(self):
+        session = FillSession(self.wi_loaded)
+        rows = self._rows_with((4, 0, self.solved_rows[4]))
+        misses = []
+        for _ in range(2):
+            random.seed(5)
+            stats = SearchStats()
+            self.assertEqual(FinderResult.FOUND,
+                             session.fill(cross_words_index_from_rows(rows), 30, stats=stats))
+            misses.append(stats.counter("letter_table_misses"))
+        self.assertGreater(misses[0], 0)
+        self.assertEqual(0, misses[1])
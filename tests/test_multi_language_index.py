@@ -0,0 +1,67 @@
+import io
+import unittest
+
+from karnobh.crosswordist.multi_language_index import (MultiLanguageWordsIndex,
+                                                       UnknownLanguageError)
+from karnobh.crosswordist.naive_lookup import naive_lookup
+
+
+class MultiLanguageWordsIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.alphabets = {
+            "en": "ABCDEFGHIJKLMNOPQRSTUVWXYZ",
+            "ru": "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ",
+            "de": "ABCDEFGHIJKLMNOPQRSTUVWXYZÄÖÜ",
+        }
+        self.words = {
+            "en": ["CAT", "COT", "DOG", "CATS", "DOGS"],
+            "ru": ["КОТ", "ДОМ", "ЁЖ", "ЁЛКА", "КОШКА", "DOG"],
+            "de": ["BÄR", "HUND", "KATZE", "MÜDE", "BÄRE"],
+        }
+        with MultiLanguageWordsIndex.as_context(self.alphabets) as self.index:
+            for language, words in self.words.items():
+                for word in words:
+                    self.index.add_word(language, word)
+
+    def test_routing_by_language(self):
+        self.assertEqual(["CAT", "COT"], list(self.index.lookup("en", 3, {0: 'C'})))
+        self.assertEqual(["КОТ"], list(self.index.lookup("ru", 3, {0: 'К'})))
+        self.assertEqual(["КОШКА"], list(self.index.lookup("ru", 5, {4: 'А'})))
+        self.assertEqual(2, self.index.count_occurrences("de", 4, {1: 'Ä'}) +
+                         self.index.count_occurrences("de", 3, {1: 'Ä'}))
+        self.assertFalse(self.index.does_intersection_exist("de", 4, {1: 'Ö'}))
+        self.assertRaises(UnknownLanguageError, self.index.language, "fr")
+
+    def test_words_not_in_alphabet_are_counted(self):
+        # "ЁЖ" is too short for default length range, "DOG" is not in Cyrillic alphabet
+        self.assertEqual({"en": 0, "ru": 2, "de": 0}, self.index.rejected_words)
+
+    def test_decomposed_unicode_words(self):
+        with MultiLanguageWordsIndex.as_context({"de": self.alphabets["de"]}) as index:
+            index.add_word("de", "BA\u0308R")  # decomposed umlaut
+        self.assertEqual(["BÄR"], list(index.lookup("de", 3, {1: 'Ä'})))
+
+    def test_rare_letters_share_empty_bitmap(self):
+        words_index = self.index.language("ru")[3]
+        empty_bitmap = words_index.empty_bitmap
+        self.assertIsNotNone(empty_bitmap)
+        self.assertIs(empty_bitmap, words_index.bitmap_on_position(0, 'Щ'))
+        self.assertIs(empty_bitmap, words_index.bitmap_on_position(2, 'Ю'))
+
+    def test_dump_and_load(self):
+        with io.StringIO() as f:
+            self.index.dump(f)
+            f.seek(0)
+            loaded = MultiLanguageWordsIndex(file=f, packed_words=True)
+        self.assertEqual(sorted(self.alphabets), sorted(loaded.languages))
+        for language in self.alphabets:
+            words_index = loaded.language(language)
+            self.assertEqual(self.alphabets[language], words_index.alphabet.letters)
+            for length in (3, 4):
+                words = list(self.index.language(language)[length].words)
+                for word in words:
+                    mapping = {0: word[0], length - 1: word[-1]}
+                    self.assertEqual(naive_lookup(words, mapping),
+                                     list(words_index.lookup(length, mapping)))
@@ -0,0 +1,8 @@
+import unittest
+import doctest
+import karnobh.crosswordist.packed_words
+
+
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(karnobh.crosswordist.packed_words))
+    return tests
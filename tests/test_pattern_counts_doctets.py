@@ -0,0 +1,8 @@
+import unittest
+import doctest
+import karnobh.crosswordist.pattern_counts
+
+
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(karnobh.crosswordist.pattern_counts))
+    return tests
@@ -0,0 +1,61 @@
+import re
+import unittest
+import importlib.resources as pkg_res
+
+from karnobh.crosswordist.pattern_query import PatternQuery, PatternQueryError
+from karnobh.crosswordist.words_index import WordsIndex
+from karnobh.crosswordist.word_index_native import WordIndexNative
+
+
+class PatternQueryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assets_package = 'tests.assets'
+        self.index_file = 'random_filtered_words_idx.json'
+        self.queries = []
+        for index_cls in (WordsIndex, WordIndexNative):
+            with pkg_res.open_text(self.assets_package, self.index_file) as f:
+                self.queries.append(PatternQuery(index_cls(file=f)))
+        words_index = self.queries[0]._words_index
+        self.all_words = [word for length in words_index.lengths
+                          for word in words_index[length].words]
+
+    def expected_words(self, pattern):
+        regex = re.compile(pattern.upper().replace("?", ".").replace("*", ".*"))
+        return [word for word in self.all_words if regex.fullmatch(word)]
+
+    def test_patterns(self):
+        for pattern in ("C?T?S", "C[AO]T*", "S*", "*ING", "[^S]?[AEIOU]?", "?A*E?", "???", "*"):
+            expected = self.expected_words(pattern)
+            for query in self.queries:
+                with self.subTest(pattern=pattern, index=type(query._words_index).__name__):
+                    self.assertEqual(len(expected), query.count(pattern))
+                    self.assertEqual(bool(expected), query.exists(pattern))
+                    first_page = query.search(pattern, page_size=7)
+                    self.assertEqual(len(expected), first_page.total)
+                    self.assertEqual(expected[:7], first_page.words)
+                    paged = []
+                    for page in range(first_page.pages):
+                        paged += query.search(pattern, page=page, page_size=7).words
+                    self.assertEqual(expected, paged)
+
+    def test_lower_case_and_cache(self):
+        query = self.queries[1]
+        self.assertEqual(query.count("C?T?S"), query.count("c?t?s"))
+        query.search("C?T?S", page=1)
+        query.search("C?T?S", page=2)
+        cache_info = query.plan.cache_info()
+        self.assertEqual(2, cache_info.misses)
+        self.assertEqual(2, cache_info.hits)
+
+    def test_errors(self):
+        query = self.queries[0]
+        for pattern in ("", "C[AO", "C]", "C[]T", "C*T*", "C1T"):
+            with self.subTest(pattern=pattern):
+                with self.assertRaises(PatternQueryError):
+                    query.count(pattern)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import io
+import unittest
+
+from karnobh.crosswordist.grid_generator import cross_words_index_from_rows
+from karnobh.crosswordist.puzzle_pool import PuzzlePool, PoolKey, Puzzle, PuzzlePoolError
+from karnobh.crosswordist.service import grid_rows
+
+ROWS = ["#BMS#",
+        "BOONS",
+        "CLOAM",
+        "SACKS",
+        "#RHE#"]
+
+
+class PuzzlePoolTestCase(unittest.TestCase):
+
+    def test_key(self):
+        key = PoolKey.parse('11:D:0.166')
+        self.assertEqual(PoolKey(11, 'D', 0.166), key)
+        self.assertEqual(key, PoolKey.parse(str(key)))
+        for wrong_key in ('11:D', '11:D:x', 'x:D:0.1', ''):
+            with self.assertRaises(PuzzlePoolError):
+                PoolKey.parse(wrong_key)
+
+    def test_refill_marks(self):
+        key, other_key = PoolKey(5, 'D', 0.1), PoolKey(7, 'X', 0.2)
+        pool = PuzzlePool({key: 4, other_key: 1}, low_water_ratio=0.5)
+        self.assertEqual(2, pool.low_water_mark(key))
+        self.assertEqual(key, pool.needed_key({}))
+        self.assertEqual(other_key, pool.needed_key({key: 4}))
+        self.assertIsNone(pool.needed_key({key: 4, other_key: 1}))
+        for seed in range(5):
+            pool.put(key, Puzzle(seed, ROWS))
+        self.assertFalse(pool.put(PoolKey(3, 'NO', 0.0), Puzzle(0, ROWS)))
+        self.assertEqual(4, pool.size(key))
+        self.assertEqual(other_key, pool.needed_key({}))
+        # the key is not refilled till it falls to its low-water mark
+        pool.take(key)
+        self.assertIsNone(pool.needed_key({other_key: 1}))
+        pool.take(key)
+        self.assertEqual(key, pool.needed_key({other_key: 1}))
+        self.assertEqual([2, 3], [pool.take(key).seed for _ in range(2)])
+        self.assertIsNone(pool.take(key))
+
+    def test_dump_and_load(self):
+        key = PoolKey(5, 'D', 0.1)
+        pool = PuzzlePool({key: 3})
+        pool.put(key, Puzzle(1, ROWS))
+        pool.put(key, Puzzle(2, ROWS[::-1]))
+        pool_file = io.BytesIO()
+        pool.dump(pool_file)
+        pool_file.seek(0)
+        loaded_pool = PuzzlePool({key: 1, PoolKey(7, 'D', 0.1): 1})
+        self.assertEqual(1, loaded_pool.load(pool_file))
+        self.assertEqual(Puzzle(1, ROWS), loaded_pool.take(key))
+        with self.assertRaises(PuzzlePoolError):
+            loaded_pool.load(io.BytesIO(b'not a pool'))
+
+    def test_cross_words_index(self):
+        cross_words_index = Puzzle(1, ROWS).cross_words_index()
+        self.assertEqual(ROWS, grid_rows(cross_words_index.letters_matrix))
+        self.assertEqual(['BMS', 'BOONS', 'CLOAM', 'SACKS', 'RHE'],
+                         ["".join(word.word_letters)
+                          for word in cross_words_index.horizontal_words])
+        self.assertEqual(['BOLAR', 'MOOCH', 'SNAKE', 'BCS', 'SMS'],
+                         ["".join(word.word_letters) for word in cross_words_index.vertical_words])
+        partial_rows = ["#B.S#", ".....", "C....", ".....", "#..E#"]
+        self.assertEqual(partial_rows,
+                         grid_rows(cross_words_index_from_rows(partial_rows).letters_matrix))
+
+
+if __name__ == '__main__':
+    unittest.main()
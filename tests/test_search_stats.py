@@ -0,0 +1,125 @@
+import io
+import json
+import random
+import unittest
+import importlib.resources as pkg_res
+
+from karnobh.crosswordist.affine_2d import FlatMatrix
+from karnobh.crosswordist.grid_generator import CrossWordsIndex
+from karnobh.crosswordist.search_stats import (SearchStats, InstrumentedWordsIndex, NULL_STATS,
+                                               LOOKUP_COUNT, LOOKUP_EXISTS, LOOKUP_LIST)
+from karnobh.crosswordist.solution_finder import find_solution, FinderResult
+from karnobh.crosswordist.word_index_native import WordIndexNative
+from karnobh.crosswordist.words_index import WordsIndex
+from tests.test_finding_solution import GRID_7X7
+
+
+class SearchStatsTestCase(unittest.TestCase):
+
+    def test_counters_and_timers(self):
+        stats = SearchStats()
+        stats.incr("nodes")
+        stats.incr("nodes", 2)
+        stats.incr("nodes", depth=3)
+        with stats.timer("lookup_seconds", type=LOOKUP_COUNT):
+            pass
+        self.assertEqual(3, stats.counter("nodes"))
+        self.assertEqual(1, stats.counter("nodes", depth=3))
+        self.assertEqual(0, stats.counter("backtracks"))
+        count, seconds = stats.timer_total("lookup_seconds", type=LOOKUP_COUNT)
+        self.assertEqual(1, count)
+        self.assertGreaterEqual(seconds, 0)
+
+    def test_merge(self):
+        stats, other = SearchStats(), SearchStats()
+        stats.incr("nodes")
+        other.incr("nodes", 2)
+        other.observe("search_seconds", 1.5)
+        stats.merge(other)
+        self.assertEqual(3, stats.counter("nodes"))
+        self.assertEqual((1, 1.5), stats.timer_total("search_seconds"))
+
+    def test_json(self):
+        stats = SearchStats()
+        stats.incr("lookups", 2, type=LOOKUP_EXISTS)
+        stats.observe("search_seconds", 0.25)
+        f = io.StringIO()
+        stats.dump_json(f)
+        self.assertEqual({
+            'counters': [{'name': 'lookups', 'labels': {'type': 'exists'}, 'value': 2}],
+            'timers': [{'name': 'search_seconds', 'labels': {}, 'count': 1, 'seconds': 0.25}],
+        }, json.loads(f.getvalue()))
+
+    def test_disabled(self):
+        NULL_STATS.incr("nodes")
+        NULL_STATS.observe("search_seconds", 1.0)
+        with NULL_STATS.timer("search_seconds"):
+            pass
+        self.assertFalse(NULL_STATS.enabled)
+        self.assertEqual(0, NULL_STATS.counter("nodes"))
+        self.assertEqual({'counters': [], 'timers': []}, NULL_STATS.as_dict())
+
+
+class InstrumentedWordsIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        with WordsIndex.as_context(alphabet="ABCT") as wi:
+            for word in ["CAT", "BAT", "TAB", "ACT"]:
+                wi.add_word(word)
+        self.words_index = wi
+
+    def test_lookups_by_type(self):
+        stats = SearchStats()
+        wi = InstrumentedWordsIndex(self.words_index, stats)
+        self.assertEqual(["ACT", "BAT", "CAT"], list(wi.lookup(3, {2: "T"})))
+        self.assertEqual(3, wi.count_occurrences(3, {2: "T"}))
+        self.assertEqual([3, 1], wi.count_occurrences_batch([(3, {2: "T"}), (3, {0: "A"})]))
+        self.assertTrue(wi.do_all_intersections_exist([(3, {1: "A"})]))
+        self.assertEqual(1, stats.counter("lookups", type=LOOKUP_LIST))
+        self.assertEqual(3, stats.counter("lookups", type=LOOKUP_COUNT))
+        self.assertEqual(1, stats.counter("lookups", type=LOOKUP_EXISTS))
+        self.assertGreater(stats.counter("compressed_bytes"), 0)
+        self.assertEqual(3, stats.counter("listed_words"))
+        # a batch is timed once
+        self.assertEqual(2, stats.timer_total("lookup_seconds", type=LOOKUP_COUNT)[0])
+        # the list lookups are consumed lazily
+        indexes = wi.lookup_indexes(3, {1: "A"})
+        self.assertEqual(2, stats.counter("lookups", type=LOOKUP_LIST))
+        self.assertEqual(1, stats.timer_total("lookup_seconds", type=LOOKUP_LIST)[0])
+        next(indexes)
+        self.assertEqual(4, stats.counter("listed_words"))
+        indexes.close()
+        self.assertEqual(2, stats.timer_total("lookup_seconds", type=LOOKUP_LIST)[0])
+        # other attributes are of the proxied index
+        self.assertIs(self.words_index.alphabet, wi.alphabet)
+        self.assertIs(self.words_index[3], wi[3])
+
+
+class SolutionStatsTestCase(unittest.TestCase):
+
+    def test_search_stats(self):
+        with pkg_res.open_text('tests.assets', 'random_filtered_words_idx.json') as f:
+            wi_loaded = WordIndexNative(file=f)
+        grids = []
+        stats = SearchStats()
+        for search_stats in (None, stats):
+            random.seed(1)
+            cross_words_index = CrossWordsIndex(grid=FlatMatrix(7, 7, new_state=list(GRID_7X7)))
+            sol = find_solution(word_index=wi_loaded,
+                                cross_words_index=cross_words_index,
+                                timeout_after_seconds=30,
+                                stats=search_stats)
+            self.assertEqual(FinderResult.FOUND, sol)
+            grids.append(cross_words_index.letters_matrix.pretty_log({0: "#", "": " "}))
+        # the statistics do not change the search
+        self.assertEqual(grids[0], grids[1])
+        self.assertEqual(1, stats.counter("nodes", depth=0))
+        self.assertEqual(1, stats.timer_total("search_seconds")[0])
+        nodes = sum(stats.counter("nodes", depth=depth) for depth in range(len(grids[0])))
+        backtracks = sum(stats.counter("backtracks", depth=depth) for depth in range(len(grids[0])))
+        # every node but the last one either descends or backtracks
+        self.assertGreaterEqual(nodes, backtracks + 1)
+        self.assertGreater(stats.counter("lookups", type=LOOKUP_COUNT), 0)
+        self.assertGreater(stats.counter("letter_table_misses"), 0)
+        self.assertIn("crosswordist_nodes_total{depth=\"0\"} 1", stats.to_prometheus())
@@ -0,0 +1,8 @@
+import unittest
+import doctest
+import karnobh.crosswordist.search_stats
+
+
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(karnobh.crosswordist.search_stats))
+    return tests
@@ -0,0 +1,238 @@
+import asyncio
+import json
+import unittest
+import importlib.resources as pkg_res
+
+from karnobh.crosswordist.affine_2d import FlatMatrix
+from karnobh.crosswordist.service import (CrosswordService, FillRequest, FillRequestError,
+                                          parse_grid, grid_rows, fill, RESULT_EXPIRED,
+                                          RESULT_INCONSISTENT)
+from karnobh.crosswordist.puzzle_pool import PuzzlePool, PoolKey
+from karnobh.crosswordist.words_index import WordsIndex
+
+GRID_7X7_ROWS = ["...#...",
+                 "...#...",
+                 "...#...",
+                 "#......",
+                 ".......",
+                 "......#",
+                 "...####"]
+
+
+def _load_test_index():
+    with pkg_res.open_text('tests.assets', 'random_filtered_words_idx.json') as f:
+        return WordsIndex(file=f)
+
+
+def _decode_chunked(body: bytes) -> bytes:
+    data = b''
+    while True:
+        size, _, body = body.partition(b'\r\n')
+        size = int(size, 16)
+        if not size:
+            return data
+        data += body[:size]
+        body = body[size + 2:]
+
+
+def _black_cells(rows):
+    return [[x for x, cell in enumerate(row) if cell == '#'] for row in rows]
+
+
+class FillRequestTestCase(unittest.TestCase):
+
+    def test_grid(self):
+        self.assertEqual(GRID_7X7_ROWS, parse_grid(GRID_7X7_ROWS))
+        letters_matrix = FlatMatrix(7, 7, [0 if cell == '#' else "" for row in GRID_7X7_ROWS
+                                           for cell in row])
+        self.assertEqual(GRID_7X7_ROWS, grid_rows(letters_matrix))
+        self.assertEqual(["C.#", "A..", "T.."], parse_grid(["C.#", "A..", "T.."]))
+        for rows in (["..", ".."], ["...", "..", "..."], ["...", ". .", "..."], "...", [1, 2, 3]):
+            with self.assertRaises(FillRequestError, msg=rows):
+                parse_grid(rows)
+
+    def test_validation(self):
+        request = FillRequest.from_dict({'size': 5, 'count': 2, 'seed': 3})
+        self.assertEqual((5, 2, 3, None),
+                         (request.size, request.count, request.seed, request.grid))
+        for request_dict in ({'size': True}, {'symmetry': 'Y'}, {'black_ratio': 1},
+                             {'timeout_seconds': 0}, {'count': 0}, {'output': 'png'},
+                             {'seed': -1}, {'unknown': 1}, {'picture_pixels': 10}, []):
+            with self.assertRaises(FillRequestError, msg=request_dict):
+                FillRequest.from_dict(request_dict)
+
+    def test_fill(self):
+        words_index = _load_test_index()
+        request = FillRequest.from_dict({'grid': GRID_7X7_ROWS, 'output': 'svg'})
+        puzzle = fill(words_index, request, seed=5, deadline=float('inf'))
+        self.assertEqual('found', puzzle['result'])
+        self.assertEqual(5, puzzle['seed'])
+        self.assertEqual(_black_cells(GRID_7X7_ROWS), _black_cells(puzzle['grid']))
+        self.assertNotIn('.', "".join(puzzle['grid']))
+        self.assertTrue(puzzle['svg'].startswith('<svg'))
+        self.assertEqual({'result': RESULT_EXPIRED, 'seed': 5},
+                         fill(words_index, request, seed=5, deadline=0))
+
+    def test_fill_prefilled(self):
+        words_index = _load_test_index()
+        solved = fill(words_index, FillRequest.from_dict({'grid': GRID_7X7_ROWS}), seed=5,
+                      deadline=float('inf'))['grid']
+        rows = [solved[0], *GRID_7X7_ROWS[1:]]
+        puzzle = fill(words_index, FillRequest.from_dict({'grid': rows}), seed=6,
+                      deadline=float('inf'))
+        self.assertEqual('found', puzzle['result'])
+        self.assertEqual(solved[0], puzzle['grid'][0])
+        rows = [solved[0].lower(), *GRID_7X7_ROWS[1:]]
+        puzzle = fill(words_index, FillRequest.from_dict({'grid': rows}), seed=6,
+                      deadline=float('inf'))
+        self.assertEqual(RESULT_INCONSISTENT, puzzle['result'])
+        self.assertIn("not in the alphabet", puzzle['error'])
+
+
+class CrosswordServiceTestCase(unittest.IsolatedAsyncioTestCase):
+
+    def _create_service(self) -> CrosswordService:
+        return CrosswordService(_load_test_index, workers=1, max_pending_jobs=2)
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.service = self._create_service()
+        self.server = await asyncio.start_server(self.service.handle_connection, '127.0.0.1', 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.service.close()
+        await super().asyncTearDown()
+
+    async def _request(self, method, path, body=None) -> tuple[int, dict, bytes]:
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        data = json.dumps(body).encode() if body is not None else b''
+        writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                     f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        head, _, response_body = response.partition(b'\r\n\r\n')
+        status_line, *header_lines = head.decode().split('\r\n')
+        headers = dict(line.lower().split(': ', 1) for line in header_lines)
+        if headers.get('transfer-encoding') == 'chunked':
+            response_body = _decode_chunked(response_body)
+        return int(status_line.split()[1]), headers, response_body
+
+    async def test_fill(self):
+        status, headers, body = await self._request('POST', '/fill',
+                                                    {'grid': GRID_7X7_ROWS, 'seed': 5})
+        self.assertEqual(200, status)
+        self.assertEqual('application/json', headers['content-type'])
+        job = json.loads(body)
+        self.assertEqual(('done', 5, 'found'), (job['status'], job['seed'],
+                                                job['puzzle']['result']))
+        self.assertEqual(_black_cells(GRID_7X7_ROWS), _black_cells(job['puzzle']['grid']))
+        self.assertEqual(0, self.service.pending_jobs)
+
+        status, headers, body = await self._request(
+            'POST', '/fill', {'grid': GRID_7X7_ROWS, 'seed': 5, 'output': 'svg'})
+        self.assertEqual((200, 'image/svg+xml', 'found'),
+                         (status, headers['content-type'], headers['x-crossword-result']))
+        self.assertTrue(body.startswith(b'<svg'))
+
+    async def test_fill_stream(self):
+        status, headers, body = await self._request(
+            'POST', '/fill', {'grid': GRID_7X7_ROWS, 'seed': 5, 'count': 2})
+        self.assertEqual((200, 'application/x-ndjson'), (status, headers['content-type']))
+        jobs = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([5, 6], sorted(job['seed'] for job in jobs))
+        self.assertEqual(['done', 'done'], [job['status'] for job in jobs])
+
+    async def test_jobs(self):
+        status, _, body = await self._request('POST', '/jobs',
+                                              {'grid': GRID_7X7_ROWS, 'output': 'svg'})
+        self.assertEqual(202, status)
+        job_id, = json.loads(body)['ids']
+        job = self.service.job(job_id)
+        await job.wait()
+        status, _, body = await self._request('GET', f'/jobs/{job_id}')
+        self.assertEqual((200, 'done'), (status, json.loads(body)['status']))
+        status, headers, body = await self._request('GET', f'/jobs/{job_id}.svg')
+        self.assertEqual((200, 'image/svg+xml'), (status, headers['content-type']))
+        status, _, body = await self._request('DELETE', f'/jobs/{job_id}')
+        self.assertEqual((200, 'done'), (status, json.loads(body)['status']))
+        status, _, _ = await self._request('GET', '/jobs/unknown')
+        self.assertEqual(404, status)
+
+    async def test_cancel(self):
+        # the first job keeps the only worker busy, the second one is queued
+        jobs = [json.loads((await self._request('POST', '/jobs', {'timeout_seconds': 1}))[2])
+                for _ in range(2)]
+        queued_id = jobs[1]['ids'][0]
+        status, _, body = await self._request('DELETE', f'/jobs/{queued_id}')
+        self.assertEqual((200, 'cancelled'), (status, json.loads(body)['status']))
+        status, _, _ = await self._request('GET', f'/jobs/{queued_id}.svg')
+        self.assertEqual(409, status)
+        await self.service.job(jobs[0]['ids'][0]).wait()
+
+    async def test_backpressure(self):
+        status, headers, body = await self._request('POST', '/fill', {'count': 3})
+        self.assertEqual(503, status)
+        self.assertEqual('1', headers['retry-after'])
+        self.assertEqual(0, self.service.pending_jobs)
+
+    async def test_errors(self):
+        self.assertEqual(400, (await self._request('POST', '/fill', {'size': 100}))[0])
+        self.assertEqual(400, (await self._request('POST', '/fill',
+                                                   {'count': 2, 'output': 'svg'}))[0])
+        self.assertEqual(405, (await self._request('GET', '/fill'))[0])
+        self.assertEqual(404, (await self._request('GET', '/unknown'))[0])
+        status, _, body = await self._request('GET', '/health')
+        self.assertEqual((200, 1), (status, json.loads(body)['workers']))
+
+
+class PooledCrosswordServiceTestCase(CrosswordServiceTestCase):
+
+    POOL_KEY = PoolKey(5, 'D', 0.1)
+
+    def _create_service(self) -> CrosswordService:
+        self.pool = PuzzlePool({self.POOL_KEY: 2})
+        return CrosswordService(_load_test_index, workers=1, max_pending_jobs=2, pool=self.pool,
+                                pool_timeout_seconds=5)
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.replenish = asyncio.create_task(self.service.replenish())
+
+    async def asyncTearDown(self):
+        self.replenish.cancel()
+        await super().asyncTearDown()
+
+    async def _wait_pool(self, size):
+        for _ in range(300):
+            if self.pool.size(self.POOL_KEY) >= size:
+                return
+            await asyncio.sleep(0.1)
+        self.fail("The pool is not refilled")
+
+    async def test_pooled_fill(self):
+        await self._wait_pool(2)
+        request = {'size': 5, 'symmetry': 'D', 'black_ratio': 0.1}
+        status, _, body = await self._request('POST', '/fill', request)
+        self.assertEqual(200, status)
+        job = json.loads(body)
+        self.assertEqual(('done', 'found', True), (job['status'], job['puzzle']['result'],
+                                                   job['puzzle']['pooled']))
+        status, headers, body = await self._request('POST', '/fill', {**request, 'output': 'svg'})
+        self.assertEqual((200, 'image/svg+xml'), (status, headers['content-type']))
+        self.assertTrue(body.startswith(b'<svg'))
+        # the pool is refilled once it falls to its low-water mark
+        await self._wait_pool(2)
+        status, _, body = await self._request('POST', '/fill', {**request, 'count': 3})
+        jobs = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([True, True, False], [job['puzzle'].get('pooled', False)
+                                               for job in jobs])
+        status, _, body = await self._request('GET', '/health')
+        self.assertIn('5:D:0.1', json.loads(body)['pool'])
+
+
+if __name__ == '__main__':
+    unittest.main()
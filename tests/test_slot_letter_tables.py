@@ -0,0 +1,57 @@
+import random
+import unittest
+import importlib.resources as pkg_res
+
+from karnobh.crosswordist.slot_letter_tables import SlotLetterTables
+from karnobh.crosswordist.words_index import WordsIndex
+
+
+class SlotLetterTablesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        with pkg_res.open_text('tests.assets', 'random_filtered_words_idx.json') as f:
+            self.words_index = WordsIndex(file=f)
+
+    def test_tables_match_lookups(self):
+        tables = SlotLetterTables(self.words_index)
+        rnd = random.Random(5)
+        abc_len = len(self.words_index.alphabet)
+        for _ in range(30):
+            length = rnd.randint(3, 7)
+            word = rnd.choice(self.words_index[length].words)
+            positions = rnd.sample(range(length), rnd.randint(0, 2))
+            mapping = {pos: self.words_index.alphabet.code(word[pos]) for pos in sorted(positions)}
+            table = tables.table(length, mapping)
+            for pos in range(length):
+                if pos in mapping:
+                    continue
+                expected = [self.words_index.does_intersection_exist(length, {**mapping, pos: code})
+                            for code in range(abc_len)]
+                self.assertEqual(expected, [bool((table[pos] >> code) & 1)
+                                            for code in range(abc_len)])
+
+    def test_table_from_parent_domain(self):
+        tables = SlotLetterTables(self.words_index)
+        code = self.words_index.alphabet.code
+        tables.table(5, {0: code('S')})
+        lookups = []
+        lookup_codes = self.words_index.lookup_codes
+        self.words_index.lookup_codes = lambda *args: lookups.append(args) or lookup_codes(*args)
+        child = tables.table(5, {0: code('S'), 4: code('S')})
+        self.assertEqual([], lookups)
+        self.assertEqual(SlotLetterTables(self.words_index).table(5, {0: code('S'), 4: code('S')}),
+                         child)
+        self.assertEqual(1, len(lookups))
+
+    def test_cache_limit(self):
+        tables = SlotLetterTables(self.words_index, max_cached_tables=2)
+        tables.table(3, {})
+        self.assertIs(tables.table(3, {}), tables.table(3, {}))
+        tables.table(4, {})
+        tables.table(5, {})
+        self.assertEqual(1, len(tables))
+
+
+if __name__ == '__main__':
+    unittest.main()
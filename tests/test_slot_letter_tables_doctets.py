@@ -0,0 +1,8 @@
+import unittest
+import doctest
+import karnobh.crosswordist.slot_letter_tables
+
+
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(karnobh.crosswordist.slot_letter_tables))
+    return tests
@@ -0,0 +1,63 @@
+import io
+import random
+import unittest
+import importlib.resources as pkg_res
+
+from karnobh.crosswordist.affine_2d import FlatMatrix
+from karnobh.crosswordist.grid_generator import CrossWordsIndex
+from karnobh.crosswordist.solution_finder import find_solution, FinderResult
+from karnobh.crosswordist.solver_trace import (TraceWriter, TracingWordsIndex, TraceRun,
+                                               TraceQuery, TraceError, QueryKind, read_trace,
+                                               replay_trace)
+from karnobh.crosswordist.words_index import WordsIndex
+from karnobh.crosswordist.dawg_index import DawgWordsIndex
+from tests.test_finding_solution import GRID_7X7
+
+
+class SolverTraceTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        with pkg_res.open_text('tests.assets', 'random_filtered_words_idx.json') as f:
+            self.words_index = WordsIndex(file=f)
+
+    def _record(self, seed) -> tuple[bytes, FinderResult]:
+        trace = io.BytesIO()
+        writer = TraceWriter(trace)
+        random.seed(seed)
+        grid = FlatMatrix(7, 7, new_state=list(GRID_7X7))
+        writer.start_run(seed, grid)
+        result = find_solution(word_index=TracingWordsIndex(self.words_index, writer),
+                               cross_words_index=CrossWordsIndex(grid=grid),
+                               timeout_after_seconds=30)
+        return trace.getvalue(), result
+
+    def test_record_and_replay(self):
+        trace, result = self._record(seed=5)
+        self.assertEqual(FinderResult.FOUND, result)
+        self.assertEqual(trace, self._record(seed=5)[0])
+        records = list(read_trace(io.BytesIO(trace)))
+        run = records[0]
+        self.assertIsInstance(run, TraceRun)
+        self.assertEqual((5, GRID_7X7), (run.seed, run.grid.data))
+        queries = records[1:]
+        self.assertTrue(all(isinstance(query, TraceQuery) for query in queries))
+        self.assertIn(QueryKind.LIST, {query.kind for query in queries})
+        # the used words are excluded by the masks
+        self.assertTrue(any(query.masks for query in queries))
+        dawg_index = DawgWordsIndex(index_dict=self.words_index.as_dict())
+        for words_index in (self.words_index, dawg_index):
+            stats = replay_trace(io.BytesIO(trace), words_index)
+            self.assertEqual(1, stats.counter("runs"))
+            self.assertEqual(len(queries), sum(stats.counter("queries", type=kind.name.lower())
+                                               for kind in QueryKind))
+            list_queries = stats.counter("queries", type="list")
+            self.assertEqual((list_queries, list_queries),
+                             (stats.timer_total("query_seconds", type="list")[0],
+                              sum(query.kind == QueryKind.LIST for query in queries)))
+
+    def test_wrong_trace(self):
+        self.assertRaises(TraceError, list, read_trace(io.BytesIO(b'NOTRACE\x01')))
+        trace = io.BytesIO()
+        TraceWriter(trace).query(QueryKind.COUNT, [(3, {0: 1})])
+        self.assertRaises(TraceError, list, read_trace(io.BytesIO(trace.getvalue()[:-1])))
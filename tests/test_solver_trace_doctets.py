@@ -0,0 +1,8 @@
+import unittest
+import doctest
+import karnobh.crosswordist.solver_trace
+
+
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(karnobh.crosswordist.solver_trace))
+    return tests
@@ -0,0 +1,101 @@
+import os
+import re
+import random
+import tempfile
+import unittest
+import importlib.resources as pkg_res
+from io import StringIO
+from xml.etree import ElementTree
+
+from karnobh.crosswordist.affine_2d import FlatMatrix
+from karnobh.crosswordist.grid_generator import CrossWordsIndex, cross_words_index_from_rows
+from karnobh.crosswordist.grid_emitter import draw_crossword
+from karnobh.crosswordist.grid_file_writter import emit_svg, write_svgs
+from karnobh.crosswordist.graphics import SvgGraphicsEmitter
+from karnobh.crosswordist.solution_finder import find_solution, FinderResult
+from karnobh.crosswordist.svg_renderer import render_svg, render_svgs, grid_template
+from karnobh.crosswordist.words_index import WordsIndex
+
+GRID_7X7 = [0, 0, 0, 1, 0, 0, 0,
+            0, 0, 0, 1, 0, 0, 0,
+            0, 0, 0, 1, 0, 0, 0,
+            1, 0, 0, 0, 0, 0, 0,
+            0, 0, 0, 0, 0, 0, 0,
+            0, 0, 0, 0, 0, 0, 1,
+            0, 0, 0, 1, 1, 1, 1]
+
+SVG_NS = '{http://www.w3.org/2000/svg}'
+
+
+def _emitted_shapes(cross_words_index, size_px) -> tuple[set, set]:
+    """
+    :return: cells (x, y, fill) and texts (x, y, font size, text) drawn by the graphics emitter
+    """
+    with StringIO() as f:
+        draw_crossword(cross_words_index, SvgGraphicsEmitter(f), size_px)
+        lines = f.getvalue().splitlines()
+    cells, texts = set(), set()
+    for line in lines:
+        attrs = dict(re.findall(r"([\w-]+)='([^']*)'", line))
+        if line.startswith('<rect'):
+            cells.add((int(attrs['x']), int(attrs['y']), attrs['fill']))
+        else:
+            text = re.search(r">(.*)</text>", line).group(1)
+            texts.add((int(attrs['x']), int(attrs['y']), int(attrs['font-size']), text))
+    return cells, texts
+
+
+def _rendered_shapes(svg) -> tuple[set, set]:
+    root = ElementTree.fromstring(svg)
+    style = root.find(f'{SVG_NS}defs/{SVG_NS}style').text
+    font_sizes = {name: int(size) for name, size in re.findall(r"\.(\w)\{font-size:(\d+)px", style)}
+    cells = set()
+    for path in root.iter(f'{SVG_NS}path'):
+        for x, y in re.findall(r"M(\d+) (\d+)", path.get('d')):
+            cells.add((int(x), int(y), path.get('fill')))
+    texts = {(int(text.get('x')), int(text.get('y')), font_sizes[text.get('class')], text.text)
+             for text in root.iter(f'{SVG_NS}text')}
+    return cells, texts
+
+
+class SvgRendererTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        with pkg_res.open_text('tests.assets', 'random_filtered_words_idx.json') as f:
+            wi_loaded = WordsIndex(file=f)
+        random.seed(1)
+        self.cross_words_index = CrossWordsIndex(grid=FlatMatrix(7, 7, new_state=list(GRID_7X7)))
+        self.assertEqual(FinderResult.FOUND,
+                         find_solution(wi_loaded, self.cross_words_index, 10))
+
+    def test_same_picture_as_emitter(self):
+        for size_px in (600, 123):
+            self.assertEqual(_emitted_shapes(self.cross_words_index, size_px),
+                             _rendered_shapes(render_svg(self.cross_words_index, size_px)))
+
+    def test_partial_and_escaped_letters(self):
+        cross_words_index = cross_words_index_from_rows(["A&.", ".#.", "..<"])
+        _, texts = _rendered_shapes(render_svg(cross_words_index, 90))
+        self.assertEqual(['&', '<', 'A'], sorted(text for *_, size, text in texts if size > 9))
+        self.assertEqual(_emitted_shapes(cross_words_index, 90)[0],
+                         _rendered_shapes(render_svg(cross_words_index, 90))[0])
+
+    def test_batch(self):
+        crosswords = [self.cross_words_index, cross_words_index_from_rows(["AT", "#O"])]
+        svgs = render_svgs(crosswords, 300)
+        self.assertEqual([render_svg(crossword, 300) for crossword in crosswords], svgs)
+        self.assertIs(grid_template(7, 7, 300), grid_template(7, 7, 300))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_names = [os.path.join(tmp_dir, f"crossword_{num}.svg") for num in range(2)]
+            write_svgs(crosswords, file_names, 300)
+            for file_name, svg in zip(file_names, svgs):
+                with open(file_name) as f:
+                    self.assertEqual(svg, f.read())
+        with StringIO() as f:
+            emit_svg(self.cross_words_index, f, 300)
+            self.assertEqual(svgs[0], f.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
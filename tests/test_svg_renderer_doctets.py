@@ -0,0 +1,8 @@
+import unittest
+import doctest
+import karnobh.crosswordist.svg_renderer
+
+
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(karnobh.crosswordist.svg_renderer))
+    return tests
@@ -12,10 +12,12 @@ import unittest
 import logging
 
 from karnobh.crosswordist.bitmap import and_all
-from karnobh.crosswordist.bitmap import bit_index, bit_op_index2
+from karnobh.crosswordist.bitmap import bit_index, bit_index2, bit_op_index2
 from karnobh.crosswordist.words_index import (WordsIndexSameLen, WordsIndexWrongLen,
-                                              NotSupportTypeItem, WordsIndex)
+                                              NotSupportTypeItem, WordsIndex, parse_scored_word,
+                                              WordIndexLoadError)
 from karnobh.crosswordist.naive_lookup import naive_lookup
+from karnobh.crosswordist.packed_words import PackedWords
 
 logger = logging.getLogger(__name__)
 
@@ -179,3 +181,95 @@ class WordIndexTestCase(unittest.TestCase):
         logger.info("Total index time: %s, total non index time: %s",
                     total_index_time, total_non_index_time)
 
+
+
+class PackedWordsIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assets_package = 'tests.assets'
+        self.index_file = 'random_filtered_words_idx.json'
+
+    def test_packed_words(self):
+        words = ["AAB", "BAA", "CAB"]
+        packed = PackedWords(3, "ABC", words)
+        self.assertEqual(3, len(packed))
+        self.assertEqual(words, list(packed))
+        self.assertEqual("CAB", packed[-1])
+        self.assertEqual(["BAA", "CAB"], packed[1:])
+        self.assertEqual(bytes([1, 0, 0]), bytes(packed.letters_at(1)))
+        self.assertRaises(IndexError, packed.word_at, 3)
+
+    def test_packed_words_same_lookup(self):
+        with pkg_res.open_text(self.assets_package, self.index_file) as f:
+            words_index = WordsIndex(file=f)
+        with pkg_res.open_text(self.assets_package, self.index_file) as f:
+            packed_words_index = WordsIndex(file=f, packed_words=True)
+        for length, mapping in [(3, {0: 'A'}), (5, {1: 'A', 4: 'S'}), (7, {0: 'C', 6: 'D'})]:
+            self.assertEqual(list(words_index.lookup(length, mapping)),
+                             list(packed_words_index.lookup(length, mapping)))
+        self.assertEqual(list(words_index[4].words), list(packed_words_index[4].words))
+        letters = packed_words_index[4].letters_at(0)
+        self.assertIsInstance(letters, memoryview)
+        self.assertEqual(words_index[4].word_at(0),
+                         "".join("ABCDEFGHIJKLMNOPQRSTUVWXYZ"[c] for c in letters))
+
+
+class LetterCodesLookupTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assets_package = 'tests.assets'
+        self.index_file = 'random_filtered_words_idx.json'
+
+    def test_lookup_by_codes(self):
+        with pkg_res.open_text(self.assets_package, self.index_file) as f:
+            words_index = WordsIndex(file=f)
+        abc = words_index.alphabet
+        mapping = {1: 'A', 4: 'S'}
+        coded_mapping = abc.encode_mapping(mapping)
+        self.assertEqual({1: 0, 4: 18}, coded_mapping)
+        expected = list(words_index.lookup(5, mapping))
+        self.assertEqual(expected, list(words_index.lookup(5, coded_mapping)))
+        self.assertEqual(expected, [abc.decode(c) for c in words_index.lookup_codes(5, mapping)])
+        self.assertEqual(len(expected), words_index.count_occurrences(5, coded_mapping))
+
+    def test_flat_bitmap_index(self):
+        with WordsIndexSameLen.as_context(3) as wi:
+            for w in ["ABC", "CAB", "BAC"]:
+                wi.add_word(w)
+        self.assertIs(wi.bitmap_on_position(1, 'A'), wi.bitmap_on_position(1, 0))
+        self.assertEqual([1, 2], list(bit_index2(wi.bitmap_on_position(1, 'A'))))
+        self.assertEqual(bytes([2, 0, 1]), wi.letters_at(2))
+        # the codes are encoded once
+        self.assertIs(wi.letters_at(2), wi.letters_at(2))
+
+
+class ScoredWordsIndexTestCase(unittest.TestCase):
+
+    def test_scored_words(self):
+        corpus = ["CAT;5", "CAB;50", "COT", "DOG;7.5", "CAT;1", "CABIN;3"]
+        with WordsIndex.as_context() as words_index:
+            for line in corpus:
+                words_index.add_word(*parse_scored_word(line))
+        self.assertEqual(["CAB", "DOG", "CAT", "COT"], list(words_index[3].words))
+        self.assertEqual([50.0, 7.5, 5.0, 0.0], list(words_index[3].scores))
+        self.assertEqual(["CAB", "CAT", "COT"], list(words_index.lookup(3, {0: 'C'})))
+        self.assertEqual(3.0, words_index[5].score_at(0))
+        out = io.StringIO()
+        words_index.dump(out)
+        out.seek(0)
+        loaded = WordsIndex(file=out)
+        self.assertEqual(words_index.as_dict(), loaded.as_dict())
+        self.assertEqual(list(words_index[3].scores), list(loaded[3].scores))
+
+    def test_not_scored_words(self):
+        with WordsIndex.as_context() as words_index:
+            for word in ["DOG", "CAT"]:
+                words_index.add_word(word)
+        self.assertIsNone(words_index[3].scores)
+        self.assertIsNone(words_index[3].score_at(0))
+        self.assertNotIn('scores', words_index.as_dict()[3])
+
+    def test_wrong_score(self):
+        self.assertRaises(WordIndexLoadError, parse_scored_word, "CAT;many")
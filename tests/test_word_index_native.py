@@ -0,0 +1,231 @@
+import io
+import json
+import random
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import importlib.resources as pkg_res
+
+from crosswordist_native_index.compressed_seq import (bit_index_native, bit_and_op_index_native,
+                                                       bit_and_op_index_batch_native,
+                                                       BitIndexIterator)
+
+from karnobh.crosswordist.bitmap import compress, bool_to_byte_bits_seq
+from karnobh.crosswordist.words_index import WordsIndex
+from karnobh.crosswordist.word_index_native import WordIndexNative
+from karnobh.crosswordist.solution_finder import UsedWords
+
+
+def random_patterns(words_index, count, seed=1):
+    rnd = random.Random(seed)
+    abc = words_index.alphabet.letters
+    patterns = []
+    for _ in range(count):
+        length = rnd.randint(3, 7)
+        positions = rnd.sample(range(length), rnd.randint(0, length - 1))
+        patterns.append((length, {pos: rnd.choice(abc) for pos in positions}))
+    return patterns
+
+
+def random_bits(rnd, bits_num, density):
+    # blocks of zeros and ones are mixed with noise to get long fill runs of both types
+    bits = []
+    while len(bits) < bits_num:
+        kind = rnd.random()
+        block = rnd.randint(1, 300)
+        if kind < 0.2:
+            bits += [False] * block
+        elif kind < 0.4:
+            bits += [True] * block
+        else:
+            bits += [rnd.random() < density for _ in range(block)]
+    return bits[:bits_num]
+
+
+class WordIndexNativeTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assets_package = 'tests.assets'
+        self.index_file = 'random_filtered_words_idx.json'
+        with pkg_res.open_text(self.assets_package, self.index_file) as f:
+            self.words_index = WordsIndex(file=f)
+        with pkg_res.open_text(self.assets_package, self.index_file) as f:
+            self.words_index_native = WordIndexNative(file=f)
+
+    def test_batch_lookups(self):
+        patterns = random_patterns(self.words_index, 300)
+        # patterns sharing bitmaps
+        patterns += [(5, {0: 'S'}), (5, {0: 'S', 4: 'S'}), (5, {4: 'S', 1: 'A'})]
+        expected_counts = [self.words_index.count_occurrences(length, mapping) if mapping
+                           else len(self.words_index[length].words)
+                           for length, mapping in patterns]
+        self.assertEqual(expected_counts, self.words_index.count_occurrences_batch(patterns))
+        self.assertEqual(expected_counts,
+                         self.words_index_native.count_occurrences_batch(patterns))
+        expected_exists = [count != 0 for count in expected_counts]
+        self.assertEqual(expected_exists,
+                         self.words_index_native.does_intersection_exist_batch(patterns))
+        self.assertEqual(all(expected_exists),
+                         self.words_index_native.do_all_intersections_exist(patterns))
+        self.assertEqual(all(expected_exists),
+                         self.words_index.do_all_intersections_exist(patterns))
+        existing = [pattern for pattern, exists in zip(patterns, expected_exists) if exists]
+        self.assertTrue(self.words_index_native.do_all_intersections_exist(existing))
+
+    def test_batch_stops_on_empty(self):
+        index = self.words_index_native[5]
+        existing = [index.bitmap_on_position(0, 'S').compressed_sequence]
+        missing = [index.bitmap_on_position(0, 'S').compressed_sequence,
+                   index.bitmap_on_position(1, 'S').compressed_sequence,
+                   index.bitmap_on_position(2, 'S').compressed_sequence,
+                   index.bitmap_on_position(3, 'S').compressed_sequence]
+        self.assertEqual(0, self.words_index_native.count_occurrences(5, {0: 'S', 1: 'S', 2: 'S',
+                                                                           3: 'S'}))
+        self.assertEqual([True, False, True],
+                         bit_and_op_index_batch_native([existing, missing, existing], 2))
+        self.assertEqual([True, False],
+                         bit_and_op_index_batch_native([existing, missing, existing], 2, True))
+        self.assertEqual([True, True], bit_and_op_index_batch_native([existing, existing], 2, True))
+
+    def test_used_words_masks(self):
+        used_words = UsedWords(self.words_index_native)
+        self.assertEqual({}, used_words.masks)
+        used = list(self.words_index.lookup_indexes(5, {0: 'S'}))[:3] + [0]
+        self.assertEqual([(5, i) for i in used], used_words.add([(5, i) for i in used]))
+        self.assertIsNone(used_words.add([(5, 1), (5, used[0])]))
+        self.assertNotIn(1, used_words.used(5))
+        masks = used_words.masks
+        self.assertEqual([5], list(masks))
+        words_num = len(self.words_index[5].words)
+        patterns = [(5, {0: 'S'}), (5, {}), (4, {0: 'S'}), (5, {0: 'S', 1: 'S', 2: 'S'})]
+        expected = [[i for i in self.words_index.lookup_indexes(length, mapping)
+                     if length != 5 or i not in used] if mapping
+                    else [i for i in range(words_num) if i not in used]
+                    for length, mapping in patterns]
+        expected_counts = [len(indexes) for indexes in expected]
+        for words_index in (self.words_index, self.words_index_native):
+            for (length, mapping), indexes in zip(patterns, expected):
+                mask = masks.get(length)
+                self.assertEqual(indexes, list(words_index.lookup_indexes(length, mapping,
+                                                                          mask=mask)))
+                self.assertEqual(len(indexes), words_index.count_occurrences(length, mapping,
+                                                                             mask=mask))
+            self.assertEqual(expected_counts, words_index.count_occurrences_batch(patterns, masks))
+            self.assertEqual([count != 0 for count in expected_counts],
+                             words_index.does_intersection_exist_batch(patterns, masks))
+            self.assertFalse(words_index.do_all_intersections_exist(patterns, masks))
+        used_words.remove([(5, i) for i in used])
+        self.assertEqual({}, used_words.masks)
+
+    def test_pattern_counts(self):
+        self.words_index.make_pattern_counts(range(3, 6), max_fixed=2)
+        dumped = io.StringIO()
+        self.words_index.dump(dumped)
+        dumped.seek(0)
+        index_dict = json.load(dumped)
+        self.assertIn('pattern_counts', index_dict['5'])
+        self.assertNotIn('pattern_counts', index_dict['6'])
+        with pkg_res.open_text(self.assets_package, self.index_file) as f:
+            expected_index = WordsIndex(file=f)
+        loaded = [WordsIndex(index_dict=index_dict), WordIndexNative(index_dict=index_dict)]
+        patterns = [(length, mapping) for length, mapping in
+                    random_patterns(self.words_index, 400, seed=6) if length < 7]
+        patterns += [(3, {0: 'Q', 1: 'Q'}), (4, {2: 'S'})]
+        expected = [expected_index.count_occurrences(length, mapping) if mapping
+                    else len(expected_index[length].words) for length, mapping in patterns]
+        used_words = UsedWords(expected_index)
+        used_words.add([(4, i) for i in expected_index.lookup_indexes(4, {2: 'S'})][:5])
+        masks = used_words.masks
+        expected_masked = [expected_index.count_occurrences(length, mapping,
+                                                            mask=masks.get(length))
+                           for length, mapping in patterns]
+        for words_index in loaded:
+            self.assertIsNotNone(words_index[5].pattern_counts)
+            self.assertEqual(expected, words_index.count_occurrences_batch(patterns))
+            self.assertEqual([count != 0 for count in expected],
+                             words_index.does_intersection_exist_batch(patterns))
+            self.assertEqual(expected_masked, words_index.count_occurrences_batch(patterns, masks))
+            self.assertEqual(expected_masked,
+                             [words_index.count_occurrences(length, mapping,
+                                                            mask=masks.get(length))
+                              for length, mapping in patterns])
+            self.assertFalse(words_index.do_all_intersections_exist(patterns))
+
+    def test_lookup_many_operands(self):
+        words = self.words_index[7].words
+        word = words[len(words) // 2]
+        # every position is repeated to get more operands than the former limit of 64
+        bitmaps = [self.words_index[7].bitmap_on_position(pos, letter).compressed_sequence
+                   for pos, letter in enumerate(word)] * 10
+        expected = list(self.words_index.lookup_indexes(7, dict(enumerate(word))))
+        self.assertEqual(expected, bit_and_op_index_native(bitmaps, 1, 0))
+        self.assertEqual(len(expected), bit_and_op_index_native(bitmaps, 1, 1))
+        self.assertEqual(expected, list(BitIndexIterator(bitmaps, 3)))
+
+    def test_lookup_iterator(self):
+        for length, mapping in random_patterns(self.words_index, 300, seed=2):
+            if not mapping:
+                continue
+            self.assertEqual(list(self.words_index.lookup(length, mapping)),
+                             list(self.words_index_native.lookup(length, mapping)))
+        iterator = self.words_index_native.lookup_indexes(5, {0: 'S'})
+        first = next(iterator)
+        self.assertEqual(next(self.words_index.lookup_indexes(5, {0: 'S'})), first)
+        self.assertEqual([], list(BitIndexIterator([self.words_index[5].empty_bitmap
+                                                    .compressed_sequence])))
+
+    def test_and_kernel(self):
+        rnd = random.Random(3)
+        bits_num = 20011
+        for density in (0.05, 0.5, 0.95):
+            for operands_num in (1, 2, 3, 7):
+                bits = [random_bits(rnd, bits_num, density) for _ in range(operands_num)]
+                bitmaps = [bytes(compress(bool_to_byte_bits_seq(seq))) for seq in bits]
+                expected = [index for index in range(bits_num)
+                            if all(seq[index] for seq in bits)]
+                self.assertEqual(expected, bit_and_op_index_native(bitmaps, 1, 0)
+                                 if operands_num > 1 else bit_index_native(bitmaps[0], 1, 0))
+                self.assertEqual(len(expected), bit_and_op_index_native(bitmaps * 2, 1, 1))
+                self.assertEqual(bool(expected), bit_and_op_index_native(bitmaps * 2, 1, 2))
+                self.assertEqual(expected, list(BitIndexIterator(bitmaps, 5)))
+                self.assertEqual([len(expected)],
+                                 bit_and_op_index_batch_native([bitmaps * 2], 1))
+
+    def test_shared_iterator_threads(self):
+        rnd = random.Random(9)
+        bits = random_bits(rnd, 200_000, density=0.5)
+        compressed = bytes(compress(bool_to_byte_bits_seq(bits)))
+        expected = [i for i, bit in enumerate(bits) if bit]
+        for _ in range(5):
+            iterator = BitIndexIterator([compressed], 64)
+
+            def consume():
+                consumed = []
+                while True:
+                    try:
+                        consumed.append(next(iterator))
+                    except StopIteration:
+                        return consumed
+                    except ValueError:
+                        # another thread refills the chunk
+                        continue
+
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(executor.map(lambda _: consume(), range(4)))
+            self.assertEqual(expected, sorted(index for result in results for index in result))
+
+    def test_threaded_lookups(self):
+        patterns = [(length, mapping) for length, mapping in
+                    random_patterns(self.words_index, 400, seed=4) if mapping]
+        index = self.words_index_native
+
+        def lookup_all(chunk):
+            return ([list(index.lookup_indexes(length, mapping)) for length, mapping in chunk],
+                    [index.count_occurrences(length, mapping) for length, mapping in chunk],
+                    index.count_occurrences_batch(chunk))
+
+        chunks = [patterns[i::8] for i in range(8)]
+        expected = [lookup_all(chunk) for chunk in chunks]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for _ in range(5):
+                self.assertEqual(expected, list(executor.map(lookup_all, chunks)))